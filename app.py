@@ -2,10 +2,8 @@ import streamlit as st
 from streamlit_agraph import agraph, Node, Edge, Config
 from src.pipeline import AbstractiveKGPipeline
 from src.graph_rag import GraphRAG
-import PyPDF2
-import requests
-from bs4 import BeautifulSoup
-import io
+from src.incremental import IncrementalProcessor
+from src.sources import make_session, fetch_urls, iter_pdf_pages
 
 # Page Config
 st.set_page_config(layout="wide", page_title="AbstractiveKG-NLP Explorer", page_icon="🕸️")
@@ -34,65 +32,93 @@ def get_pipeline():
 def get_rag():
     return GraphRAG()
 
+@st.cache_resource
+def get_http_session():
+    # One pooled session for the app, reused across reruns.
+    return make_session()
+
 pipeline = get_pipeline()
 rag = get_rag()
 
+# Per-browser-session document state for incremental re-processing.
+if 'incremental' not in st.session_state:
+    st.session_state['incremental'] = IncrementalProcessor(pipeline)
+
 # Helper Functions
-def extract_text_from_pdf(file):
-    pdf_reader = PyPDF2.PdfReader(file)
-    text = ""
-    for page in pdf_reader.pages:
-        text += page.extract_text()
-    return text
-
-def extract_text_from_url(url):
-    try:
-        response = requests.get(url)
-        soup = BeautifulSoup(response.content, 'html.parser')
-        # Extract paragraphs
-        paragraphs = soup.find_all('p')
-        text = " ".join([p.get_text() for p in paragraphs])
-        return text
-    except Exception as e:
-        return f"Error fetching URL: {e}"
-
-def process_text(text):
+def process_pdf(file):
+    """
+    Process a PDF page by page as pages are extracted, one document per page
+    (like `python -m src.ingest --source report.pdf`), without joining the pages into one string.
+    """
+    summaries = []
+    kg_data = {'entities': [], 'relations': []}
+    status = st.empty()
+    with st.spinner("Processing PDF page by page..."):
+        for page_no, page in enumerate(iter_pdf_pages(file.getvalue()), start=1):
+            if not page.strip():
+                continue
+            summary, page_kg = pipeline.process(page, doc_id=f"{file.name}#page={page_no}")
+            summaries.append(summary)
+            kg_data['entities'].extend(page_kg['entities'])
+            kg_data['relations'].extend(page_kg['relations'])
+            status.caption(f"Processed page {page_no}")
+    show_results("\n\n".join(summaries), kg_data)
+
+def extract_text_from_urls(urls):
+    texts = []
+    for url, text, error in fetch_urls(urls, session=get_http_session()):
+        if error is not None:
+            st.warning(f"Error fetching {url}: {error}")
+        elif text:
+            texts.append(text)
+    return "\n\n".join(texts)
+
+def process_text(text, incremental=True):
     with st.spinner("Processing... (Summarizing & Extracting Entities)"):
-        summary, kg_data = pipeline.process(text)
-        
-        # Update Session State
-        st.session_state['summary'] = summary
-        st.session_state['kg_data'] = kg_data
-        
-        # Prepare Graph
-        nodes = []
-        edges = []
-        node_ids = set()
-        
-        for ent in kg_data['entities']:
-            if ent['text'] not in node_ids:
-                nodes.append(Node(id=ent['text'], 
-                                  label=ent['text'], 
-                                  size=25, 
-                                  shape="dot",
-                                  color="#4E88E5" if ent['label'] == "ORG" else "#E54E4E" if ent['label'] == "PERSON" else "#4EE588"))
-                node_ids.add(ent['text'])
-        
-        for rel in kg_data['relations']:
-            if rel['head'] not in node_ids:
-                nodes.append(Node(id=rel['head'], label=rel['head'], size=15, color="#999"))
-                node_ids.add(rel['head'])
-            if rel['tail'] not in node_ids:
-                nodes.append(Node(id=rel['tail'], label=rel['tail'], size=15, color="#999"))
-                node_ids.add(rel['tail'])
-                
-            edges.append(Edge(source=rel['head'], 
-                              target=rel['tail'], 
-                              label=rel['type'],
-                              type="CURVE_SMOOTH"))
+        if incremental:
+            summary, kg_data, diff = st.session_state['incremental'].process(text)
+            st.caption(
+                f"Re-processed {diff['changed_segments']}/{diff['total_segments']} paragraphs: "
+                f"+{len(diff['added']['relations'])} / -{len(diff['removed']['relations'])} relations"
+            )
+        else:
+            summary, kg_data = pipeline.process(text)
+        show_results(summary, kg_data)
+
+def show_results(summary, kg_data):
+    # Update Session State
+    st.session_state['summary'] = summary
+    st.session_state['kg_data'] = kg_data
+    
+    # Prepare Graph
+    nodes = []
+    edges = []
+    node_ids = set()
+    
+    for ent in kg_data['entities']:
+        if ent['text'] not in node_ids:
+            nodes.append(Node(id=ent['text'], 
+                              label=ent['text'], 
+                              size=25, 
+                              shape="dot",
+                              color="#4E88E5" if ent['label'] == "ORG" else "#E54E4E" if ent['label'] == "PERSON" else "#4EE588"))
+            node_ids.add(ent['text'])
+    
+    for rel in kg_data['relations']:
+        if rel['head'] not in node_ids:
+            nodes.append(Node(id=rel['head'], label=rel['head'], size=15, color="#999"))
+            node_ids.add(rel['head'])
+        if rel['tail'] not in node_ids:
+            nodes.append(Node(id=rel['tail'], label=rel['tail'], size=15, color="#999"))
+            node_ids.add(rel['tail'])
+            
+        edges.append(Edge(source=rel['head'], 
+                          target=rel['tail'], 
+                          label=rel['type'],
+                          type="CURVE_SMOOTH"))
 
-        st.session_state['nodes'] = nodes
-        st.session_state['edges'] = edges
+    st.session_state['nodes'] = nodes
+    st.session_state['edges'] = edges
 
 # UI Layout
 st.title("🕸️ AbstractiveKG-NLP Explorer")
@@ -107,9 +133,15 @@ with tab1:
     with col1:
         st.subheader("📝 Input Text")
         text_input = st.text_area("Content to Analyze:", height=300, key="main_input", value=st.session_state['input_text'])
+        # Off by default: incremental mode only summarizes paragraphs of 60+ words, so short texts are not summarized.
+        incremental = st.checkbox(
+            "Incremental (re-process edited paragraphs only)",
+            value=False,
+            help="Paragraphs shorter than 60 words are not summarized; their facts are extracted directly.",
+        )
         if st.button("🚀 Process Text", type="primary"):
             st.session_state['input_text'] = text_input
-            process_text(text_input)
+            process_text(text_input, incremental=incremental)
             
         if st.session_state['summary']:
             st.subheader("📄 Abstractive Summary")
@@ -146,18 +178,19 @@ with tab3:
     if upload_option == "PDF Document":
         uploaded_file = st.file_uploader("Upload PDF", type="pdf")
         if uploaded_file:
-            if st.button("Load PDF"):
-                text = extract_text_from_pdf(uploaded_file)
-                st.session_state['input_text'] = text
-                st.success("PDF Loaded! Go to 'Explorer' tab to process it.")
+            if st.button("Process PDF"):
+                process_pdf(uploaded_file)
+                st.success("PDF processed! Go to 'Explorer' tab to see the graph.")
                 
     elif upload_option == "Web URL":
-        url = st.text_input("Enter URL")
-        if url:
-            if st.button("Scrape URL"):
-                text = extract_text_from_url(url)
-                st.session_state['input_text'] = text
-                st.success("URL Scraped! Go to 'Explorer' tab to process it.")
+        url_input = st.text_area("Enter URLs (one per line)")
+        urls = [line.strip() for line in url_input.splitlines() if line.strip()]
+        if urls:
+            if st.button("Scrape URLs"):
+                text = extract_text_from_urls(urls)
+                if text:
+                    st.session_state['input_text'] = text
+                    st.success("URLs Scraped! Go to 'Explorer' tab to process it.")
 
 # Footer
 st.divider()
@@ -0,0 +1,61 @@
+"""
+Cold-start time and RSS of the app's resources (pipeline + GraphRAG).
+
+Each mode runs in a fresh subprocess:
+  lazy   - construct AbstractiveKGPipeline and GraphRAG; models load on first use
+  eager  - additionally preload every model up front (the previous start-up behaviour)
+  first  - lazy start followed by one GraphRAG query (cost of the first chat request)
+
+Usage: python -m benchmarks.bench_cold_start
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+
+def measure(mode):
+    start = time.perf_counter()
+    from src import registry
+    from src.pipeline import AbstractiveKGPipeline
+    from src.graph_rag import GraphRAG
+
+    pipeline = AbstractiveKGPipeline(use_cache=False)
+    try:
+        rag = GraphRAG()
+    except Exception:
+        rag = None  # No database: measure model start-up only.
+    if mode == "eager":
+        registry.preload()
+        registry.get_rouge()
+    elif mode == "first" and rag is not None:
+        rag.query("What is Elon Musk connected to?")
+    elapsed = time.perf_counter() - start
+
+    rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    if rag is not None:
+        rag.close()
+    pipeline.close()
+    return {"seconds": elapsed, "peak_rss_mb": rss_mb}
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--modes", nargs="+", default=["lazy", "first", "eager"])
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print("RESULT " + json.dumps(measure(args.worker)))
+        return
+
+    for mode in args.modes:
+        out = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_cold_start", "--worker", mode],
+            capture_output=True, text=True, check=True,
+        ).stdout
+        result = json.loads(out.split("RESULT ", 1)[1])
+        print(f"{mode:<6} start-up {result['seconds']:7.2f}s  peak RSS {result['peak_rss_mb']:8.0f} MB")
+
+if __name__ == "__main__":
+    main()
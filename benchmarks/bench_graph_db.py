@@ -0,0 +1,73 @@
+"""
+Count Neo4j round-trips for per-item versus UNWIND bulk ingestion.
+
+Runs against an in-process fake driver by default; pass --live to time
+the same workload against the Neo4j instance configured in .env.
+
+Usage: python -m benchmarks.bench_graph_db --docs 100 --chunk-size 1000
+"""
+import argparse
+
+from src.graph_db import Neo4jConnector
+from benchmarks.common import timed, report
+from tests.fake_neo4j import FakeDriver
+
+RELATION_TYPES = ["announce", "develop", "collaborate", "lead", "launch"]
+
+def synthetic_kg(doc_id, n_entities=12, n_relations=10):
+    entities = [{"text": f"Entity {doc_id}-{i}", "label": "ORG"} for i in range(n_entities)]
+    relations = [
+        {
+            "head": entities[i % n_entities]["text"],
+            "type": RELATION_TYPES[i % len(RELATION_TYPES)],
+            "tail": entities[(i + 1) % n_entities]["text"],
+        }
+        for i in range(n_relations)
+    ]
+    return {"entities": entities, "relations": relations}
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=100)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--live", action="store_true")
+    args = parser.parse_args()
+
+    batch = [synthetic_kg(i) for i in range(args.docs)]
+
+    if args.live:
+        connector = Neo4jConnector(chunk_size=args.chunk_size)
+        _, t_item = timed(lambda: [connector.populate_kg(kg, bulk=False) for kg in batch])
+        _, t_bulk = timed(connector.populate_kg_batch, batch)
+        report("per-item populate_kg", len(batch), t_item)
+        report("populate_kg_batch", len(batch), t_bulk)
+        connector.close()
+        return
+
+    driver = FakeDriver()
+    connector = Neo4jConnector(driver=driver, chunk_size=args.chunk_size)
+
+    for kg in batch:
+        connector.populate_kg(kg, bulk=False)
+    per_item = driver.transactions
+    driver.reset()
+
+    for kg in batch:
+        connector.populate_kg(kg)
+    per_doc = driver.transactions
+    driver.reset()
+
+    connector.populate_kg_batch(batch)
+    per_batch = driver.transactions
+
+    expected_per_doc = args.docs * (1 + len(RELATION_TYPES))
+    assert per_doc == expected_per_doc, f"expected {expected_per_doc} bulk transactions, got {per_doc}"
+    assert per_batch < per_doc < per_item
+
+    print(f"Documents: {args.docs}")
+    print(f"per-item transactions:        {per_item}")
+    print(f"bulk per document:            {per_doc}")
+    print(f"bulk across the whole batch:  {per_batch}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+GraphRAG lookup latency on a synthetic graph: per-entity CONTAINS scans
+versus the single UNWIND query over the full-text index, plus the bounded
+2-hop expansion used by GraphRAG.query.
+
+Requires the Neo4j instance configured in .env. The synthetic graph uses
+names prefixed with "Bench Entity", so it can share a database with real data;
+pass --populate on the first run to create it.
+
+Usage: python -m benchmarks.bench_graph_rag --nodes 1000000 --populate
+"""
+import argparse
+import random
+import statistics
+
+from src.graph_db import Neo4jConnector
+from benchmarks.common import timed
+
+RELATION_TYPES = ["announce", "develop", "collaborate", "lead", "launch"]
+
+SCAN_QUERY = """
+MATCH (n:Entity)-[r]-(m:Entity)
+WHERE toLower(n.name) CONTAINS toLower($name)
+RETURN n.name, type(r), m.name
+LIMIT 10
+"""
+
+def populate(connector, n_nodes, chunk_docs=10_000):
+    rng = random.Random(0)
+    for start in range(0, n_nodes, chunk_docs):
+        names = [f"Bench Entity {i}" for i in range(start, min(start + chunk_docs, n_nodes))]
+        kg = {
+            "entities": [{"text": name, "label": "ORG"} for name in names],
+            "relations": [
+                {"head": name, "type": rng.choice(RELATION_TYPES), "tail": f"Bench Entity {rng.randrange(n_nodes)}"}
+                for name in names
+            ],
+        }
+        connector.populate_kg_batch([kg], chunk_size=chunk_docs)
+        print(f"populated {min(start + chunk_docs, n_nodes)}/{n_nodes} nodes", end="\r")
+    print()
+
+def scan_lookup(connector, names):
+    results = []
+    for name in names:
+        with connector.driver.session() as session:
+            results.extend(session.run(SCAN_QUERY, name=name).values())
+    return results
+
+def percentiles(samples):
+    samples = sorted(samples)
+    pick = lambda q: samples[min(len(samples) - 1, int(q * len(samples)))]
+    return f"p50 {pick(0.5) * 1000:8.2f} ms  p99 {pick(0.99) * 1000:8.2f} ms  mean {statistics.mean(samples) * 1000:8.2f} ms"
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--nodes", type=int, default=1_000_000)
+    parser.add_argument("--entities-per-question", type=int, default=3)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--populate", action="store_true")
+    args = parser.parse_args()
+
+    connector = Neo4jConnector()
+    connector.ensure_indexes()
+    if args.populate:
+        populate(connector, args.nodes)
+    # Full-text indexes are populated asynchronously.
+    with connector.driver.session() as session:
+        session.run("CALL db.awaitIndexes(600)").consume()
+
+    rng = random.Random(1)
+    questions = [
+        [f"Bench Entity {rng.randrange(args.nodes)}" for _ in range(args.entities_per_question)]
+        for _ in range(args.queries)
+    ]
+
+    scan_times = [timed(scan_lookup, connector, q)[1] for q in questions]
+    indexed_times = [timed(connector.find_neighbors, q)[1] for q in questions]
+    expand_times = [timed(connector.expand, q, 2, 25)[1] for q in questions]
+
+    print(f"graph: {args.nodes} nodes, {args.entities_per_question} entities/question, {args.queries} questions")
+    print(f"CONTAINS scan per entity:  {percentiles(scan_times)}")
+    print(f"UNWIND + full-text index:  {percentiles(indexed_times)}")
+    print(f"2-hop expand, fanout 25:   {percentiles(expand_times)}")
+    connector.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Lookup latency of the in-memory CSR graph backend.
+
+Usage: python -m benchmarks.bench_memory_graph --nodes 1000000 --edges-per-node 3
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import numpy as np
+
+from src.memory_graph import InMemoryGraph
+from benchmarks.common import timed
+
+RELATION_TYPES = ["announce", "develop", "collaborate", "lead", "launch"]
+
+def per_call_us(fn, args_list):
+    start = time.perf_counter()
+    for args in args_list:
+        fn(*args)
+    return (time.perf_counter() - start) / len(args_list) * 1e6
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--nodes", type=int, default=1_000_000)
+    parser.add_argument("--edges-per-node", type=int, default=3)
+    parser.add_argument("--queries", type=int, default=1000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    graph = InMemoryGraph()
+    names = [f"Bench Entity {i}" for i in range(args.nodes)]
+
+    def build():
+        for name in names:
+            graph.add_entity(name, "ORG")
+        for name in names:
+            for _ in range(args.edges_per_node):
+                graph.add_relation(name, rng.choice(RELATION_TYPES), names[rng.randrange(args.nodes)])
+        graph.k_hop([names[0]], hops=1)  # force the CSR build
+
+    _, t_build = timed(build)
+    print(f"built {graph.num_nodes()} nodes / {graph.num_edges()} edges in {t_build:.1f}s")
+
+    picks = [(names[rng.randrange(args.nodes)],) for _ in range(args.queries)]
+    print(f"exact neighbors():          {per_call_us(graph.neighbors, picks):8.1f} us/query")
+    print(f"find_neighbors() by name:   {per_call_us(lambda n: graph.find_neighbors([n]), picks):8.1f} us/query")
+    print(f"k_hop(hops=2, fanout=20):   {per_call_us(lambda n: graph.k_hop([n], hops=2, fanout=20), picks):8.1f} us/query")
+
+    with tempfile.TemporaryDirectory() as path:
+        _, t_save = timed(graph.snapshot, path)
+        loaded, t_load = timed(InMemoryGraph.load, path)
+        size_mb = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path)) / 2**20
+        print(f"snapshot {t_save:.2f}s, mmap load {t_load:.2f}s, {size_mb:.0f} MB on disk")
+        print(f"neighbors() after load:     {per_call_us(loaded.neighbors, picks):8.1f} us/query")
+        assert isinstance(loaded._adjacency()[0], np.memmap)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Compare per-call KG extraction against the single-parse batched path.
+
+Usage: python -m benchmarks.bench_ner_re --docs 500 --batch-size 64
+"""
+import argparse
+
+from src.ner_re import KGExtractor
+from benchmarks.common import sample_corpus, timed, report
+
+def per_call(extractor, texts):
+    # The original extract_kg path: two full spaCy parses per text.
+    return [
+        {"entities": extractor.extract_entities(t), "relations": extractor.extract_relations(t)}
+        for t in texts
+    ]
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--n-process", type=int, default=1)
+    args = parser.parse_args()
+
+    extractor = KGExtractor()
+    texts = sample_corpus(args.docs)
+    extractor.extract_kg(texts[0])  # warm up
+
+    baseline, t_base = timed(per_call, extractor, texts)
+    batched, t_batch = timed(
+        lambda: list(extractor.extract_kg_batch(texts, batch_size=args.batch_size, n_process=args.n_process))
+    )
+
+    assert baseline == batched, "Batched extraction output differs from per-call output"
+    base_rate = report("per-call (2 parses/doc)", len(texts), t_base)
+    batch_rate = report("extract_kg_batch", len(texts), t_batch)
+    print(f"Speedup: {batch_rate / base_rate:.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Relation extraction quality and speed: the original subject-verb-object loop
+versus the DependencyMatcher rules from src/patterns/relations.json.
+
+Quality is scored with calculate_kg_metrics against a small hand-labelled
+gold set. Relation labels are compared the way they are stored, after
+sanitize_rel_type, so "collaborate with" and "COLLABORATE_WITH" match.
+
+Usage: python -m benchmarks.bench_relation_rules --docs 500
+"""
+import argparse
+
+from src.evaluation import calculate_kg_metrics
+from src.graph_db import sanitize_rel_type
+from src.ner_re import KGExtractor
+from benchmarks.common import SAMPLE_TEXT, sample_corpus, timed, report
+
+GOLD = [
+    (SAMPLE_TEXT, [
+        ("Elon Musk", "ceo of", "Tesla"),
+        ("Elon Musk", "ceo of", "SpaceX"),
+        ("Elon Musk", "announce", "mission"),
+        ("mission", "establish", "settlement"),
+        ("SpaceX", "develop", "Starship rocket"),
+        ("NASA", "collaborate with", "SpaceX"),
+    ]),
+    ("The Starship rocket was built by SpaceX in Texas.", [
+        ("SpaceX", "build", "Starship rocket"),
+    ]),
+    ("Tim Cook is the CEO of Apple.", [
+        ("Tim Cook", "ceo of", "Apple"),
+    ]),
+    ("Microsoft acquired GitHub and LinkedIn.", [
+        ("Microsoft", "acquire", "GitHub"),
+        ("Microsoft", "acquire", "LinkedIn"),
+    ]),
+    ("Google and Facebook invest in machine learning research.", [
+        ("Google", "invest in", "machine learning research"),
+        ("Facebook", "invest in", "machine learning research"),
+    ]),
+    ("Jeff Bezos founded Amazon in 1994.", [
+        ("Jeff Bezos", "found", "Amazon"),
+    ]),
+]
+
+def stored_form(triples):
+    return [
+        (t["head"], sanitize_rel_type(t["type"]), t["tail"]) if isinstance(t, dict)
+        else (t[0], sanitize_rel_type(t[1]), t[2])
+        for t in triples
+    ]
+
+def score(extractor):
+    predicted, gold = [], []
+    for text, triples in GOLD:
+        predicted.extend(stored_form(extractor.extract_relations(text)))
+        gold.extend(stored_form(triples))
+    return calculate_kg_metrics(predicted, gold)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=64)
+    args = parser.parse_args()
+
+    texts = sample_corpus(args.docs)
+    rates = {}
+    for engine in ("loop", "rules"):
+        extractor = KGExtractor(relation_engine=engine)
+        extractor.extract_kg(texts[0])  # warm up
+        _, seconds = timed(lambda: list(extractor.extract_kg_batch(texts, batch_size=args.batch_size)))
+        print(f"[{engine}] disabled components: {extractor.disabled or 'none'}")
+        print(f"[{engine}] {score(extractor)}")
+        rates[engine] = report(f"[{engine}] extract_kg_batch", len(texts), seconds)
+    print(f"Speedup: {rates['rules'] / rates['loop']:.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+URL fetching throughput against a local stand-in HTTP server: one blocking
+requests.get per URL versus fetch_urls (pooled session, concurrent workers).
+Also checks that timeouts, retries and the size limit behave as configured.
+
+Usage: python -m benchmarks.bench_sources --urls 64 --latency-ms 50
+"""
+import argparse
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from src.sources import ResponseTooLarge, fetch_urls, make_session
+from benchmarks.common import timed
+
+PAGE = ("<html><body>" + "<p>SpaceX has been developing the Starship rocket.</p>" * 20 + "</body></html>").encode()
+
+class StandInServer(ThreadingHTTPServer):
+    # The default listen backlog of 5 drops concurrent connects into 1 s SYN retries.
+    request_queue_size = 128
+    daemon_threads = True
+
+def make_handler(latency, flaky_counts):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency)
+            if self.path.startswith("/flaky"):
+                # Fails twice, then succeeds: exercises the retry policy.
+                flaky_counts[self.path] = flaky_counts.get(self.path, 0) + 1
+                if flaky_counts[self.path] <= 2:
+                    self.send_response(503)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+            if self.path.startswith("/slow"):
+                time.sleep(5)
+            body = PAGE * 1000 if self.path.startswith("/large") else PAGE
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+    return Handler
+
+def sequential(urls):
+    return [requests.get(url).content for url in urls]
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--urls", type=int, default=64)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--workers", type=int, default=16)
+    args = parser.parse_args()
+
+    server = StandInServer(("127.0.0.1", 0), make_handler(args.latency_ms / 1000, {}))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    urls = [f"{base}/page/{i}" for i in range(args.urls)]
+
+    _, t_seq = timed(sequential, urls)
+    session = make_session(pool_size=args.workers, backoff_factor=0.01)
+    results, t_pool = timed(lambda: list(fetch_urls(urls, max_workers=args.workers, session=session)))
+    assert all(error is None for _, _, error in results)
+    print(f"{args.urls} URLs, {args.latency_ms:.0f} ms server latency")
+    print(f"requests.get per URL:      {t_seq:6.2f}s  {args.urls / t_seq:8.1f} URLs/sec")
+    print(f"fetch_urls ({args.workers} workers):   {t_pool:6.2f}s  {args.urls / t_pool:8.1f} URLs/sec")
+
+    checks = list(fetch_urls(
+        [f"{base}/flaky/1", f"{base}/large", f"{base}/slow"],
+        session=session, timeout=(1, 1), max_bytes=2**20,
+    ))
+    (_, text, flaky_error), (_, _, large_error), (_, _, slow_error) = checks
+    assert flaky_error is None and text, flaky_error
+    assert isinstance(large_error, ResponseTooLarge), large_error
+    assert isinstance(slow_error, requests.exceptions.ConnectionError), slow_error
+    print("retry on 503, size limit and read timeout: ok")
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
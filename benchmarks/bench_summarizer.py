@@ -0,0 +1,31 @@
+"""
+Compare the per-text generate_summary loop against batched generate_summaries.
+
+Usage: python -m benchmarks.bench_summarizer --docs 32 --batch-size 8
+"""
+import argparse
+
+from src.summarizer import Summarizer
+from benchmarks.common import sample_corpus, timed, report
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=32)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--model", default="facebook/bart-large-cnn")
+    args = parser.parse_args()
+
+    summarizer = Summarizer(args.model)
+    # Vary lengths so length-sorted batching has something to do.
+    texts = [t * (1 + i % 4) for i, t in enumerate(sample_corpus(args.docs))]
+    summarizer.generate_summary(texts[0])  # warm up
+
+    _, t_loop = timed(lambda: [summarizer.generate_summary(t) for t in texts])
+    _, t_batch = timed(summarizer.generate_summaries, texts, batch_size=args.batch_size)
+
+    loop_rate = report("generate_summary loop", len(texts), t_loop)
+    batch_rate = report(f"generate_summaries (bs={args.batch_size})", len(texts), t_batch)
+    print(f"Speedup: {batch_rate / loop_rate:.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Latency, peak RSS and ROUGE drift of the summarizer inference backends.
+
+Each backend runs in its own subprocess, so peak RSS is measured in isolation.
+ROUGE is computed with Summarizer.compute_metrics, both against the fp32
+("torch") summaries (drift) and against the CNN/DailyMail reference highlights.
+
+Usage: python -m benchmarks.bench_summarizer_backends --docs 20 --backends torch int8 onnx
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+
+def run_backend(backend, model, split):
+    # Runs inside the worker subprocess.
+    from src.data_loader import load_summarization_data
+    from src.summarizer import Summarizer
+
+    dataset = load_summarization_data(split=split)
+    summarizer = Summarizer(model, backend=backend)
+    summarizer.generate_summary(dataset[0]["article"])  # warm up
+
+    latencies, summaries = [], []
+    for row in dataset:
+        start = time.perf_counter()
+        summaries.append(summarizer.generate_summary(row["article"]))
+        latencies.append(time.perf_counter() - start)
+
+    # ru_maxrss is in kilobytes on Linux.
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return {"latencies": latencies, "peak_rss_mb": peak_rss_mb, "summaries": summaries}
+
+def rouge(summarizer, predictions, references):
+    tokenize = lambda texts: summarizer.tokenizer(texts, padding=True, return_tensors="np")["input_ids"]
+    return summarizer.compute_metrics((tokenize(predictions), tokenize(references)))
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=20)
+    parser.add_argument("--model", default="facebook/bart-large-cnn")
+    parser.add_argument("--backends", nargs="+", default=["torch", "int8", "onnx"])
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    split = f"test[:{args.docs}]"
+
+    if args.worker:
+        json.dump(run_backend(args.worker, args.model, split), sys.stdout)
+        return
+
+    backends = ["torch"] + [b for b in args.backends if b != "torch"]
+    results = {}
+    for backend in backends:
+        out = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_summarizer_backends", "--worker", backend,
+             "--docs", str(args.docs), "--model", args.model],
+            capture_output=True, text=True, check=True,
+        ).stdout
+        # Loader progress is printed to stdout before the JSON payload.
+        results[backend] = json.loads(out[out.index("{"):])
+
+    from src.data_loader import load_summarization_data
+    from src.summarizer import Summarizer
+
+    references = [row["highlights"] for row in load_summarization_data(split=split)]
+    scorer = Summarizer(args.model)
+    baseline = results["torch"]["summaries"]
+
+    print(f"{'backend':<8} {'p50 ms':>9} {'mean ms':>9} {'peak RSS MB':>12} {'rougeL vs fp32':>15} {'rougeL vs ref':>14}")
+    for backend, result in results.items():
+        latencies = sorted(result["latencies"])
+        p50 = latencies[len(latencies) // 2] * 1000
+        mean = sum(latencies) / len(latencies) * 1000
+        drift = rouge(scorer, result["summaries"], baseline)["rougeL"]
+        quality = rouge(scorer, result["summaries"], references)["rougeL"]
+        print(f"{backend:<8} {p50:9.1f} {mean:9.1f} {result['peak_rss_mb']:12.0f} {drift:15.4f} {quality:14.4f}")
+
+if __name__ == "__main__":
+    main()
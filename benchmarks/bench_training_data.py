@@ -0,0 +1,59 @@
+"""
+Tokenization stage and training steps/sec with and without the tokenized cache.
+
+Reports:
+  - tokenize: preprocess_function via a single-process map (previous path),
+    prepare_tokenized_dataset on a cold cache (multiprocess), and on a warm cache
+  - train: steps/sec for a fixed number of steps, on the single-process map
+    output (no cache, lengths computed by the trainer) and on the cached
+    dataset, each with random vs length-grouped batches
+
+Usage: python -m benchmarks.bench_training_data --split "train[:2000]" --steps 20
+"""
+import argparse
+import os
+import tempfile
+
+from src.data_loader import load_summarization_data, preprocess_function, prepare_tokenized_dataset
+from benchmarks.common import timed, report
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--split", default="train[:2000]")
+    parser.add_argument("--model", default="facebook/bart-large-cnn")
+    parser.add_argument("--num-proc", type=int, default=os.cpu_count())
+    parser.add_argument("--steps", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=4)
+    args = parser.parse_args()
+
+    from transformers import AutoTokenizer
+    from src.summarizer import Summarizer
+
+    dataset = load_summarization_data(split=args.split)
+    tokenizer = AutoTokenizer.from_pretrained(args.model)
+    n = len(dataset)
+
+    plain, t_plain = timed(
+        dataset.map, preprocess_function, batched=True, fn_kwargs={"tokenizer": tokenizer},
+        remove_columns=dataset.column_names, load_from_cache_file=False,
+    )
+    with tempfile.TemporaryDirectory() as cache_dir:
+        _, t_cold = timed(prepare_tokenized_dataset, dataset, tokenizer, cache_dir=cache_dir, num_proc=args.num_proc)
+        tokenized, t_warm = timed(prepare_tokenized_dataset, dataset, tokenizer, cache_dir=cache_dir)
+
+        report("tokenize: single-process map", n, t_plain, "examples")
+        report(f"tokenize: cold cache ({args.num_proc} procs)", n, t_cold, "examples")
+        report("tokenize: warm cache (mmap)", n, t_warm, "examples")
+
+        summarizer = Summarizer(args.model)
+        with tempfile.TemporaryDirectory() as output_dir:
+            for source, train_data in (("no cache", plain), ("cache", tokenized)):
+                for grouped in (False, True):
+                    _, seconds = timed(
+                        summarizer.train, {"train": train_data}, output_dir=output_dir,
+                        batch_size=args.batch_size, group_by_length=grouped, max_steps=args.steps,
+                    )
+                    report(f"train ({source}): group_by_length={grouped}", args.steps, seconds, "steps")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+import time
+
+SAMPLE_TEXT = """Elon Musk, the CEO of Tesla and SpaceX, announced a new mission to Mars. 
+The mission aims to establish a permanent human settlement on the Red Planet. 
+SpaceX has been developing the Starship rocket for this purpose. 
+NASA is also collaborating with SpaceX on various lunar missions."""
+
+def sample_corpus(n_docs, text=SAMPLE_TEXT):
+    """
+    Build a synthetic corpus of n_docs slightly varied copies of text.
+    """
+    return [f"{text} This is report number {i}." for i in range(n_docs)]
+
+def timed(fn, *args, **kwargs):
+    """
+    Run fn once and return (result, elapsed_seconds).
+    """
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+def report(name, n_items, seconds, unit="docs"):
+    rate = n_items / seconds if seconds > 0 else float("inf")
+    print(f"{name:<32} {n_items:>7} {unit} in {seconds:8.3f}s  ->  {rate:10.1f} {unit}/sec")
+    return rate
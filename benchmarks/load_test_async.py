@@ -0,0 +1,104 @@
+"""
+Load test: p50/p99 latency of sync versus async GraphRAG (or pipeline) under concurrency.
+
+The sync path serves requests from a single worker thread, the way one
+Streamlit worker would. The async path serves them concurrently from one
+event loop. Requires the Neo4j instance configured in .env.
+
+Usage: python -m benchmarks.load_test_async --requests 200 --concurrency 32
+       python -m benchmarks.load_test_async --target pipeline --requests 16
+"""
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import sample_corpus
+
+QUESTIONS = [
+    "What is Elon Musk connected to?",
+    "What missions is NASA working on?",
+    "Who works with SpaceX?",
+    "What is Tesla connected to?",
+]
+
+def summarize(name, latencies, wall):
+    latencies = sorted(latencies)
+    pick = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+    print(
+        f"{name:<6} {len(latencies):>5} req  p50 {pick(0.5) * 1000:9.1f} ms  p99 {pick(0.99) * 1000:9.1f} ms"
+        f"  throughput {len(latencies) / wall:8.1f} req/s"
+    )
+
+def run_sync(handler, payloads, workers):
+    def timed_call(payload):
+        start = time.perf_counter()
+        handler(payload)
+        return time.perf_counter() - start
+
+    # Latency is measured from submission, so queueing time behind busy workers counts.
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [(time.perf_counter(), pool.submit(timed_call, p)) for p in payloads]
+        latencies = []
+        for submitted, future in futures:
+            future.result()
+            latencies.append(time.perf_counter() - submitted)
+    return latencies, time.perf_counter() - start
+
+async def run_async(handler, payloads, concurrency):
+    gate = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(payload):
+        submitted = time.perf_counter()
+        async with gate:
+            await handler(payload)
+        latencies.append(time.perf_counter() - submitted)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(p) for p in payloads))
+    return latencies, time.perf_counter() - start
+
+async def main_async(args):
+    from src.async_api import AsyncGraphRAG, AsyncKGPipeline, BoundedExecutor
+
+    executor = BoundedExecutor(args.workers)
+    if args.target == "rag":
+        from src.graph_rag import GraphRAG
+        payloads = [QUESTIONS[i % len(QUESTIONS)] for i in range(args.requests)]
+        sync_service = GraphRAG()
+        sync_handler = sync_service.query
+        async_service = await AsyncGraphRAG.create(executor=executor)
+        async_handler = async_service.query
+    else:
+        from src.pipeline import AbstractiveKGPipeline
+        payloads = sample_corpus(args.requests)
+        sync_service = AbstractiveKGPipeline(use_cache=False)
+        sync_handler = sync_service.process
+        async_service = await AsyncKGPipeline.create(executor=executor, use_cache=False)
+        async_handler = async_service.process
+
+    await async_handler(payloads[0])  # warm up
+    sync_handler(payloads[0])
+
+    latencies, wall = run_sync(sync_handler, payloads, workers=1)
+    summarize("sync", latencies, wall)
+    latencies, wall = await run_async(async_handler, payloads, args.concurrency)
+    summarize("async", latencies, wall)
+
+    sync_service.close()
+    await async_service.close()
+    executor.shutdown()
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--target", choices=["rag", "pipeline"], default="rag")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=4, help="Executor threads for CPU-bound work")
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+if __name__ == "__main__":
+    main()
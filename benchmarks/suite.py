@@ -0,0 +1,257 @@
+"""
+Benchmark suite covering every pipeline stage, for catching regressions.
+
+Runs offline on CPU: a tiny summarizer checkpoint from the local Hugging
+Face cache (fetch it once with HF_HUB_OFFLINE=0), spaCy, the in-memory graph
+for storage and GraphRAG, and the fake neo4j driver for the Neo4jConnector
+writers. Inputs are the fixed synthetic corpus plus, with --cnn-dm N, the
+first N CNN/DailyMail test articles from the datasets cache.
+
+Each stage reports throughput, per-call latency percentiles and peak memory.
+Memory is measured in a separate traced run so tracing does not skew the
+timings: "py" is the tracemalloc peak (Python and spaCy allocations), "rss"
+the process high-water mark, which also covers torch but never goes down.
+
+Save a baseline, then compare later runs against it. The run exits with
+status 1 when a stage's throughput or p95 latency is worse than the
+baseline by more than --tolerance:
+
+    python -m benchmarks.suite --save benchmarks/baseline.json
+    python -m benchmarks.suite --compare benchmarks/baseline.json --tolerance 0.25
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import sys
+import time
+import tracemalloc
+
+# Everything must come from local caches; set before transformers/datasets are imported.
+os.environ.setdefault("HF_HUB_OFFLINE", "1")
+os.environ.setdefault("HF_DATASETS_OFFLINE", "1")
+# Storage goes to a fresh in-memory graph, never to a snapshot on disk.
+os.environ.pop("MEMORY_GRAPH_PATH", None)
+
+from benchmarks.common import sample_corpus
+from tests.fake_neo4j import FakeDriver
+
+STAGES = ("summarize", "extract", "store_memory", "store_neo4j", "graph_rag", "graph_rag_cached", "end_to_end")
+TINY_SUMMARIZER = "sshleifer/bart-tiny-random"
+
+QUESTIONS = [
+    "What is SpaceX developing?",
+    "Who is the CEO of Tesla?",
+    "What is NASA collaborating on?",
+    "Tell me about Elon Musk.",
+    "What does the mission aim to establish?",
+]
+
+def percentile(sorted_samples, q):
+    return sorted_samples[min(len(sorted_samples) - 1, int(q * len(sorted_samples)))]
+
+def batched(items, size):
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+def rss_mb():
+    # ru_maxrss is in KiB on Linux and bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (2**20 if sys.platform == "darwin" else 2**10)
+
+def measure(name, make_calls, n_items, repeat):
+    """
+    Time make_calls() (a list of zero-argument callables, one per batch or
+    query) repeat times after a warm-up call, then once more under tracemalloc.
+    """
+    make_calls()[0]()  # warm up: model loading, lazy imports, caches
+
+    latencies = []
+    total = 0.0
+    for _ in range(repeat):
+        for call in make_calls():
+            start = time.perf_counter()
+            call()
+            elapsed = time.perf_counter() - start
+            latencies.append(elapsed)
+            total += elapsed
+
+    tracemalloc.start()
+    try:
+        for call in make_calls():
+            call()
+        py_peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "items": n_items,
+        "calls": len(latencies),
+        "seconds": total,
+        "throughput": n_items * repeat / total if total > 0 else 0.0,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "py_peak_mb": py_peak / 2**20,
+        "rss_peak_mb": rss_mb(),
+    }
+
+def load_inputs(args):
+    texts = sample_corpus(args.docs)
+    if args.cnn_dm:
+        from src.data_loader import load_summarization_data
+        dataset = load_summarization_data("cnn_dailymail", split=f"test[:{args.cnn_dm}]")
+        texts += [row["article"] for row in dataset]
+    return texts
+
+def run_suite(args):
+    import torch
+    from src.graph_db import Neo4jConnector
+    from src.graph_rag import GraphRAG
+    from src.memory_graph import InMemoryGraph
+    from src.pipeline import AbstractiveKGPipeline
+
+    torch.set_num_threads(args.threads)
+    texts = load_inputs(args)
+    batches = batched(texts, args.batch_size)
+    pipeline = AbstractiveKGPipeline(
+        use_cache=False,
+        connect_db=False,
+        summarizer_checkpoint=args.summarizer,
+        spacy_model=args.spacy_model,
+        entity_index=False,
+    )
+    generate = lambda batch: pipeline.summarizer.generate_summaries(
+        batch,
+        batch_size=len(batch),
+        max_length=pipeline.summary_max_length,
+        num_beams=pipeline.summary_num_beams,
+    )
+    extract = lambda batch: [pipeline.resolve(kg) for kg in pipeline.kg_extractor.extract_kg_batch(batch)]
+    stages = set(args.stages)
+    # Storage and retrieval use KGs of the source texts: a tiny summarizer's output is noise.
+    needs_kgs = stages & {"store_memory", "store_neo4j", "graph_rag", "graph_rag_cached"}
+    kg_batches = [extract(batch) for batch in batches] if needs_kgs else []
+    results = {}
+
+    def stage(name, make_calls, n_items):
+        if name not in stages:
+            return
+        results[name] = measure(name, make_calls, n_items, args.repeat)
+        print(format_row(name, results[name]), flush=True)
+
+    print(header())
+    stage("summarize", lambda: [lambda b=b: generate(b) for b in batches], len(texts))
+    stage("extract", lambda: [lambda b=b: extract(b) for b in batches], len(texts))
+
+    def memory_calls():
+        graph = InMemoryGraph()
+        return [lambda kgs=kgs: graph.populate_kg_batch(kgs) for kgs in kg_batches]
+    stage("store_memory", memory_calls, len(texts))
+
+    def neo4j_calls():
+        connector = Neo4jConnector(driver=FakeDriver())
+        return [lambda kgs=kgs: connector.populate_kg_batch(kgs) for kgs in kg_batches]
+    stage("store_neo4j", neo4j_calls, len(texts))
+
+    names = [ent["text"] for kgs in kg_batches for kg in kgs for ent in kg["entities"]]
+    questions = QUESTIONS + [f"What do we know about {name}?" for name in dict.fromkeys(names)][:args.queries]
+    # Uncached, then with the query cache, which the repeats after warm-up hit.
+    for name, cache_size in (("graph_rag", 0), ("graph_rag_cached", 1024)):
+        if name not in stages:
+            continue
+        rag = GraphRAG(args.spacy_model, graph_backend="memory", entity_index=False, cache_size=cache_size)
+        for kgs in kg_batches:
+            rag.db.populate_kg_batch(kgs)
+        stage(name, lambda: [lambda q=q: rag.query(q) for q in questions], len(questions))
+        rag.close()
+
+    def end_to_end_calls():
+        graph = InMemoryGraph()
+        return [lambda b=b: graph.populate_kg_batch(extract(generate(b))) for b in batches]
+    stage("end_to_end", end_to_end_calls, len(texts))
+
+    pipeline.close()
+    return results
+
+def header():
+    return (f"{'stage':<18} {'items/sec':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+            f" {'py MB':>8} {'rss MB':>8}")
+
+def format_row(name, r):
+    return (f"{name:<18} {r['throughput']:10.1f} {r['p50_ms']:9.2f} {r['p95_ms']:9.2f} {r['p99_ms']:9.2f}"
+            f" {r['py_peak_mb']:8.1f} {r['rss_peak_mb']:8.1f}")
+
+def compare(results, baseline, tolerance):
+    """
+    Print current versus baseline per stage; return the names of regressed stages.
+    """
+    regressed = []
+    print(f"\n{'stage':<18} {'throughput':>12} {'p95':>12}  vs baseline")
+    for name, r in results.items():
+        base = baseline["stages"].get(name)
+        if base is None:
+            print(f"{name:<18} {'(new stage)':>12}")
+            continue
+        speed = r["throughput"] / base["throughput"] if base["throughput"] else float("inf")
+        p95 = r["p95_ms"] / base["p95_ms"] if base["p95_ms"] else 1.0
+        slower = speed < 1 - tolerance or p95 > 1 + tolerance
+        if slower:
+            regressed.append(name)
+        print(f"{name:<18} {speed:11.2f}x {p95:11.2f}x  {'REGRESSION' if slower else 'ok'}")
+    return regressed
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=64, help="Synthetic documents")
+    parser.add_argument("--cnn-dm", type=int, default=0, help="Also use the first N CNN/DailyMail test articles")
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--queries", type=int, default=20, help="GraphRAG questions beyond the fixed ones")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--threads", type=int, default=1, help="Torch threads; fixed so runs are comparable")
+    parser.add_argument("--summarizer", default=TINY_SUMMARIZER)
+    parser.add_argument("--spacy-model", default="en_core_web_sm")
+    parser.add_argument("--stages", default=",".join(STAGES), help="Comma-separated subset of " + ", ".join(STAGES))
+    parser.add_argument("--save", help="Write the results to this baseline file")
+    parser.add_argument("--compare", help="Baseline file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative slowdown")
+    args = parser.parse_args()
+    args.stages = [name.strip() for name in args.stages.split(",") if name.strip()]
+    unknown = set(args.stages) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+
+    config = {
+        "docs": args.docs,
+        "cnn_dm": args.cnn_dm,
+        "batch_size": args.batch_size,
+        "threads": args.threads,
+        "summarizer": args.summarizer,
+        "spacy_model": args.spacy_model,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+    }
+    results = run_suite(args)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"config": config, "stages": results}, f, indent=2)
+        print(f"Baseline written to {args.save}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        changed = {key: (baseline["config"].get(key), value) for key, value in config.items()
+                   if baseline["config"].get(key) != value}
+        for key, (old, new) in changed.items():
+            print(f"Warning: {key} differs from the baseline ({old} -> {new})")
+        if not baseline["stages"]:
+            print(f"Warning: {args.compare} has no measurements; regenerate it with --save")
+        regressed = compare(results, baseline, args.tolerance)
+        if regressed:
+            print(f"Regressed stages: {', '.join(regressed)}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,10 @@
+import logging
+
+from src.metrics import metrics, profile
 from src.pipeline import AbstractiveKGPipeline
 
 def main():
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     pipeline = AbstractiveKGPipeline()
 
     # Sample text (e.g., a news snippet)
@@ -14,11 +18,15 @@ def main():
     print(f"Input Text:\n{text.strip()}\n")
 
     try:
-        summary, kg_data = pipeline.process(text)
+        # Set ABSTRACTIVEKG_PROFILE=demo.prof to capture a cProfile of this run.
+        with profile():
+            summary, kg_data = pipeline.process(text)
         
         print("\n--- Final Output ---")
         print("Entities:", [e['text'] for e in kg_data['entities']])
         print("Relations:", [f"{r['head']} -> {r['type']} -> {r['tail']}" for r in kg_data['relations']])
+        print("\n--- Stage Metrics ---")
+        print(metrics.to_json(indent=2))
         
     finally:
         pipeline.close()
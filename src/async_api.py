@@ -0,0 +1,330 @@
+"""
+asyncio variants of GraphRAG and AbstractiveKGPipeline for concurrent serving.
+
+Database calls go through the neo4j async driver. CPU-heavy model and spaCy
+work runs on a bounded thread pool; a semaphore caps in-flight jobs, so a
+burst of requests waits its turn instead of piling up in the executor queue.
+"""
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from neo4j import AsyncGraphDatabase
+
+from src.graph_db import (
+    Neo4jConnector,
+    neo4j_config,
+    notify_write_listeners,
+    DEFAULT_CHUNK_SIZE,
+    ENTITIES_QUERY,
+    ENTITY_FULLTEXT_INDEX,
+    EXPAND_HOP_QUERY,
+    FIND_NEIGHBORS_QUERY,
+    INDEX_QUERIES,
+    MATCH_SEEDS_QUERY,
+)
+from src import registry
+from src.graph_rag import (
+    NO_ENTITIES_MESSAGE,
+    RetrievalCache,
+    _question_entities,
+    _format_answer,
+    link_entities,
+    rank_facts,
+)
+
+logger = logging.getLogger("abstractivekg.async_api")
+
+class BoundedExecutor:
+    """
+    Thread pool plus a semaphore that limits queued and running jobs.
+    """
+    def __init__(self, max_workers=4, max_pending=None):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.max_pending = max_pending or max_workers * 2
+        # Created on first use: before Python 3.10 a Semaphore binds to the loop current at construction.
+        self._slots = None
+
+    async def run(self, fn, *args):
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+        async with self._slots:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, fn, *args)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
+
+class AsyncNeo4jConnector:
+    """
+    Async counterpart of Neo4jConnector for the read/write paths used when serving.
+    """
+    def __init__(self, driver=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.chunk_size = chunk_size
+        # Same contract as Neo4jConnector.write_listeners; listeners run on a worker thread.
+        self.write_listeners = []
+        if driver is None:
+            uri, user, password = neo4j_config()
+            driver = AsyncGraphDatabase.driver(uri, auth=(user, password))
+        self.driver = driver
+
+    async def verify_connectivity(self):
+        await self.driver.verify_connectivity()
+
+    async def close(self):
+        await self.driver.close()
+
+    def add_write_listener(self, listener):
+        if listener not in self.write_listeners:
+            self.write_listeners.append(listener)
+
+    def remove_write_listener(self, listener):
+        if listener in self.write_listeners:
+            self.write_listeners.remove(listener)
+
+    async def ensure_indexes(self):
+        async with self.driver.session() as session:
+            for query in INDEX_QUERIES:
+                result = await session.run(query)
+                await result.consume()
+
+    async def find_neighbors(self, names, limit=10, max_matches=5):
+        """
+        Async version of Neo4jConnector.find_neighbors.
+        """
+        terms = Neo4jConnector._neighbor_terms(names)
+        if not terms:
+            return []
+
+        async with self.driver.session() as session:
+            result = await session.run(
+                FIND_NEIGHBORS_QUERY, terms=terms, index=ENTITY_FULLTEXT_INDEX, limit=limit, max_matches=max_matches
+            )
+            return [(r["entity"], r["source"], r["relation"], r["target"]) async for r in result]
+
+    async def expand(self, names, hops=2, fanout=25, max_matches=5, max_frontier=100):
+        """
+        Async version of Neo4jConnector.expand.
+        """
+        terms = Neo4jConnector._neighbor_terms(names)
+        if not terms:
+            return [], []
+
+        async with self.driver.session() as session:
+            result = await session.run(
+                MATCH_SEEDS_QUERY, terms=terms, index=ENTITY_FULLTEXT_INDEX, max_matches=max_matches
+            )
+            seeds = [r["name"] async for r in result]
+
+            seen = set(seeds)
+            frontier = seeds
+            edges = {}
+            for _ in range(hops):
+                if not frontier:
+                    break
+                result = await session.run(EXPAND_HOP_QUERY, frontier=frontier[:max_frontier], fanout=fanout)
+                frontier = Neo4jConnector._collect_hop([r async for r in result], seen, edges)
+        return seeds, [edge + (support,) for edge, support in edges.items()]
+
+    async def entities(self):
+        """
+        Async version of Neo4jConnector.entities.
+        """
+        async with self.driver.session() as session:
+            result = await session.run(ENTITIES_QUERY)
+            async for record in result:
+                yield record["name"], record["label"]
+
+    @staticmethod
+    async def _run_rows(tx, query, rows):
+        result = await tx.run(query, rows=rows)
+        await result.consume()
+
+    async def populate_kg_batch(self, kg_batch, chunk_size=None, doc_ids=None):
+        writes = Neo4jConnector._bulk_writes(kg_batch, chunk_size or self.chunk_size, doc_ids)
+        async with self.driver.session() as session:
+            for query, rows in writes:
+                await session.execute_write(self._run_rows, query, rows)
+        if self.write_listeners:
+            # Listeners may embed entity names, so they run off the event loop.
+            await asyncio.to_thread(notify_write_listeners, self.write_listeners, kg_batch)
+
+    async def populate_kg(self, kg_data, doc_id=None):
+        await self.populate_kg_batch([kg_data], doc_ids=None if doc_id is None else [doc_id])
+
+class AsyncGraphRAG:
+    """
+    Async GraphRAG with the retrieval of GraphRAG: k-hop expansion ranked by
+    personalized PageRank, vector entity linking and a RetrievalCache. Question
+    parsing and vector search run on the executor, lookups on the async driver.
+    Create with `await AsyncGraphRAG.create()`; pass the db of an
+    AsyncKGPipeline so its writes invalidate the cache.
+    """
+    def __init__(self, db, nlp, executor, hops=2, fanout=25, top_n=20, entity_index=None,
+                 min_similarity=None, cache_size=1024, cache_ttl=300.0, owns_db=True, owns_executor=False):
+        self.db = db
+        self.nlp = nlp
+        self.executor = executor
+        self.owns_executor = owns_executor
+        self.hops = hops
+        self.fanout = fanout
+        self.top_n = top_n
+        self.entity_index = entity_index
+        self.min_similarity = min_similarity
+        self.owns_db = owns_db
+        self.cache = None
+        if cache_size:
+            self.cache = RetrievalCache(cache_size, cache_ttl)
+            db.add_write_listener(self.cache.invalidate)
+
+    @classmethod
+    async def create(cls, max_workers=4, executor=None, db=None, spacy_model="en_core_web_sm",
+                     entity_index=True, **kwargs):
+        owns_executor = executor is None
+        executor = executor or BoundedExecutor(max_workers)
+        nlp = await executor.run(registry.get_spacy, spacy_model)
+        owns_db = db is None
+        if owns_db:
+            db = AsyncNeo4jConnector()
+            await db.verify_connectivity()
+        await db.ensure_indexes()
+        index = await executor.run(registry.get_entity_index) if entity_index else None
+        return cls(db, nlp, executor, entity_index=index, owns_db=owns_db, owns_executor=owns_executor, **kwargs)
+
+    async def query(self, question):
+        """
+        Async version of GraphRAG.query.
+        """
+        entities = await self.question_entities(question)
+        try:
+            seeds, edges = await self.expand(entities) if entities else ([], [])
+            if not seeds and self.entity_index is not None:
+                linked = await self.executor.run(
+                    link_entities, self.entity_index, entities or [question], 3, self.min_similarity
+                )
+                if linked:
+                    entities = entities or linked
+                    seeds, edges = await self.expand(linked)
+        except Exception as e:
+            return f"Error querying database: {e}"
+
+        if not entities:
+            return NO_ENTITIES_MESSAGE
+        return _format_answer(entities, rank_facts(edges, seeds, top_n=self.top_n))
+
+    async def question_entities(self, question):
+        if self.cache is None:
+            return await self.executor.run(_question_entities, self.nlp, question)
+        key = self.cache.question_key(question)
+        entities = self.cache.questions.get(key)
+        if entities is None:
+            entities = await self.executor.run(_question_entities, self.nlp, question)
+            self.cache.questions.put(key, entities)
+        return list(entities)
+
+    async def expand(self, names):
+        if self.cache is None:
+            return await self.db.expand(names, hops=self.hops, fanout=self.fanout)
+        neighbourhoods = []
+        for key in self.cache.entity_keys(names):
+            cached = self.cache.neighbourhoods.get(key)
+            if cached is None:
+                cached = await self.db.expand([key], hops=self.hops, fanout=self.fanout)
+                self.cache.put_neighbourhood(key, *cached)
+            neighbourhoods.append(cached)
+        return self.cache.combine(neighbourhoods)
+
+    async def close(self):
+        if self.cache is not None:
+            self.db.remove_write_listener(self.cache.invalidate)
+        if self.entity_index is not None:
+            registry.release_entity_index()
+            self.entity_index = None
+        if self.owns_db:
+            await self.db.close()
+        if self.owns_executor:
+            await asyncio.to_thread(self.executor.shutdown)
+
+class AsyncKGPipeline:
+    """
+    Async wrapper around AbstractiveKGPipeline: summarization and extraction
+    (including the result cache) and entity resolution run on the executor,
+    storage on the async driver. Create with `await AsyncKGPipeline.create()`,
+    which also seeds entity resolution from the stored graph in the background.
+    """
+    def __init__(self, pipeline, db, executor, entity_index=None, owns_db=True, owns_executor=False):
+        self.pipeline = pipeline
+        self.db = db
+        self.executor = executor
+        self.owns_db = owns_db
+        self.owns_executor = owns_executor
+        self._seeding = None
+        # Kept in sync with the async writes, like AbstractiveKGPipeline.entity_index.
+        self.entity_index = entity_index
+        if db is not None and entity_index is not None:
+            db.add_write_listener(entity_index.on_graph_write)
+
+    @classmethod
+    async def create(cls, max_workers=2, executor=None, db=None, entity_index=True, **pipeline_kwargs):
+        from src.pipeline import AbstractiveKGPipeline
+
+        owns_executor = executor is None
+        executor = executor or BoundedExecutor(max_workers)
+        pipeline = await executor.run(
+            lambda: AbstractiveKGPipeline(connect_db=False, entity_index=False, **pipeline_kwargs)
+        )
+        owns_db = db is None
+        if owns_db:
+            db = AsyncNeo4jConnector()
+            try:
+                await db.verify_connectivity()
+            except Exception as e:
+                logger.warning("Could not connect to Neo4j: %s", e)
+                await db.close()
+                db = None
+        index = await executor.run(registry.get_entity_index) if db is not None and entity_index else None
+        kg_pipeline = cls(pipeline, db, executor, entity_index=index, owns_db=owns_db, owns_executor=owns_executor)
+        if db is not None and pipeline.entity_resolver is not None:
+            # Like AbstractiveKGPipeline: resolve mentions to stored entities; process() waits for it.
+            kg_pipeline._seeding = asyncio.create_task(kg_pipeline._seed_resolver())
+        return kg_pipeline
+
+    async def _seed_resolver(self, batch_size=10_000):
+        resolver = self.pipeline.entity_resolver
+        seeded = 0
+        batch = []
+        try:
+            async for entity in self.db.entities():
+                batch.append(entity)
+                if len(batch) == batch_size:
+                    seeded += await self.executor.run(resolver.seed, batch)
+                    batch = []
+            if batch:
+                seeded += await self.executor.run(resolver.seed, batch)
+            logger.info("Seeded entity resolution with %d stored entities.", seeded)
+        except Exception as e:
+            logger.warning("Could not seed entity resolution from the graph: %s", e)
+
+    async def process(self, text, doc_id=None):
+        summary, kg_data = await self.executor.run(self.pipeline.summarize_and_extract, text)
+        if self._seeding is not None:
+            await self._seeding
+        # SequenceMatcher scoring is CPU-bound, so it stays off the event loop.
+        kg_data = await self.executor.run(self.pipeline.resolve, kg_data)
+        if self.db is not None:
+            await self.db.populate_kg(kg_data, doc_id=doc_id)
+        return summary, kg_data
+
+    async def close(self):
+        if self._seeding is not None and not self._seeding.done():
+            self._seeding.cancel()
+            await asyncio.gather(self._seeding, return_exceptions=True)
+        if self.entity_index is not None:
+            self.db.remove_write_listener(self.entity_index.on_graph_write)
+            registry.release_entity_index()
+            self.entity_index = None
+        if self.db is not None and self.owns_db:
+            await self.db.close()
+        self.pipeline.close()
+        if self.owns_executor:
+            await asyncio.to_thread(self.executor.shutdown)
@@ -0,0 +1,224 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from src.metrics import metrics
+
+DEFAULT_CACHE_PATH = os.path.join(".cache", "abstractivekg.sqlite")
+
+def normalize_text(text):
+    """
+    Normalize text so trivially different copies of a document share a cache key.
+    """
+    text = unicodedata.normalize("NFC", text)
+    return " ".join(text.split())
+
+def make_cache_key(text, **params):
+    """
+    Content-address a document: hash of the normalized text plus the parameters
+    (model checkpoint, generation settings, ...) that determine the output.
+    """
+    payload = json.dumps(params, sort_keys=True, default=str)
+    digest = hashlib.sha256()
+    digest.update(payload.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(normalize_text(text).encode("utf-8"))
+    return digest.hexdigest()
+
+class ResultCache:
+    """
+    Persistent key/value cache: SQLite on disk with an in-memory LRU in front.
+    Values must be JSON-serializable. The disk store is bounded to max_entries
+    and evicts least recently used rows.
+    """
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_entries=100_000, memory_entries=512):
+        self.path = path
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed ON cache(accessed)")
+        self._conn.commit()
+
+    def _remember(self, key, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key):
+        """
+        Return the cached value for key, or None on a miss.
+        """
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                metrics.incr("cache_hits")
+                return self._memory[key]
+
+            row = self._conn.execute("SELECT value FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                metrics.incr("cache_misses")
+                return None
+
+            self._conn.execute("UPDATE cache SET accessed = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            value = json.loads(row[0])
+            self._remember(key, value)
+            self.hits += 1
+            metrics.incr("cache_hits")
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, accessed) VALUES (?, ?, ?)",
+                (key, json.dumps(value), time.time()),
+            )
+            self._evict()
+            self._conn.commit()
+            self._remember(key, value)
+
+    def _evict(self):
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY accessed LIMIT ?)",
+                (overflow,),
+            )
+            self.evictions += overflow
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+            self._conn.commit()
+            self._memory.clear()
+
+    def stats(self):
+        with self._lock:
+            (entries,) = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "evictions": self.evictions,
+            "entries": entries,
+            "memory_entries": len(self._memory),
+        }
+
+    def close(self):
+        self._conn.close()
+
+class TTLCache:
+    """
+    In-memory LRU whose entries expire ttl seconds after they are stored.
+    Entries may carry tags, and invalidate(tags) drops every entry with one of them.
+    """
+    def __init__(self, max_entries=1024, ttl=300.0, name="ttl_cache"):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # Prefix of the hit/miss counters recorded in src.metrics.
+        self.name = name
+        self._entries = OrderedDict()   # key -> (expires_at, value, tags)
+        self._tagged = {}               # tag -> set of keys
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        """
+        Return the cached value for key, or None on a miss or an expired entry.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                self._drop(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                metrics.incr(f"{self.name}_misses")
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            metrics.incr(f"{self.name}_hits")
+            return entry[1]
+
+    def put(self, key, value, tags=()):
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            tags = frozenset(tags)
+            self._entries[key] = (time.monotonic() + self.ttl, value, tags)
+            for tag in tags:
+                self._tagged.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def tagged(self, tag):
+        """
+        Keys of the entries carrying tag.
+        """
+        with self._lock:
+            return list(self._tagged.get(tag, ()))
+
+    def invalidate(self, tags=(), keys=()):
+        """
+        Drop the entries carrying any of tags, and the entries keys. Returns how many were dropped.
+        """
+        with self._lock:
+            doomed = set(key for key in keys if key in self._entries)
+            for tag in tags:
+                doomed.update(self._tagged.get(tag, ()))
+            for key in doomed:
+                self._drop(key)
+            self.invalidations += len(doomed)
+            return len(doomed)
+
+    def _drop(self, key):
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tagged[tag]
+            keys.discard(key)
+            if not keys:
+                del self._tagged[tag]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tagged.clear()
+
+    def stats(self):
+        with self._lock:
+            entries = len(self._entries)
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "entries": entries,
+        }
@@ -1,4 +1,11 @@
-from datasets import load_dataset
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from datasets import load_dataset, load_from_disk, DatasetDict
+
+DEFAULT_TOKENIZED_CACHE_DIR = os.path.join(".cache", "tokenized")
 
 def load_summarization_data(dataset_name="cnn_dailymail", version="3.0.0", split="train[:1%]"):
     """
@@ -34,3 +41,74 @@ def preprocess_function(examples, tokenizer, max_input_length=1024, max_target_l
 
     model_inputs["labels"] = labels["input_ids"]
     return model_inputs
+
+def _add_length(examples):
+    return {"length": [len(ids) for ids in examples["input_ids"]]}
+
+def _tokenized_cache_key(dataset, tokenizer, max_input_length, max_target_length):
+    if isinstance(dataset, DatasetDict):
+        fingerprint = {split: ds._fingerprint for split, ds in sorted(dataset.items())}
+    else:
+        fingerprint = dataset._fingerprint
+    payload = json.dumps({
+        "dataset": fingerprint,
+        "tokenizer": tokenizer.name_or_path,
+        "vocab_size": len(tokenizer),
+        "max_input_length": max_input_length,
+        "max_target_length": max_target_length,
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+def prepare_tokenized_dataset(dataset, tokenizer, max_input_length=1024, max_target_length=128,
+                              cache_dir=DEFAULT_TOKENIZED_CACHE_DIR, num_proc=None):
+    """
+    Tokenize a dataset once and keep the result as an on-disk Arrow cache.
+    Args:
+        dataset (Dataset or DatasetDict): Raw dataset with 'article' and 'highlights' columns.
+        tokenizer (PreTrainedTokenizer): Tokenizer to use.
+        max_input_length (int): Max length for input text.
+        max_target_length (int): Max length for summary.
+        cache_dir (str): Directory holding tokenized caches, one per
+                         dataset/tokenizer/max-length combination.
+        num_proc (int): Worker processes for tokenization (default: all CPUs).
+    Returns:
+        Dataset or DatasetDict: Memory-mapped tokenized data with input_ids,
+        attention_mask, labels and a 'length' column for length-grouped sampling.
+    """
+    key = _tokenized_cache_key(dataset, tokenizer, max_input_length, max_target_length)
+    path = os.path.join(cache_dir, key)
+    if os.path.isdir(path):
+        print(f"Loading tokenized dataset from {path}...")
+        return load_from_disk(path)
+
+    num_proc = num_proc or os.cpu_count()
+    columns = dataset["train"].column_names if isinstance(dataset, DatasetDict) else dataset.column_names
+    print(f"Tokenizing with {num_proc} processes (cache: {path})...")
+    tokenized = dataset.map(
+        preprocess_function,
+        batched=True,
+        num_proc=num_proc,
+        remove_columns=columns,
+        fn_kwargs={
+            "tokenizer": tokenizer,
+            "max_input_length": max_input_length,
+            "max_target_length": max_target_length,
+        },
+    )
+    tokenized = tokenized.map(_add_length, batched=True, num_proc=num_proc)
+    # Save next to the final directory and rename it into place, so an interrupted
+    # run never leaves a partial cache that later runs would load.
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = tempfile.mkdtemp(prefix=f"{key}.tmp-", dir=cache_dir)
+    try:
+        tokenized.save_to_disk(tmp)
+        os.replace(tmp, path)
+    except OSError:
+        # Another process finished the same cache first; keep its copy.
+        if not os.path.isdir(path):
+            raise
+    finally:
+        if os.path.isdir(tmp):
+            shutil.rmtree(tmp)
+    # Reload so training reads memory-mapped Arrow files instead of in-process copies.
+    return load_from_disk(path)
@@ -0,0 +1,442 @@
+"""
+Vector index over entity names for semantic entity linking in GraphRAG.
+
+Each entity is embedded once, from its name plus the relations it was first
+stored with ("SpaceX: develop Starship; collaborate NASA"), so a paraphrase
+such as "the rocket company" can still find it. Small indexes are searched
+exactly; from ivf_threshold vectors on, the index trains an IVF partition
+(k-means centroids + inverted lists) and scans only the n_probe closest lists.
+Training runs on a background thread; searches use exact scoring or the
+previous partition meanwhile. Vectors are kept as a .npy file that is
+memory-mapped on load and saved at most every save_interval seconds and at exit.
+
+Semantic linking is opt-in: it needs an encoder with real word or sentence
+vectors, configured with $ENTITY_ENCODER (see registry.get_entity_index).
+"""
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+
+from src import registry
+
+DEFAULT_INDEX_PATH = ".cache/entity_index"
+MAX_CONTEXTS = 5
+# Minimum cosine similarity for a link, per encoder kind. Averaged static word
+# vectors score unrelated short texts higher than sentence embeddings do.
+MIN_SIMILARITY = {"spacy": 0.7, "sentence-transformers": 0.5}
+# Removed entities are compacted away once they are this share of the index.
+COMPACT_RATIO = 0.25
+
+logger = logging.getLogger("abstractivekg.entity_index")
+
+def default_min_similarity(encoder):
+    return MIN_SIMILARITY["spacy" if encoder.startswith("spacy:") else "sentence-transformers"]
+
+def load_encoder(name):
+    """
+    Encoder callable (texts -> float32 array) for name: "spacy:<model>" for
+    averaged spaCy word vectors (the model must ship static vectors, e.g.
+    en_core_web_md), or a sentence-transformers model name (requires the
+    optional `embeddings` extra).
+    """
+    if name.startswith("spacy:"):
+        nlp = registry.get_spacy(name[len("spacy:"):])
+        if not nlp.vocab.vectors.size:
+            # Averaged tok2vec tensors (e.g. en_core_web_sm) rate unrelated texts as similar.
+            raise ValueError(f"spaCy model '{name[len('spacy:'):]}' has no word vectors; use e.g. spacy:en_core_web_md")
+        # Static vectors only need the tokenizer, not the rest of the pipeline.
+        return lambda texts: np.array(
+            [nlp.make_doc(t).vector for t in texts], dtype=np.float32
+        ).reshape(len(texts), -1)
+
+    from sentence_transformers import SentenceTransformer
+    model = SentenceTransformer(name, device="cpu")
+    return lambda texts: model.encode(list(texts), batch_size=64, convert_to_numpy=True).astype(np.float32)
+
+def _normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+def _kmeans(vectors, n_clusters, iterations=10, seed=0):
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), n_clusters, replace=False)].copy()
+    for _ in range(iterations):
+        assign = _nearest(vectors, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, vectors)
+        counts = np.bincount(assign, minlength=n_clusters)
+        # Empty clusters keep their previous centroid.
+        filled = counts > 0
+        centroids[filled] = sums[filled] / counts[filled, None]
+        centroids = _normalize(centroids)
+    return centroids
+
+def _nearest(vectors, centroids, block=65_536):
+    # Blocked so assigning millions of vectors does not materialize one huge score matrix.
+    return np.concatenate([
+        np.argmax(vectors[i:i + block] @ centroids.T, axis=1) for i in range(0, len(vectors), block)
+    ]) if len(vectors) else np.zeros(0, dtype=np.int64)
+
+class EntityIndex:
+    """
+    Incremental approximate nearest-neighbour index from text to entity names.
+    Register on_graph_write as a graph store write listener to keep it in sync
+    with populate_kg and removals, and fill an empty index from an existing
+    graph with backfill(). Safe to use from several threads.
+    """
+    def __init__(self, path, encoder, n_probe=8, ivf_threshold=50_000, save_interval=60.0, min_similarity=None):
+        # path: directory loaded on start, written after writes (at most every
+        # save_interval seconds) and at exit.
+        self.path = path
+        self.encoder_name = encoder
+        self.n_probe = n_probe
+        self.ivf_threshold = ivf_threshold
+        self.save_interval = save_interval
+        self.min_similarity = default_min_similarity(encoder) if min_similarity is None else min_similarity
+        # Removed entities leave a None name (a tombstone) until compact().
+        self.names = []
+        self._ids = {}
+        self._removed = 0
+        self._vectors = np.zeros((0, 0), dtype=np.float32)
+        self._size = 0
+        self._centroids = None
+        self._assign = np.zeros(0, dtype=np.int64)
+        self._trained_size = 0
+        self._lists = None
+        self._live = None
+        # Bumped by compact(), which renumbers rows under a running training.
+        self._generation = 0
+        self._encode = None
+        self._dirty = False
+        # Bumped by every change, so save() knows whether it wrote the latest state.
+        self._version = 0
+        self._saved_at = time.monotonic()
+        self._lock = threading.RLock()
+        self._encoder_lock = threading.Lock()
+        self._training = None
+        self._saving = None
+        self._backfilling = None
+
+        if path and os.path.exists(os.path.join(path, "meta.json")):
+            self._load(path)
+        if path:
+            atexit.register(self.close)
+
+    def __len__(self):
+        return self._size - self._removed
+
+    def __contains__(self, name):
+        return name in self._ids
+
+    def encode(self, texts):
+        with self._encoder_lock:
+            if self._encode is None:
+                self._encode = load_encoder(self.encoder_name)
+        return _normalize(self._encode(texts))
+
+    def add(self, names, contexts=None):
+        """
+        Index names that are not indexed yet; contexts optionally maps a name to the
+        text to embed for it. Returns the number of names added.
+        """
+        contexts = contexts or {}
+        new = [n for n in dict.fromkeys(names) if n.strip() and n not in self._ids]
+        if not new:
+            return 0
+
+        # Encoding is the slow part and needs no lock; names indexed meanwhile are skipped below.
+        vectors = self.encode([contexts.get(n, n) for n in new])
+        with self._lock:
+            fresh = [i for i, name in enumerate(new) if name not in self._ids]
+            new, vectors = [new[i] for i in fresh], vectors[fresh]
+            if not new:
+                return 0
+            self._reserve(self._size + len(new), vectors.shape[1])
+            self._vectors[self._size:self._size + len(new)] = vectors
+            for name in new:
+                self._ids[name] = len(self.names)
+                self.names.append(name)
+            self._size += len(new)
+            self._live = None
+
+            if self._centroids is not None:
+                self._assign = np.concatenate([self._assign, _nearest(vectors, self._centroids)])
+                self._lists = None
+            self._touch()
+            # (Re)train once the index outgrows exact search or quadruples since the last training.
+            if self._size >= self.ivf_threshold and self._size >= 4 * self._trained_size:
+                self._start("_training", self.train)
+        self._autosave()
+        return len(new)
+
+    def remove(self, names):
+        """
+        Drop names from the index. Returns the number of names removed.
+        """
+        removed = 0
+        with self._lock:
+            for name in names:
+                i = self._ids.pop(name, None)
+                if i is not None:
+                    self.names[i] = None
+                    removed += 1
+            if removed:
+                self._removed += removed
+                self._live = None
+                self._touch()
+                if self._removed > COMPACT_RATIO * self._size:
+                    self.compact()
+        self._autosave()
+        return removed
+
+    def compact(self):
+        """
+        Drop removed entities' vectors and renumber the rest. Runs
+        automatically once removed entities are COMPACT_RATIO of the index.
+        """
+        with self._lock:
+            if not self._removed:
+                return
+            live = self._live_mask()
+            keep = np.flatnonzero(live)
+            self._vectors = np.ascontiguousarray(self._vectors[:self._size][keep])
+            self.names = [self.names[i] for i in keep]
+            self._ids = {name: i for i, name in enumerate(self.names)}
+            if self._centroids is not None:
+                self._assign = self._assign[keep]
+            self._trained_size = int(live[:self._trained_size].sum())
+            self._size = len(self.names)
+            self._removed = 0
+            self._live = None
+            self._lists = None
+            self._generation += 1
+            self._touch()
+
+    def add_kg_batch(self, kg_batch):
+        """
+        Index the new entities of stored KG documents, each with the relations
+        it appears in as context.
+        """
+        contexts = {}
+        names = []
+        for kg_data in kg_batch:
+            for ent in kg_data.get("entities", []):
+                names.append(ent["text"])
+            for rel in kg_data.get("relations", []):
+                names.extend((rel["head"], rel["tail"]))
+                contexts.setdefault(rel["head"], []).append(f"{rel['type']} {rel['tail']}")
+                contexts.setdefault(rel["tail"], []).append(f"{rel['head']} {rel['type']}")
+        texts = {
+            name: f"{name}: " + "; ".join(ctx[:MAX_CONTEXTS])
+            for name, ctx in contexts.items()
+        }
+        return self.add(names, texts)
+
+    def on_graph_write(self, kg_batch, removed=False):
+        """
+        Graph store write listener: index the entities of stored KG documents,
+        and drop the entities that a removal deleted from the graph.
+        """
+        if removed:
+            self.remove(ent["text"] for kg_data in kg_batch for ent in kg_data.get("entities", []))
+        else:
+            self.add_kg_batch(kg_batch)
+
+    def backfill(self, names, batch_size=1024, background=False):
+        """
+        Index entity names from an existing graph (e.g. graph_store.entity_names()),
+        in batches. Returns the number of names added, or None when
+        background=True starts the backfill on a background thread instead.
+        """
+        if background:
+            self._start("_backfilling", lambda: self.backfill(names, batch_size))
+            return None
+        added = 0
+        batch = []
+        for name in names:
+            batch.append(name)
+            if len(batch) == batch_size:
+                added += self.add(batch)
+                batch = []
+        if batch:
+            added += self.add(batch)
+        logger.info("Backfilled %d entities into the entity index.", added)
+        return added
+
+    def search(self, texts, k=5):
+        """
+        k nearest entity names for each text, as lists of (name, cosine similarity).
+        Callers should drop matches below min_similarity.
+        """
+        if not len(self) or not texts:
+            return [[] for _ in texts]
+        queries = self.encode(texts)
+
+        results = []
+        with self._lock:
+            vectors = self._vectors[:self._size]
+            live = self._live_mask()
+            for query in queries:
+                if self._centroids is None:
+                    candidates = np.flatnonzero(live) if live is not None else None
+                else:
+                    indptr, order = self._inverted_lists()
+                    probe = np.argsort(-(self._centroids @ query))[:self.n_probe]
+                    candidates = np.concatenate([order[indptr[c]:indptr[c + 1]] for c in probe])
+                    if live is not None:
+                        candidates = candidates[live[candidates]]
+                scores = vectors @ query if candidates is None else vectors[candidates] @ query
+                if not len(scores):
+                    results.append([])
+                    continue
+                top = np.argpartition(-scores, min(k, len(scores)) - 1)[:k]
+                top = top[np.argsort(-scores[top], kind="stable")]
+                ids = top if candidates is None else candidates[top]
+                results.append([(self.names[i], float(scores[j])) for i, j in zip(ids, top)])
+        return results
+
+    def train(self):
+        """
+        Partition the index into about 4 * sqrt(n) IVF lists. Runs on a
+        background thread when triggered by add(); call it directly to rebuild
+        the partition synchronously.
+        """
+        with self._lock:
+            size = self._size
+            vectors = self._vectors[:size]
+            generation = self._generation
+        if not size:
+            return
+        n_lists = max(1, int(4 * np.sqrt(size)))
+        rng = np.random.default_rng(0)
+        # k-means on a sample keeps training time independent of the index size.
+        sample = vectors[np.sort(rng.choice(size, min(size, 32 * n_lists), replace=False))]
+        centroids = _kmeans(np.asarray(sample), n_lists)
+        # Rows below size never change, so they are assigned without holding the lock.
+        assign = _nearest(vectors, centroids)
+        with self._lock:
+            if self._generation != generation:
+                # Compacted meanwhile: these assignments are for the old row numbers.
+                return
+            added = self._vectors[size:self._size]
+            self._centroids = centroids
+            self._assign = np.concatenate([assign, _nearest(added, centroids)])
+            self._trained_size = size
+            self._lists = None
+            self._touch()
+        logger.info("Trained the entity index on %d vectors (%d lists).", size, n_lists)
+
+    # --- Persistence ---
+
+    def close(self):
+        for thread in (self._training, self._saving):
+            if thread is not None:
+                thread.join()
+        if self.path and self._dirty:
+            self.save(self.path)
+        if self.path:
+            # The exit hook would otherwise keep the index alive for the life of the process.
+            atexit.unregister(self.close)
+
+    def save(self, path=None):
+        path = path or self.path
+        os.makedirs(path, exist_ok=True)
+        with self._lock:
+            arrays = {"vectors": self._vectors[:self._size], "assign": self._assign}
+            if self._centroids is not None:
+                arrays["centroids"] = self._centroids
+            meta = {
+                "names": list(self.names),
+                "encoder": self.encoder_name,
+                "trained_size": self._trained_size,
+                "ivf": self._centroids is not None,
+            }
+            version = self._version
+        try:
+            self._write(path, arrays, meta)
+        finally:
+            self._saved_at = time.monotonic()
+        # Still dirty if the write failed (so the next write retries) or the index changed meanwhile.
+        with self._lock:
+            if self._version == version:
+                self._dirty = False
+
+    @staticmethod
+    def _write(path, arrays, meta):
+        for name, array in arrays.items():
+            # Write-then-rename: the current arrays may be memory-mapped from these files.
+            target = os.path.join(path, f"{name}.npy")
+            with open(target + ".tmp", "wb") as f:
+                np.save(f, np.asarray(array))
+            os.replace(target + ".tmp", target)
+        tmp = os.path.join(path, "meta.json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, os.path.join(path, "meta.json"))
+
+    def _load(self, path):
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta["encoder"] != self.encoder_name:
+            # Vectors from another encoder are not comparable; start over.
+            return
+        self.names = meta["names"]
+        self._ids = {name: i for i, name in enumerate(self.names) if name is not None}
+        self._removed = len(self.names) - len(self._ids)
+        arr = lambda name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+        self._vectors = arr("vectors")
+        self._size = len(self.names)
+        self._assign = np.asarray(arr("assign"))
+        self._trained_size = meta["trained_size"]
+        if meta["ivf"]:
+            self._centroids = np.asarray(arr("centroids"))
+
+    # --- Internals ---
+
+    def _touch(self):
+        self._dirty = True
+        self._version += 1
+
+    def _start(self, attr, target):
+        # One background thread per kind of job; a job requested while one runs is skipped.
+        thread = getattr(self, attr)
+        if thread is not None and thread.is_alive():
+            return
+        thread = threading.Thread(target=target, name=f"entity-index{attr}", daemon=True)
+        setattr(self, attr, thread)
+        thread.start()
+
+    def _autosave(self):
+        if self.path and self._dirty and time.monotonic() - self._saved_at >= self.save_interval:
+            self._start("_saving", self.save)
+
+    def _live_mask(self):
+        # None while nothing was removed, so the common case skips masking.
+        if not self._removed:
+            return None
+        if self._live is None:
+            self._live = np.array([name is not None for name in self.names], dtype=bool)
+        return self._live
+
+    def _reserve(self, size, dim):
+        if size <= len(self._vectors) and self._vectors.shape[1] == dim:
+            return
+        # Grow geometrically; this also copies a memory-mapped index into memory on first write.
+        grown = np.zeros((max(size, 2 * len(self._vectors), 1024), dim), dtype=np.float32)
+        if self._size:
+            grown[:self._size] = self._vectors[:self._size]
+        self._vectors = grown
+
+    def _inverted_lists(self):
+        # CSR-style inverted lists, rebuilt lazily after writes: list c holds order[indptr[c]:indptr[c + 1]].
+        if self._lists is None:
+            order = np.argsort(self._assign, kind="stable")
+            indptr = np.zeros(len(self._centroids) + 1, dtype=np.int64)
+            np.cumsum(np.bincount(self._assign, minlength=len(self._centroids)), out=indptr[1:])
+            self._lists = (indptr, order)
+        return self._lists
@@ -0,0 +1,183 @@
+import json
+import re
+import threading
+from difflib import SequenceMatcher
+
+from src.cache import normalize_text
+
+_TOKEN = re.compile(r"\w+")
+_LEADING_ARTICLES = ("the ", "a ", "an ")
+_ACRONYM_STOPWORDS = {"and", "of", "the", "for", "&"}
+
+def normalize_name(name):
+    """
+    Normalized surface form: normalize_text, then lowercase, no possessive,
+    punctuation or leading article. Shared by entity resolution and GraphRAG.
+    """
+    name = normalize_text(name).lower().replace("’", "'")
+    name = re.sub(r"'s\b", "", name)
+    name = " ".join(_TOKEN.findall(name))
+    for article in _LEADING_ARTICLES:
+        if name.startswith(article):
+            return name[len(article):]
+    return name
+
+def acronym(name):
+    """
+    Initials of a multi-word name, e.g. "National Aeronautics and Space Administration" -> "nasa".
+    """
+    words = [w for w in _TOKEN.findall(name.lower()) if w not in _ACRONYM_STOPWORDS]
+    return "".join(w[0] for w in words) if len(words) > 1 else None
+
+class EntityResolver:
+    """
+    Incremental entity canonicalization for extracted mentions.
+    Each mention is mapped to a canonical entity ID, and each ID keeps the first
+    surface form it was seen with. Resolution order:
+      1. exact normalized form or registered alias
+      2. acronym of a known multi-word entity ("NASA")
+      3. surname of a known person ("Musk" -> "Elon Musk")
+      4. string similarity >= similarity_threshold, against candidates that share
+         a word with the mention (blocking)
+    Steps 1-3 are hash lookups. Step 4 only scores candidates from the mention's
+    rarest word block, and blocks larger than max_block_size are skipped, so
+    the cost per mention does not grow with the number of entities.
+    """
+    def __init__(self, similarity_threshold=0.9, max_block_size=200, aliases=None):
+        self.similarity_threshold = similarity_threshold
+        self.max_block_size = max_block_size
+        self.canonical_names = []
+        self.labels = []
+        self._by_form = {}
+        self._by_compact = {}
+        self._by_acronym = {}
+        self._by_surname = {}
+        self._blocks = {}
+        self._lock = threading.Lock()
+        for alias, canonical in (aliases or {}).items():
+            self.add_alias(alias, canonical)
+
+    @classmethod
+    def from_alias_file(cls, path, **kwargs):
+        """
+        Build a resolver from a JSON file mapping alias -> canonical name.
+        """
+        with open(path, encoding="utf-8") as f:
+            return cls(aliases=json.load(f), **kwargs)
+
+    def add_alias(self, alias, canonical):
+        with self._lock:
+            entity_id = self._lookup(canonical)
+            if entity_id is None:
+                entity_id = self._register(canonical, None)
+            self._by_form[normalize_name(alias)] = entity_id
+
+    def seed(self, entities):
+        """
+        Register existing (name, label) entities, e.g. graph_store.entities(),
+        as canonical. Returns the number of entities registered.
+        """
+        added = 0
+        with self._lock:
+            for name, label in entities:
+                if self._lookup(name) is None:
+                    self._register(name, label)
+                    added += 1
+        return added
+
+    def resolve(self, mention, label=None):
+        """
+        Canonical entity ID for mention, registering a new entity when nothing matches.
+        """
+        with self._lock:
+            entity_id = self._lookup(mention, label)
+            if entity_id is None:
+                entity_id = self._register(mention, label)
+            return entity_id
+
+    def canonical(self, mention, label=None):
+        return self.canonical_names[self.resolve(mention, label)]
+
+    def resolve_kg(self, kg_data):
+        """
+        Copy of kg_data with entity, head and tail names replaced by canonical names.
+        Entities keep their original surface form in "mention".
+        """
+        labels = {ent["text"]: ent["label"] for ent in kg_data.get("entities", [])}
+        entities = [
+            dict(ent, text=self.canonical(ent["text"], ent["label"]), mention=ent["text"])
+            for ent in kg_data.get("entities", [])
+        ]
+        relations = [
+            dict(
+                rel,
+                head=self.canonical(rel["head"], labels.get(rel["head"])),
+                tail=self.canonical(rel["tail"], labels.get(rel["tail"])),
+            )
+            for rel in kg_data.get("relations", [])
+        ]
+        return dict(kg_data, entities=entities, relations=relations)
+
+    def __len__(self):
+        return len(self.canonical_names)
+
+    def _compatible(self, entity_id, label):
+        known = self.labels[entity_id]
+        return label is None or known is None or known == label
+
+    def _lookup(self, mention, label=None):
+        form = normalize_name(mention)
+        if not form:
+            return None
+
+        entity_id = self._by_form.get(form)
+        if entity_id is None:
+            # Spacing variants: "Space X" / "SpaceX".
+            entity_id = self._by_compact.get(form.replace(" ", ""))
+        if entity_id is not None:
+            return entity_id
+
+        tokens = form.split()
+        if len(tokens) == 1:
+            entity_id = self._by_acronym.get(form)
+            if entity_id is not None and mention.isupper():
+                return entity_id
+            # A lone surname resolves only if exactly one known person has it, and only for
+            # PERSON mentions: unlabeled relation endpoints ("cook", "price") are not names.
+            people = self._by_surname.get(form)
+            if people and len(people) == 1 and label == "PERSON":
+                return people[0]
+
+        blocks = [self._blocks[t] for t in tokens if t in self._blocks]
+        blocks = [b for b in blocks if len(b) <= self.max_block_size]
+        if not blocks:
+            return None
+        best, best_score = None, self.similarity_threshold
+        for candidate in min(blocks, key=len):
+            if not self._compatible(candidate, label):
+                continue
+            score = SequenceMatcher(None, form, normalize_name(self.canonical_names[candidate])).ratio()
+            if score >= best_score:
+                best, best_score = candidate, score
+        return best
+
+    def _register(self, name, label):
+        entity_id = len(self.canonical_names)
+        self.canonical_names.append(name)
+        self.labels.append(label)
+
+        form = normalize_name(name)
+        self._by_form.setdefault(form, entity_id)
+        self._by_compact.setdefault(form.replace(" ", ""), entity_id)
+        short = acronym(name)
+        if short:
+            self._by_acronym.setdefault(short, entity_id)
+        tokens = form.split()
+        if label == "PERSON" and len(tokens) > 1:
+            self._by_surname.setdefault(tokens[-1], []).append(entity_id)
+        for token in set(tokens):
+            block = self._blocks.setdefault(token, [])
+            # Past the cap a block is never scanned, so stop growing it.
+            if len(block) <= self.max_block_size:
+                block.append(entity_id)
+        return entity_id
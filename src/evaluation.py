@@ -1,3 +1,8 @@
+from difflib import SequenceMatcher
+from multiprocessing import Pool
+
+import numpy as np
+
 def calculate_kg_metrics(predicted_triples, gold_triples):
     """
     Calculate Precision, Recall, and F1 for extracted triples.
@@ -31,3 +36,155 @@ def calculate_kg_metrics(predicted_triples, gold_triples):
         "recall": round(recall, 4),
         "f1": round(f1, 4)
     }
+
+_ARTICLES = ("the ", "a ", "an ")
+
+def normalize_span(text):
+    """
+    Normalize an entity span for lenient matching: lowercase, strip punctuation
+    and leading articles, collapse whitespace.
+    """
+    text = "".join(ch if ch.isalnum() or ch.isspace() else " " for ch in text.lower())
+    text = " ".join(text.split())
+    for article in _ARTICLES:
+        if text.startswith(article):
+            return text[len(article):]
+    return text
+
+def _as_tuple(t):
+    return (t['head'], t['type'], t['tail']) if isinstance(t, dict) else tuple(t)
+
+def _prf(tp, n_pred, n_gold):
+    # Element-wise precision/recall/F1 with the same 0/0 -> 0.0 convention as calculate_kg_metrics.
+    tp, n_pred, n_gold = (np.asarray(a, dtype=np.float64) for a in (tp, n_pred, n_gold))
+    precision = np.divide(tp, n_pred, out=np.zeros_like(tp), where=n_pred > 0)
+    recall = np.divide(tp, n_gold, out=np.zeros_like(tp), where=n_gold > 0)
+    denom = precision + recall
+    f1 = np.divide(2 * precision * recall, denom, out=np.zeros_like(tp), where=denom > 0)
+    return precision, recall, f1
+
+def _fuzzy_true_positives(pred, gold, threshold):
+    # Greedy one-to-one matching of same-type triples whose head and tail are similar enough.
+    matched = set()
+    tp = []
+    for head, rel_type, tail in pred:
+        for j, (g_head, g_type, g_tail) in enumerate(gold):
+            if j in matched or g_type != rel_type:
+                continue
+            if (SequenceMatcher(None, head, g_head).ratio() >= threshold
+                    and SequenceMatcher(None, tail, g_tail).ratio() >= threshold):
+                matched.add(j)
+                tp.append(rel_type)
+                break
+    return tp
+
+def _score_chunk(args):
+    """
+    Score one chunk of documents. Strings are interned to integer IDs and the
+    exact/normalized matching is done with numpy row operations.
+    Returns per-document (tp, n_pred, n_gold) arrays and per-type count arrays.
+    """
+    chunk, match, threshold = args
+
+    ids = {}
+    intern = lambda s: ids.setdefault(s, len(ids))
+    prep = normalize_span if match != "exact" else (lambda s: s)
+
+    pred_rows, gold_rows = [], []
+    fuzzy_tp_rows = []
+    for doc_idx, (_, predicted, gold) in enumerate(chunk):
+        pred_set = {(prep(h), r.lower() if match != "exact" else r, prep(t)) for h, r, t in map(_as_tuple, predicted)}
+        gold_set = {(prep(h), r.lower() if match != "exact" else r, prep(t)) for h, r, t in map(_as_tuple, gold)}
+        pred_rows.extend((doc_idx, intern(h), intern(r), intern(t)) for h, r, t in pred_set)
+        gold_rows.extend((doc_idx, intern(h), intern(r), intern(t)) for h, r, t in gold_set)
+        if match == "fuzzy":
+            fuzzy_tp_rows.extend((doc_idx, intern(r)) for r in _fuzzy_true_positives(sorted(pred_set), sorted(gold_set), threshold))
+
+    n_docs, n_ids = len(chunk), len(ids)
+    pred = np.array(pred_rows, dtype=np.int64).reshape(-1, 4)
+    gold = np.array(gold_rows, dtype=np.int64).reshape(-1, 4)
+
+    if match == "fuzzy":
+        tp_rows = np.array(fuzzy_tp_rows, dtype=np.int64).reshape(-1, 2)
+    else:
+        # Rows are already unique per document, so a row seen twice is in both pred and gold.
+        both, counts = np.unique(np.concatenate([pred, gold]), axis=0, return_counts=True)
+        tp_rows = both[counts == 2][:, [0, 2]]
+
+    names = np.empty(n_ids, dtype=object)
+    for s, i in ids.items():
+        names[i] = s
+    type_ids = np.unique(np.concatenate([pred[:, 2], gold[:, 2]]))
+    return {
+        "doc_ids": [doc_id for doc_id, _, _ in chunk],
+        "tp": np.bincount(tp_rows[:, 0], minlength=n_docs),
+        "n_pred": np.bincount(pred[:, 0], minlength=n_docs),
+        "n_gold": np.bincount(gold[:, 0], minlength=n_docs),
+        "types": list(names[type_ids]),
+        "type_tp": np.bincount(tp_rows[:, 1], minlength=n_ids)[type_ids],
+        "type_pred": np.bincount(pred[:, 2], minlength=n_ids)[type_ids],
+        "type_gold": np.bincount(gold[:, 2], minlength=n_ids)[type_ids],
+    }
+
+def _chunked(stream, size):
+    chunk = []
+    for item in stream:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def evaluate_corpus(stream, match="exact", fuzzy_threshold=0.9, n_processes=1, chunk_size=1000):
+    """
+    Corpus-scale triple evaluation.
+    stream: iterable of (doc_id, predicted_triples, gold_triples); triples are dicts or
+            (head, type, tail) tuples, as in calculate_kg_metrics.
+    match: "exact", "normalized" (lowercased, punctuation/article-insensitive head, type
+           and tail) or "fuzzy" (normalized, plus head/tail string similarity >= fuzzy_threshold).
+    n_processes: score chunks of chunk_size documents in that many worker processes.
+    Returns micro and macro (per-document average) precision/recall/F1 and a
+    per-relation-type breakdown.
+    """
+
+    if match not in ("exact", "normalized", "fuzzy"):
+        raise ValueError(f"Unknown match mode '{match}'")
+
+    jobs = ((chunk, match, fuzzy_threshold) for chunk in _chunked(stream, chunk_size))
+    if n_processes > 1:
+        with Pool(n_processes) as pool:
+            parts = list(pool.imap(_score_chunk, jobs))
+    else:
+        parts = [_score_chunk(job) for job in jobs]
+
+    tp = np.concatenate([p["tp"] for p in parts]) if parts else np.zeros(0, dtype=np.int64)
+    n_pred = np.concatenate([p["n_pred"] for p in parts]) if parts else np.zeros(0, dtype=np.int64)
+    n_gold = np.concatenate([p["n_gold"] for p in parts]) if parts else np.zeros(0, dtype=np.int64)
+
+    type_counts = {}
+    for p in parts:
+        for name, t_tp, t_pred, t_gold in zip(p["types"], p["type_tp"], p["type_pred"], p["type_gold"]):
+            counts = type_counts.setdefault(name, [0, 0, 0])
+            counts[0] += int(t_tp)
+            counts[1] += int(t_pred)
+            counts[2] += int(t_gold)
+
+    micro = _prf(tp.sum(), n_pred.sum(), n_gold.sum())
+    doc_p, doc_r, doc_f1 = _prf(tp, n_pred, n_gold)
+
+    names = sorted(type_counts)
+    counts = np.array([type_counts[n] for n in names], dtype=np.int64).reshape(-1, 3)
+    type_p, type_r, type_f1 = _prf(counts[:, 0], counts[:, 1], counts[:, 2])
+
+    summarize = lambda p, r, f: {"precision": round(float(p), 4), "recall": round(float(r), 4), "f1": round(float(f), 4)}
+    mean = lambda a: a.mean() if len(a) else 0.0
+    return {
+        "documents": int(len(tp)),
+        "micro": summarize(*micro),
+        "macro": summarize(mean(doc_p), mean(doc_r), mean(doc_f1)),
+        "per_type": {
+            name: dict(summarize(type_p[i], type_r[i], type_f1[i]), support=int(counts[i, 2]))
+            for i, name in enumerate(names)
+        },
+    }
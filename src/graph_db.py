@@ -1,18 +1,191 @@
 from neo4j import GraphDatabase
+import logging
 import os
+import re
+import time
 from dotenv import load_dotenv
+from src.metrics import metrics
 
 load_dotenv()
 
+logger = logging.getLogger("abstractivekg.graph_db")
+
+DEFAULT_CHUNK_SIZE = 1000
+ENTITY_FULLTEXT_INDEX = "entity_name_fulltext"
+
+FIND_NEIGHBORS_QUERY = (
+    "UNWIND $terms AS term "
+    "CALL { "
+    "  WITH term "
+    "  CALL db.index.fulltext.queryNodes($index, term.query) YIELD node, score "
+    "  WITH node, score ORDER BY score DESC LIMIT $max_matches "
+    "  MATCH (node)-[r]-(m:Entity) "
+    "  RETURN node.name AS source, type(r) AS relation, m.name AS target "
+    "  LIMIT $limit "
+    "} "
+    "RETURN term.name AS entity, source, relation, target"
+)
+
+# Multi-hop expansion: resolve seed nodes once, then one bounded query per hop.
+# The per-node LIMIT caps the cost of expanding a hub with thousands of edges.
+MATCH_SEEDS_QUERY = (
+    "UNWIND $terms AS term "
+    "CALL { "
+    "  WITH term "
+    "  CALL db.index.fulltext.queryNodes($index, term.query) YIELD node, score "
+    "  RETURN node ORDER BY score DESC LIMIT $max_matches "
+    "} "
+    "RETURN DISTINCT node.name AS name"
+)
+
+EXPAND_HOP_QUERY = (
+    "UNWIND $frontier AS name "
+    "MATCH (n:Entity {name: name}) "
+    "CALL { "
+    "  WITH n "
+    "  MATCH (n)-[r]-(m:Entity) "
+    "  RETURN r, m ORDER BY coalesce(r.count, 1) DESC LIMIT $fanout "
+    "} "
+    "RETURN startNode(r).name AS source, type(r) AS relation, endNode(r).name AS target, "
+    "coalesce(r.count, 1) AS support, m.name AS neighbor"
+)
+
+ENTITIES_QUERY = "MATCH (e:Entity) RETURN e.name AS name, e.label AS label"
+
+INDEX_QUERIES = [
+    "CREATE INDEX entity_name IF NOT EXISTS FOR (n:Entity) ON (n.name)",
+    "CREATE INDEX document_id IF NOT EXISTS FOR (d:Document) ON (d.id)",
+    f"CREATE FULLTEXT INDEX {ENTITY_FULLTEXT_INDEX} IF NOT EXISTS FOR (n:Entity) ON EACH [n.name]",
+]
+
+MERGE_ENTITIES_QUERY = (
+    "UNWIND $rows AS row "
+    "MERGE (e:Entity {name: row.name}) "
+    "ON CREATE SET e.label = row.label "
+    # Nodes first created as relation endpoints have no label yet.
+    "ON MATCH SET e.label = coalesce(e.label, row.label)"
+)
+
+# Edge provenance: count is the number of writes that asserted the fact (each
+# document once), first_seen/last_seen epoch seconds. Edges written before
+# provenance existed count as one write. Which documents asserted a fact is
+# stored as (:Document)-[:ASSERTS {type, tail}]->(head) edges, so the
+# relationship itself stays the same size however many documents assert it.
+PROVENANCE_SET = (
+    "ON CREATE SET r.count = 0, r.first_seen = row.ts "
+    "SET r.count = coalesce(r.count, 1) + 1, r.last_seen = row.ts"
+)
+
+# A document's support is counted once: only when its ASSERTS edge is created.
+DOCUMENT_PROVENANCE_SET = (
+    "ON CREATE SET r.count = 0, r.first_seen = row.ts "
+    "MERGE (d:Document {{id: row.doc_id}}) "
+    "MERGE (d)-[:ASSERTS {{type: '{rel_type}', tail: row.tail}}]->(h) "
+    "ON CREATE SET r.count = coalesce(r.count, 1) + 1, r.last_seen = row.ts"
+)
+
+# A document points at the entities it lists; the endpoints of its facts are
+# reached through its ASSERTS edges.
+MERGE_MENTIONS_QUERY = (
+    "UNWIND $rows AS row "
+    "MERGE (d:Document {id: row.doc_id}) "
+    "WITH d, row "
+    "MATCH (e:Entity {name: row.name}) "
+    "MERGE (d)-[:MENTIONS]->(e)"
+)
+
+RETRACT_RELATIONS_QUERY = (
+    "UNWIND $rows AS row "
+    "MATCH (:Document {id: row.doc_id})-[a:ASSERTS]->(h:Entity) "
+    "MATCH (h)-[r]->(t:Entity {name: a.tail}) "
+    "WHERE type(r) = a.type "
+    "DELETE a "
+    "SET r.count = coalesce(r.count, 1) - 1 "
+    "WITH r, h.name AS head, type(r) AS relation, t.name AS tail "
+    "FOREACH (_ IN CASE WHEN r.count <= 0 THEN [1] ELSE [] END | DELETE r) "
+    "RETURN head, relation, tail"
+)
+
+DELETE_MENTIONS_QUERY = (
+    "UNWIND $rows AS row "
+    "MATCH (:Document {id: row.doc_id})-[m:MENTIONS]->(:Entity {name: row.name}) "
+    "DELETE m"
+)
+
+DELETE_DOCUMENTS_QUERY = (
+    "UNWIND $rows AS row "
+    "MATCH (d:Document {id: row.doc_id}) "
+    "OPTIONAL MATCH (d)-[:MENTIONS]->(e:Entity) "
+    "WITH d, collect(e.name) AS names "
+    "DETACH DELETE d "
+    "RETURN names"
+)
+
+# Only entities left without any relationship (to other entities or to a
+# document that mentions them) are deleted, so removing one document's facts
+# keeps nodes that other facts still use.
+DELETE_ORPHAN_ENTITIES_QUERY = (
+    "UNWIND $rows AS row "
+    "MATCH (e:Entity {name: row.name}) "
+    "WHERE NOT (e)--() "
+    "WITH e, e.name AS name "
+    "DELETE e "
+    "RETURN name"
+)
+
+# Characters with special meaning in Lucene query syntax.
+_LUCENE_SPECIAL = re.compile(r'([+\-!(){}\[\]^"~*?:\\/]|&&|\|\|)')
+
+def neo4j_config():
+    """
+    Read the Neo4j connection settings (uri, user, password) from the environment.
+    """
+    uri = os.getenv("NEO4J_URI")
+    user = os.getenv("NEO4J_USERNAME")
+    password = os.getenv("NEO4J_PASSWORD")
+
+    if not uri or not user or not password:
+        raise ValueError("Neo4j configuration missing in .env")
+    return uri, user, password
+
+def notify_write_listeners(listeners, kg_batch, removed=False):
+    """
+    Pass stored KG documents to each write listener, or with removed=True the
+    facts and entities a removal deleted or withdrew support from. A failing
+    listener is logged and skipped, so derived indexes never fail a write that
+    succeeded.
+    """
+    for listener in listeners:
+        try:
+            listener(kg_batch, removed=removed)
+        except Exception as e:
+            logger.warning("Graph write listener %r failed: %s", listener, e)
+
+def sanitize_rel_type(relation):
+    """
+    Map a relation label to a relationship type, e.g. "take off" -> "TAKE_OFF".
+    """
+    # Relationship types cannot be query parameters, so they are interpolated into Cypher.
+    # Keep only characters that are safe in an unquoted relationship type.
+    rel_type = relation.upper().replace(" ", "_").replace("-", "_")
+    rel_type = re.sub(r"[^A-Z0-9_]", "", rel_type)
+    if not rel_type or rel_type[0].isdigit():
+        rel_type = "RELATED_TO"
+    return rel_type
+
 class Neo4jConnector:
-    def __init__(self):
-        uri = os.getenv("NEO4J_URI")
-        user = os.getenv("NEO4J_USERNAME")
-        password = os.getenv("NEO4J_PASSWORD")
-        
-        if not uri or not user or not password:
-            raise ValueError("Neo4j configuration missing in .env")
+    def __init__(self, driver=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        # Number of rows sent per UNWIND transaction in bulk writes.
+        self.chunk_size = chunk_size
+        # Callables receiving each stored or removed kg_batch (e.g. EntityIndex.on_graph_write).
+        self.write_listeners = []
+
+        if driver is not None:
+            # Pre-built driver (e.g. shared or fake for testing); caller owns connectivity checks.
+            self.driver = driver
+            return
 
+        uri, user, password = neo4j_config()
         self.driver = GraphDatabase.driver(uri, auth=(user, password))
         
         # Verify connection immediately to fail fast
@@ -25,18 +198,124 @@ class Neo4jConnector:
     def close(self):
         self.driver.close()
 
+    def add_write_listener(self, listener):
+        """
+        Call listener(kg_batch, removed=False) after every populate_kg / populate_kg_batch,
+        and listener(removed_kg_batch, removed=True) after every remove_kg_batch /
+        retract_documents (idempotent).
+        """
+        if listener not in self.write_listeners:
+            self.write_listeners.append(listener)
+
+    def remove_write_listener(self, listener):
+        if listener in self.write_listeners:
+            self.write_listeners.remove(listener)
+
+    def ensure_indexes(self):
+        """
+        Create the indexes used for lookups by entity name (idempotent).
+        The range index serves MERGE on name; the full-text index serves GraphRAG lookups.
+        """
+        with self.driver.session() as session:
+            for query in INDEX_QUERIES:
+                session.run(query).consume()
+
+    @staticmethod
+    def _fulltext_phrase(name):
+        # Quote the escaped name as a phrase so multi-word entities match as a unit.
+        return '"' + _LUCENE_SPECIAL.sub(r"\\\1", name.strip()) + '"'
+
+    @classmethod
+    def _neighbor_terms(cls, names):
+        return [{"name": name, "query": cls._fulltext_phrase(name)} for name in names if name.strip()]
+
+    def find_neighbors(self, names, limit=10, max_matches=5):
+        """
+        Fetch 1-hop facts around entities whose name matches any of names.
+        All names are resolved in a single round-trip through the full-text
+        index. Returns (entity, source, relation, target) tuples, best
+        matches first and at most limit per entity.
+        """
+        terms = self._neighbor_terms(names)
+        if not terms:
+            return []
+
+        with metrics.stage("db_read"), self.driver.session() as session:
+            records = session.run(
+                FIND_NEIGHBORS_QUERY, terms=terms, index=ENTITY_FULLTEXT_INDEX, limit=limit, max_matches=max_matches
+            )
+            metrics.incr("db_round_trips")
+            return [(r["entity"], r["source"], r["relation"], r["target"]) for r in records]
+
+    def expand(self, names, hops=2, fanout=25, max_matches=5, max_frontier=100):
+        """
+        Bounded k-hop expansion around the entities whose name matches any of names.
+        Each hop expands at most max_frontier nodes and at most fanout edges per
+        node, best-supported edges first. Returns (seeds, edges): the matched node
+        names and the traversed (source, relation, target, support) edges in
+        traversal order.
+        """
+        terms = self._neighbor_terms(names)
+        if not terms:
+            return [], []
+
+        with metrics.stage("db_read"), self.driver.session() as session:
+            records = session.run(
+                MATCH_SEEDS_QUERY, terms=terms, index=ENTITY_FULLTEXT_INDEX, max_matches=max_matches
+            )
+            seeds = [r["name"] for r in records]
+            metrics.incr("db_round_trips")
+
+            seen = set(seeds)
+            frontier = seeds
+            edges = {}
+            for _ in range(hops):
+                if not frontier:
+                    break
+                records = session.run(EXPAND_HOP_QUERY, frontier=frontier[:max_frontier], fanout=fanout)
+                metrics.incr("db_round_trips")
+                frontier = self._collect_hop(records, seen, edges)
+        return seeds, [edge + (support,) for edge, support in edges.items()]
+
+    @staticmethod
+    def _collect_hop(records, seen, edges):
+        # Add one hop's EXPAND_HOP_QUERY records to edges; returns the next frontier.
+        next_frontier = []
+        for r in records:
+            edges.setdefault((r["source"], r["relation"], r["target"]), r["support"])
+            if r["neighbor"] not in seen:
+                seen.add(r["neighbor"])
+                next_frontier.append(r["neighbor"])
+        return next_frontier
+
+    def entities(self):
+        """
+        (name, label) of all entities in the graph, streamed.
+        """
+        with self.driver.session() as session:
+            for record in session.run(ENTITIES_QUERY):
+                yield record["name"], record["label"]
+
+    def entity_names(self):
+        """
+        Names of all entities in the graph, streamed.
+        """
+        return (name for name, _ in self.entities())
+
     def add_entity(self, name, label):
         """
         Add an entity node to the graph.
         """
         with self.driver.session() as session:
             session.execute_write(self._create_and_return_entity, name, label)
+        metrics.incr("db_round_trips")
 
     @staticmethod
     def _create_and_return_entity(tx, name, label):
         query = (
             f"MERGE (e:Entity {{name: $name}}) "
             f"ON CREATE SET e.label = $label "
+            "ON MATCH SET e.label = coalesce(e.label, $label) "
             "RETURN e.name"
         )
         result = tx.run(query, name=name, label=label)
@@ -44,30 +323,251 @@ class Neo4jConnector:
 
     def add_relation(self, head, relation, tail):
         """
-        Add a relationship between two entities.
+        Add a relationship between two entities, or count one more occurrence of it.
         """
         with self.driver.session() as session:
             session.execute_write(self._create_and_return_relation, head, relation, tail)
+        metrics.incr("db_round_trips")
+
+    @staticmethod
+    def _sanitize_rel_type(relation):
+        return sanitize_rel_type(relation)
 
     @staticmethod
     def _create_and_return_relation(tx, head, relation, tail):
-        # Sanitize relation type (Neo4j relationship types cannot have spaces/special chars usually)
-        rel_type = relation.upper().replace(" ", "_").replace("-", "_")
-        
+        rel_type = Neo4jConnector._sanitize_rel_type(relation)
+
         query = (
-            "MERGE (h:Entity {name: $head}) "
-            "MERGE (t:Entity {name: $tail}) "
+            "WITH $row AS row "
+            "MERGE (h:Entity {name: row.head}) "
+            "MERGE (t:Entity {name: row.tail}) "
             f"MERGE (h)-[r:{rel_type}]->(t) "
+            f"{PROVENANCE_SET} "
             "RETURN type(r)"
         )
-        result = tx.run(query, head=head, tail=tail)
+        # Per-item writes carry no document ID; documents go through populate_kg_batch.
+        result = tx.run(query, row={"head": head, "tail": tail, "doc_id": None, "ts": time.time()})
         return result.single()[0]
 
-    def populate_kg(self, kg_data):
+    @staticmethod
+    def _merge_relations_query(rel_type, documented=False):
+        # documented: rows carry a doc_id, recorded as an ASSERTS edge.
+        provenance = DOCUMENT_PROVENANCE_SET.format(rel_type=rel_type) if documented else PROVENANCE_SET
+        return (
+            "UNWIND $rows AS row "
+            "MERGE (h:Entity {name: row.head}) "
+            "MERGE (t:Entity {name: row.tail}) "
+            f"MERGE (h)-[r:{rel_type}]->(t) "
+            f"{provenance}"
+        )
+
+    @staticmethod
+    def _delete_relations_query(rel_type, documented=False):
+        if documented:
+            # Withdraw the document's support; the edge goes once nothing supports it.
+            return (
+                "UNWIND $rows AS row "
+                f"MATCH (:Document {{id: row.doc_id}})-[a:ASSERTS {{type: '{rel_type}', tail: row.tail}}]->"
+                "(h:Entity {name: row.head}) "
+                f"MATCH (h)-[r:{rel_type}]->(:Entity {{name: row.tail}}) "
+                "DELETE a "
+                "SET r.count = coalesce(r.count, 1) - 1 "
+                "WITH r WHERE r.count <= 0 "
+                "DELETE r"
+            )
+        # Without a document the edge is deleted outright, with every document's assertion of it.
+        return (
+            "UNWIND $rows AS row "
+            f"MATCH (h:Entity {{name: row.head}})-[r:{rel_type}]->(:Entity {{name: row.tail}}) "
+            f"OPTIONAL MATCH (:Document)-[a:ASSERTS {{type: '{rel_type}', tail: row.tail}}]->(h) "
+            "WITH r, collect(a) AS asserts "
+            "FOREACH (a IN asserts | DELETE a) "
+            "DELETE r"
+        )
+
+    @staticmethod
+    def _run_rows(tx, query, rows):
+        return list(tx.run(query, rows=rows))
+
+    @staticmethod
+    def _chunks(rows, size):
+        for i in range(0, len(rows), size):
+            yield rows[i:i + size]
+
+    @classmethod
+    def _relation_rows(cls, kg_batch, doc_ids):
+        """
+        Relation rows of kg_batch grouped by sanitized type, one row per fact and
+        document. Documents without an ID are told apart by position, so each
+        one still counts as an occurrence.
+        """
+        doc_ids = doc_ids or [None] * len(kg_batch)
+        relations_by_type = {}
+        for position, (kg_data, doc_id) in enumerate(zip(kg_batch, doc_ids)):
+            doc_key = position if doc_id is None else doc_id
+            for rel in kg_data.get("relations", []):
+                rel_type = cls._sanitize_rel_type(rel["type"])
+                relations_by_type.setdefault(rel_type, {})[(rel["head"], rel["tail"], doc_key)] = doc_id
+        return {
+            rel_type: [{"head": head, "tail": tail, "doc_id": doc_id} for (head, tail, _), doc_id in rows.items()]
+            for rel_type, rows in relations_by_type.items()
+        }
+
+    @staticmethod
+    def _split_documented(rows):
+        # (documented, rows) groups: rows without a doc_id, then rows with one.
+        groups = {False: [], True: []}
+        for row in rows:
+            groups[row["doc_id"] is not None].append(row)
+        return [(documented, rows) for documented, rows in groups.items() if rows]
+
+    @classmethod
+    def _bulk_writes(cls, kg_batch, chunk_size, doc_ids=None, ts=None):
+        """
+        Plan the UNWIND writes for kg_batch as (query, rows) pairs: entity
+        chunks first, then relation chunks grouped by sanitized type (and by
+        whether they carry a document ID), then the entities listed by each
+        document in doc_ids (parallel to kg_batch).
+        """
+        ts = time.time() if ts is None else ts
+        entities = {}
+        mentions = {}
+        for kg_data, doc_id in zip(kg_batch, doc_ids or [None] * len(kg_batch)):
+            for ent in kg_data.get("entities", []):
+                # First label wins, matching ON CREATE SET semantics.
+                entities.setdefault(ent["text"], ent["label"])
+            if doc_id is not None:
+                mentions.update(((doc_id, ent["text"]), None) for ent in kg_data.get("entities", []))
+
+        entity_rows = [{"name": name, "label": label} for name, label in entities.items()]
+        for rows in cls._chunks(entity_rows, chunk_size):
+            yield MERGE_ENTITIES_QUERY, rows
+
+        for rel_type, rel_rows in cls._relation_rows(kg_batch, doc_ids).items():
+            for row in rel_rows:
+                row["ts"] = ts
+            for documented, rows in cls._split_documented(rel_rows):
+                for chunk in cls._chunks(rows, chunk_size):
+                    yield cls._merge_relations_query(rel_type, documented), chunk
+
+        mention_rows = [{"doc_id": doc_id, "name": name} for doc_id, name in mentions]
+        for rows in cls._chunks(mention_rows, chunk_size):
+            yield MERGE_MENTIONS_QUERY, rows
+
+    @classmethod
+    def _bulk_deletes(cls, kg_batch, chunk_size, doc_ids=None):
+        """
+        Plan the UNWIND deletes for kg_batch as (query, rows) pairs, mirroring
+        _bulk_writes: relation chunks grouped by sanitized type first, then the
+        documents' mentions of their listed entities, then the entities and
+        relation endpoints, which are only deleted once they have no
+        relationships left.
+        """
+        names = {}
+        mentions = {}
+        for kg_data, doc_id in zip(kg_batch, doc_ids or [None] * len(kg_batch)):
+            for ent in kg_data.get("entities", []):
+                names[ent["text"]] = None
+                if doc_id is not None:
+                    mentions[(doc_id, ent["text"])] = None
+            for rel in kg_data.get("relations", []):
+                names.update(dict.fromkeys((rel["head"], rel["tail"])))
+
+        for rel_type, rel_rows in cls._relation_rows(kg_batch, doc_ids).items():
+            # A fact removed without a document ID is deleted once, however many documents list it.
+            rel_rows = list({(row["head"], row["tail"], row["doc_id"]): row for row in rel_rows}.values())
+            for documented, rows in cls._split_documented(rel_rows):
+                for chunk in cls._chunks(rows, chunk_size):
+                    yield cls._delete_relations_query(rel_type, documented), chunk
+
+        mention_rows = [{"doc_id": doc_id, "name": name} for doc_id, name in mentions]
+        for rows in cls._chunks(mention_rows, chunk_size):
+            yield DELETE_MENTIONS_QUERY, rows
+
+        for rows in cls._chunks([{"name": name} for name in names], chunk_size):
+            yield DELETE_ORPHAN_ENTITIES_QUERY, rows
+
+    def remove_kg_batch(self, kg_batch, chunk_size=None, doc_ids=None):
+        """
+        Remove the relations of several KG documents, then their entities that
+        are left without relationships. The inverse of populate_kg_batch: with
+        doc_ids, only those documents' support is withdrawn and facts other
+        documents still assert are kept.
+        """
+        deletes = self._bulk_deletes(kg_batch, chunk_size or self.chunk_size, doc_ids)
+        deleted = []
+        with metrics.stage("db_write"), self.driver.session() as session:
+            for query, rows in deletes:
+                records = session.execute_write(self._run_rows, query, rows)
+                metrics.incr("db_round_trips")
+                if query == DELETE_ORPHAN_ENTITIES_QUERY:
+                    deleted += [record["name"] for record in records]
+        relations = [rel for kg_data in kg_batch for rel in kg_data.get("relations", [])]
+        notify_write_listeners(
+            self.write_listeners, [{"entities": [{"text": name} for name in deleted], "relations": relations}], removed=True
+        )
+
+    def remove_kg(self, kg_data, doc_id=None):
+        self.remove_kg_batch([kg_data], doc_ids=None if doc_id is None else [doc_id])
+
+    @staticmethod
+    def _retract(tx, rows):
+        # Returns the retracted facts and the deleted entities as a kg_data dict for the write listeners.
+        relations = [
+            {"head": record["head"], "type": record["relation"], "tail": record["tail"]}
+            for record in tx.run(RETRACT_RELATIONS_QUERY, rows=rows)
+        ]
+        # Orphan candidates: the documents' listed entities and the endpoints of their facts.
+        names = {name for rel in relations for name in (rel["head"], rel["tail"])}
+        names.update(name for record in tx.run(DELETE_DOCUMENTS_QUERY, rows=rows) for name in record["names"])
+        deleted = []
+        if names:
+            deleted = [record["name"] for record in tx.run(DELETE_ORPHAN_ENTITIES_QUERY, rows=[{"name": name} for name in names])]
+        return {"entities": [{"text": name} for name in deleted], "relations": relations}
+
+    def retract_documents(self, doc_ids, chunk_size=None):
+        """
+        Withdraw everything the documents doc_ids contributed: their support is
+        removed from each relation they asserted, relations left without
+        support are deleted, then entities left without relationships.
+        """
+        rows = [{"doc_id": doc_id} for doc_id in dict.fromkeys(doc_ids)]
+        retracted = []
+        with metrics.stage("db_write"), self.driver.session() as session:
+            for chunk in self._chunks(rows, chunk_size or self.chunk_size):
+                retracted.append(session.execute_write(self._retract, chunk))
+                metrics.incr("db_round_trips")
+        notify_write_listeners(self.write_listeners, retracted, removed=True)
+
+    def retract_document(self, doc_id):
+        self.retract_documents([doc_id])
+
+    def populate_kg_batch(self, kg_batch, chunk_size=None, doc_ids=None):
+        """
+        Bulk-populate the graph from several extracted KG documents.
+        Entities are written with one UNWIND transaction per chunk, and relations
+        with one UNWIND transaction per chunk of each sanitized relationship type.
+        doc_ids (parallel to kg_batch) records which document asserted each fact;
+        writing the same document again does not count its facts twice.
+        """
+        writes = self._bulk_writes(kg_batch, chunk_size or self.chunk_size, doc_ids)
+        with metrics.stage("db_write"), self.driver.session() as session:
+            for query, rows in writes:
+                session.execute_write(self._run_rows, query, rows)
+                metrics.incr("db_round_trips")
+        notify_write_listeners(self.write_listeners, kg_batch)
+
+    def populate_kg(self, kg_data, bulk=True, doc_id=None):
         """
         Populate the graph from extracted KG data.
         kg_data: {'entities': [...], 'relations': [...]}
+        With bulk=True (default) the document is written with batched UNWIND
+        transactions; bulk=False issues one transaction per entity and relation.
         """
+        if bulk or doc_id is not None:
+            self.populate_kg_batch([kg_data], doc_ids=None if doc_id is None else [doc_id])
+            return
+
         # Add entities first (optional, as relations will MERGE them, but good for setting labels)
         for ent in kg_data.get("entities", []):
             self.add_entity(ent["text"], ent["label"])
@@ -75,3 +575,4 @@ class Neo4jConnector:
         # Add relations
         for rel in kg_data.get("relations", []):
             self.add_relation(rel["head"], rel["type"], rel["tail"])
+        notify_write_listeners(self.write_listeners, [kg_data])
@@ -1,63 +1,267 @@
-import spacy
-from src.graph_db import Neo4jConnector
+import os
+
+import numpy as np
+
+from src import registry
+from src.cache import TTLCache, normalize_text
+from src.entity_resolution import normalize_name
+
+NO_ENTITIES_MESSAGE = "I couldn't identify any specific entities in your question. Try asking about a person, organization, or location."
+
+def _words(name):
+    return frozenset(normalize_name(name).split())
+
+def _question_entities(nlp, question):
+    doc = nlp(question)
+    entities = [ent.text for ent in doc.ents]
+
+    # Fallback: If no named entities, try noun chunks
+    if not entities:
+        entities = [chunk.text for chunk in doc.noun_chunks]
+    return entities
+
+def rank_facts(edges, seeds, top_n=20, damping=0.85, iterations=30):
+    """
+    Rank (source, relation, target, support) edges by personalized PageRank
+    seeded on seeds. A node passes its rank along its edges in proportion to
+    their support (how many writes asserted the fact; 1 when edges are plain
+    triples), and an edge scores the mass that flows along it from both
+    endpoints, so edges of a hub are not all favoured just because the hub is
+    central. Returns the top_n distinct (source, relation, target) facts; ties
+    keep traversal order.
+    """
+    support = {}
+    for edge in edges:
+        support.setdefault(tuple(edge[:3]), edge[3] if len(edge) > 3 else 1)
+    edges = list(support)
+    if not edges:
+        return []
+
+    node_ids = {}
+    for source, _, target in edges:
+        node_ids.setdefault(source, len(node_ids))
+        node_ids.setdefault(target, len(node_ids))
+    n = len(node_ids)
+    src = np.array([node_ids[s] for s, _, _ in edges])
+    dst = np.array([node_ids[t] for _, _, t in edges])
+    weights = np.array([support[edge] for edge in edges], dtype=float)
+    # Facts are undirected for relevance: mass flows both ways along an edge.
+    rows, cols = np.concatenate([src, dst]), np.concatenate([dst, src])
+    edge_weights = np.concatenate([weights, weights])
+    degree = np.bincount(rows, weights=edge_weights, minlength=n)
+
+    personalization = np.zeros(n)
+    seed_ids = [node_ids[s] for s in seeds if s in node_ids]
+    if seed_ids:
+        personalization[seed_ids] = 1.0 / len(seed_ids)
+    else:
+        personalization[:] = 1.0 / n
+
+    rank = personalization
+    for _ in range(iterations):
+        flow = rank / degree
+        rank = (1 - damping) * personalization + damping * np.bincount(cols, weights=flow[rows] * edge_weights, minlength=n)
+
+    flow = rank / degree
+    scores = weights * (flow[src] + flow[dst])
+    # Stable sort on -score keeps traversal order among equal scores.
+    order = np.argsort(-scores, kind="stable")[:top_n]
+    return [edges[i] for i in order]
+
+def _format_answer(entities, facts):
+    """
+    Render (source, relation, target) facts, deduplicated in their given order.
+    """
+    results = [f"{source} --[{relation}]--> {target}" for source, relation, target in facts]
+
+    if not results:
+        return f"I found no information about '{', '.join(entities)}' in the knowledge graph."
+
+    response = f"Here is what I found for **{', '.join(entities)}**:\n\n"
+    for res in dict.fromkeys(results):
+        response += f"- {res}\n"
+
+    return response
+
+def link_entities(entity_index, phrases, k=3, min_similarity=None):
+    """
+    Entity names nearest to phrases in entity_index, above min_similarity
+    (default: the threshold calibrated for the index's encoder).
+    """
+    if min_similarity is None:
+        min_similarity = entity_index.min_similarity
+    linked = {}
+    for matches in entity_index.search(phrases, k=k):
+        for name, score in matches:
+            if score >= min_similarity:
+                linked.setdefault(name, None)
+    return list(linked)
+
+class RetrievalCache:
+    """
+    Bounded TTL caches for GraphRAG: question -> entities, and entity name ->
+    its expanded neighbourhood. A question about several entities combines
+    their cached neighbourhoods, so "SpaceX" and "SpaceX and Tesla" share the
+    SpaceX entry. Register invalidate as a graph store write listener to drop
+    the neighbourhoods a write, removal or retraction touches.
+    """
+    def __init__(self, max_entries=1024, ttl=300.0):
+        self.questions = TTLCache(max_entries, ttl, name="rag_question_cache")
+        self.neighbourhoods = TTLCache(max_entries, ttl, name="rag_neighbourhood_cache")
+
+    @staticmethod
+    def question_key(question):
+        return normalize_text(question)
+
+    @staticmethod
+    def entity_keys(names):
+        # Sorted, so the combined neighbourhood does not depend on the order of names.
+        return sorted({name.strip() for name in names if name.strip()})
+
+    def put_neighbourhood(self, key, seeds, edges):
+        # Tagged by every node reached, and by the name's words so that a new
+        # node it would match (e.g. "SpaceX" -> "SpaceX Inc") also drops it.
+        nodes = {node.lower() for node in seeds}
+        for edge in edges:
+            nodes.update((edge[0].lower(), edge[2].lower()))
+        tags = [("node", node) for node in nodes] + [("word", word) for word in _words(key)]
+        self.neighbourhoods.put(key, (seeds, edges), tags=tags)
+
+    @staticmethod
+    def combine(neighbourhoods):
+        """
+        Union of (seeds, edges) neighbourhoods, each seed and fact once, in order.
+        """
+        seeds, edges = {}, {}
+        for entity_seeds, entity_edges in neighbourhoods:
+            seeds.update(dict.fromkeys(entity_seeds))
+            for edge in entity_edges:
+                edges.setdefault(tuple(edge[:3]), tuple(edge))
+        return list(seeds), list(edges.values())
+
+    def invalidate(self, kg_batch, removed=False):
+        """
+        Write listener: drop cached neighbourhoods that the entities and relations
+        of kg_batch touch, whether they were stored or removed.
+        """
+        names = set()
+        for kg_data in kg_batch:
+            names.update(ent["text"] for ent in kg_data.get("entities", []))
+            for rel in kg_data.get("relations", []):
+                names.update((rel["head"], rel["tail"]))
+
+        cache = self.neighbourhoods
+        tags = [("node", name.lower()) for name in names]
+        keys = set()
+        for name in names:
+            words = _words(name)
+            for word in words:
+                keys.update(key for key in cache.tagged(("word", word)) if _words(key) <= words)
+        cache.invalidate(tags, keys)
+
+    def stats(self):
+        return {"questions": self.questions.stats(), "neighbourhoods": self.neighbourhoods.stats()}
 
 class GraphRAG:
-    def __init__(self):
-        self.db = Neo4jConnector()
-        try:
-            self.nlp = spacy.load("en_core_web_sm")
-        except OSError:
-            from spacy.cli import download
-            download("en_core_web_sm")
-            self.nlp = spacy.load("en_core_web_sm")
+    """
+    Question answering over the graph store. Repeated questions are served
+    from a RetrievalCache, which a write listener on the graph store keeps
+    fresh; entries otherwise expire after cache_ttl seconds. cache_size=0
+    disables caching.
+    """
+    def __init__(self, spacy_model="en_core_web_sm", graph_backend=None, hops=2, fanout=25, top_n=20,
+                 entity_index=True, min_similarity=None, cache_size=1024, cache_ttl=300.0):
+        # Graph store and spaCy model are shared with the pipeline through the registry.
+        self.graph_backend = graph_backend or os.getenv("GRAPH_BACKEND", "neo4j")
+        self.db = registry.get_graph_store(self.graph_backend)
+        self.db.ensure_indexes()
+        self.spacy_model = spacy_model
+        # Retrieval budget: hops from the question entities, edges per node per hop, facts returned.
+        self.hops = hops
+        self.fanout = fanout
+        self.top_n = top_n
+        # Semantic fallback for questions whose entities match no node name; None unless
+        # $ENTITY_ENCODER names an encoder with real vectors.
+        self.entity_index = registry.get_entity_index() if entity_index else None
+        self.min_similarity = min_similarity
+        self.cache = None
+        if cache_size:
+            self.cache = RetrievalCache(cache_size, cache_ttl)
+            self.db.add_write_listener(self.cache.invalidate)
+
+    @property
+    def nlp(self):
+        return registry.get_spacy(self.spacy_model)
 
     def query(self, question):
         """
-        Simple GraphRAG: Extract entities from question -> Query Graph -> Return Context
+        Simple GraphRAG: Extract entities from question -> Expand k hops -> Rank -> Return Context
         """
         # 1. Extract entities from the question
-        doc = self.nlp(question)
-        entities = [ent.text for ent in doc.ents]
-        
-        # Fallback: If no named entities, try noun chunks
-        if not entities:
-            entities = [chunk.text for chunk in doc.noun_chunks]
+        entities = self.question_entities(question)
+
+        # 2. Expand from the entities (indexed name lookup, then bounded hops)
+        try:
+            seeds, edges = self.expand(entities) if entities else ([], [])
+            if not seeds and self.entity_index is not None:
+                # Nothing matched by name: link paraphrases ("the rocket company") through the vector index.
+                linked = self.link_entities(entities or [question])
+                if linked:
+                    entities = entities or linked
+                    seeds, edges = self.expand(linked)
+        except Exception as e:
+            return f"Error querying database: {e}"
 
         if not entities:
-            return "I couldn't identify any specific entities in your question. Try asking about a person, organization, or location."
-
-        results = []
-        
-        # 2. Query Neo4j for each entity
-        for entity in entities:
-            # Search for the entity (case-insensitive partial match)
-            # Find 1-hop connections
-            cypher = """
-            MATCH (n:Entity)-[r]-(m:Entity)
-            WHERE toLower(n.name) CONTAINS toLower($name)
-            RETURN n.name, type(r), m.name
-            LIMIT 10
-            """
-            try:
-                with self.db.driver.session() as session:
-                    records = session.run(cypher, name=entity)
-                    for record in records:
-                        results.append(f"{record['n.name']} --[{record['type(r)']}]--> {record['m.name']}")
-            except Exception as e:
-                return f"Error querying database: {e}"
-
-        # 3. Format Answer
-        if not results:
-            return f"I found no information about '{', '.join(entities)}' in the knowledge graph."
-        
-        # Deduplicate results
-        unique_results = list(set(results))
-        
-        response = f"Here is what I found for **{', '.join(entities)}**:\n\n"
-        for res in unique_results:
-            response += f"- {res}\n"
-            
-        return response
+            return NO_ENTITIES_MESSAGE
+
+        # 3. Rank facts by relevance to the matched entities and format the answer
+        return _format_answer(entities, rank_facts(edges, seeds, top_n=self.top_n))
+
+    def question_entities(self, question):
+        """
+        Entities mentioned in question (cached by normalized question text).
+        """
+        if self.cache is None:
+            return _question_entities(self.nlp, question)
+        key = self.cache.question_key(question)
+        entities = self.cache.questions.get(key)
+        if entities is None:
+            entities = _question_entities(self.nlp, question)
+            self.cache.questions.put(key, entities)
+        return list(entities)
+
+    def expand(self, names):
+        """
+        Seeds and (source, relation, target, support) edges around names: the
+        union of each name's cached neighbourhood, with one graph store call
+        per name that is not cached.
+        """
+        if self.cache is None:
+            return self.db.expand(names, hops=self.hops, fanout=self.fanout)
+
+        neighbourhoods = []
+        for key in self.cache.entity_keys(names):
+            cached = self.cache.neighbourhoods.get(key)
+            if cached is None:
+                cached = self.db.expand([key], hops=self.hops, fanout=self.fanout)
+                self.cache.put_neighbourhood(key, *cached)
+            neighbourhoods.append(cached)
+        return self.cache.combine(neighbourhoods)
+
+    def cache_stats(self):
+        return self.cache.stats() if self.cache is not None else {}
+
+    def link_entities(self, phrases, k=3):
+        """
+        Entity names nearest to phrases in the vector index, above min_similarity.
+        """
+        return link_entities(self.entity_index, phrases, k=k, min_similarity=self.min_similarity)
 
     def close(self):
-        self.db.close()
+        if self.cache is not None:
+            self.db.remove_write_listener(self.cache.invalidate)
+        if self.entity_index is not None:
+            registry.release_entity_index()
+            self.entity_index = None
+        registry.release_graph_store(self.graph_backend)
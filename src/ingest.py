@@ -0,0 +1,331 @@
+"""
+Streaming corpus ingestion: summarize -> extract -> store.
+
+Each stage runs in its own thread and the stages are connected by bounded
+queues, so generation, spaCy parsing and database writes overlap while
+memory stays bounded. Document IDs are appended to a checkpoint file once
+they are stored, which lets an interrupted backfill resume where it stopped.
+A run without storage (--no-db) does not read or write the checkpoint.
+
+Usage:
+    python -m src.ingest --source cnn_dailymail --split "train[:1%]"
+    python -m src.ingest --source articles.jsonl --checkpoint .cache/ingest.ckpt
+    python -m src.ingest --source ./articles/ --no-db
+    python -m src.ingest --source report.pdf
+    python -m src.ingest --source links.urls
+    python -m src.ingest --source articles.jsonl --workers 4 --torch-threads 2
+
+With --workers, summarization and extraction run in a pool of worker
+processes (src/workers.py) and this process only resolves and stores.
+"""
+import argparse
+import json
+import os
+import queue
+import threading
+import time
+from itertools import islice
+
+_DONE = object()
+
+def iter_documents(source, split="train[:1%]", id_field="id", text_field="article"):
+    """
+    Yield (doc_id, text) pairs from a Hugging Face dataset name, a JSONL file,
+    a directory of .txt files, a PDF (one document per page) or a .urls file
+    (one URL per line, fetched concurrently).
+    """
+    if source.endswith(".pdf"):
+        from src.sources import iter_pdf_pages
+        name = os.path.basename(source)
+        for page_no, text in enumerate(iter_pdf_pages(source), start=1):
+            if text.strip():
+                yield f"{name}#page={page_no}", text
+    elif source.endswith(".urls"):
+        from src.sources import fetch_urls
+        with open(source, encoding="utf-8") as f:
+            urls = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+        for url, text, error in fetch_urls(urls):
+            if error is not None:
+                print(f"Skipping {url}: {error}")
+            elif text.strip():
+                yield url, text
+    elif os.path.isdir(source):
+        for name in sorted(os.listdir(source)):
+            if name.endswith(".txt"):
+                with open(os.path.join(source, name), encoding="utf-8") as f:
+                    yield name, f.read()
+    elif source.endswith(".jsonl"):
+        with open(source, encoding="utf-8") as f:
+            for line_no, line in enumerate(f):
+                if line.strip():
+                    record = json.loads(line)
+                    yield str(record.get(id_field, line_no)), record[text_field]
+    else:
+        from src.data_loader import load_summarization_data
+        dataset = load_summarization_data(source, split=split)
+        for row_no, row in enumerate(dataset):
+            yield str(row.get(id_field, row_no)), row[text_field]
+
+class Checkpoint:
+    """
+    Append-only log of completed document IDs.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.done = set()
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.done = {line.rstrip("\n") for line in f if line.strip()}
+        self._file = None
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._file = open(path, "a", encoding="utf-8")
+
+    def __contains__(self, doc_id):
+        return doc_id in self.done
+
+    def mark(self, doc_ids):
+        self.done.update(doc_ids)
+        if self._file:
+            self._file.write("".join(f"{doc_id}\n" for doc_id in doc_ids))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        if self._file:
+            self._file.close()
+
+class StageStats:
+    def __init__(self, name):
+        self.name = name
+        self.items = 0
+        self.busy = 0.0
+
+    def throughput(self):
+        return self.items / self.busy if self.busy > 0 else 0.0
+
+    def __str__(self):
+        return f"{self.name:<10} {self.items:>8} docs  busy {self.busy:9.2f}s  {self.throughput():8.2f} docs/sec"
+
+class IngestionRunner:
+    """
+    Bounded-queue pipeline over an AbstractiveKGPipeline's components.
+    Work moves between stages in batches of batch_size documents.
+    With store=False nothing is written and the checkpoint is not used, so a
+    dry run does not make a later run skip its documents.
+    """
+    def __init__(self, pipeline, batch_size=16, queue_size=4, checkpoint_path=None, store=True):
+        if store and not pipeline.db_connected:
+            raise RuntimeError("Storage was requested but the graph store is not connected (use --no-db for a dry run)")
+        self.pipeline = pipeline
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.checkpoint = Checkpoint(checkpoint_path if store else None)
+        self.store = store
+        self.stats = {name: StageStats(name) for name in ("summarize", "extract", "store")}
+        self.skipped = 0
+        self.failed = []
+        self._errors = []
+        self._stop = threading.Event()
+
+    def _batches(self, documents):
+        batch = []
+        for doc_id, text in documents:
+            if doc_id in self.checkpoint:
+                self.skipped += 1
+                continue
+            batch.append((doc_id, text))
+            if len(batch) == self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _summarize(self, batch):
+        # Documents longer than the model input go through the map-reduce summary.
+        summaries = self.pipeline.summarize_batch([text for _, text in batch], batch_size=self.batch_size)
+        return [(doc_id, summary) for (doc_id, _), summary in zip(batch, summaries)]
+
+    def _extract(self, batch):
+        kgs = self.pipeline.kg_extractor.extract_kg_batch([summary for _, summary in batch], batch_size=self.batch_size)
+        return [(doc_id, summary, self.pipeline.resolve(kg)) for (doc_id, summary), kg in zip(batch, kgs)]
+
+    def _write(self, batch):
+        if not self.store:
+            return batch
+        self.pipeline.db_connector.populate_kg_batch(
+            [kg for _, _, kg in batch], doc_ids=[doc_id for doc_id, _, _ in batch]
+        )
+        # Only stored documents are checkpointed; a failed write raises before this.
+        self.checkpoint.mark([doc_id for doc_id, _, _ in batch])
+        return batch
+
+    def _put(self, q, item):
+        # Blocking put that still notices a stop request from a failed stage.
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _stage(self, name, fn, in_q, out_q):
+        stats = self.stats[name]
+        try:
+            while not self._stop.is_set():
+                try:
+                    batch = in_q.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if batch is _DONE:
+                    break
+                start = time.perf_counter()
+                result = fn(batch)
+                stats.busy += time.perf_counter() - start
+                stats.items += len(batch)
+                if out_q is not None and not self._put(out_q, result):
+                    return
+        except Exception as e:
+            self._errors.append((name, e))
+            self._stop.set()
+        finally:
+            if out_q is not None:
+                self._put(out_q, _DONE)
+
+    def run(self, documents, report_every=30.0):
+        """
+        Stream documents ((doc_id, text) pairs) through all stages.
+        Returns the per-stage statistics.
+        """
+        to_summarize = queue.Queue(self.queue_size)
+        to_extract = queue.Queue(self.queue_size)
+        to_store = queue.Queue(self.queue_size)
+
+        threads = [
+            threading.Thread(target=self._stage, args=("summarize", self._summarize, to_summarize, to_extract), daemon=True),
+            threading.Thread(target=self._stage, args=("extract", self._extract, to_extract, to_store), daemon=True),
+            threading.Thread(target=self._stage, args=("store", self._write, to_store, None), daemon=True),
+        ]
+        for t in threads:
+            t.start()
+
+        start = last_report = time.perf_counter()
+        try:
+            for batch in self._batches(documents):
+                if not self._put(to_summarize, batch):
+                    break
+                if time.perf_counter() - last_report > report_every:
+                    self.report(time.perf_counter() - start)
+                    last_report = time.perf_counter()
+            self._put(to_summarize, _DONE)
+            for t in threads:
+                while t.is_alive():
+                    t.join(timeout=0.5)
+        except KeyboardInterrupt:
+            print("Interrupted; completed documents are recorded in the checkpoint.")
+            self._stop.set()
+        finally:
+            self.checkpoint.close()
+
+        self.report(time.perf_counter() - start)
+        if self._errors:
+            name, error = self._errors[0]
+            raise RuntimeError(f"Ingestion stage '{name}' failed: {error}") from error
+        return self.stats
+
+    def run_pool(self, documents, pool, report_every=30.0):
+        """
+        Like run, but summarization and extraction happen in pool (a WorkerPool)
+        and this process only resolves and stores. Documents that fail are
+        reported and left out of the checkpoint, so the next run retries them.
+        """
+        self.stats = {name: StageStats(name) for name in ("workers", "store")}
+        pending = (doc for batch in self._batches(documents) for doc in batch)
+        results = pool.map(pending)
+        batch = []
+        start = last_report = time.perf_counter()
+        try:
+            while True:
+                wait_start = time.perf_counter()
+                item = next(results, None)
+                self.stats["workers"].busy += time.perf_counter() - wait_start
+                if item is not None:
+                    doc_id, summary, kg_data, error = item
+                    self.stats["workers"].items += 1
+                    if error is not None:
+                        print(f"Failed {doc_id}: {error}")
+                        self.failed.append((doc_id, error))
+                    else:
+                        batch.append((doc_id, summary, self.pipeline.resolve(kg_data)))
+                if batch and (item is None or len(batch) == self.batch_size):
+                    write_start = time.perf_counter()
+                    self._write(batch)
+                    self.stats["store"].busy += time.perf_counter() - write_start
+                    self.stats["store"].items += len(batch)
+                    batch = []
+                if item is None:
+                    break
+                if time.perf_counter() - last_report > report_every:
+                    self.report(time.perf_counter() - start)
+                    last_report = time.perf_counter()
+        except KeyboardInterrupt:
+            print("Interrupted; completed documents are recorded in the checkpoint.")
+        finally:
+            results.close()
+            self.checkpoint.close()
+
+        self.report(time.perf_counter() - start)
+        return self.stats
+
+    def report(self, elapsed):
+        stored = self.stats["store"].items
+        failed = f", {len(self.failed)} failed" if self.failed else ""
+        print(f"\n--- Ingestion progress ({elapsed:.1f}s, {stored} stored{failed}, {self.skipped} skipped from checkpoint) ---")
+        for stats in self.stats.values():
+            print(stats)
+        if elapsed > 0:
+            print(f"end-to-end {stored / elapsed:8.2f} docs/sec")
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream a corpus through summarization, KG extraction and Neo4j storage.")
+    parser.add_argument("--source", default="cnn_dailymail", help="Dataset name, .jsonl file, directory of .txt files, .pdf or .urls file")
+    parser.add_argument("--split", default="train[:1%]", help="Dataset split (dataset sources only)")
+    parser.add_argument("--id-field", default="id")
+    parser.add_argument("--text-field", default="article")
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--queue-size", type=int, default=4, help="Max batches buffered between stages")
+    parser.add_argument("--checkpoint", default=os.path.join(".cache", "ingest.ckpt"))
+    parser.add_argument("--limit", type=int, default=None, help="Stop after this many source documents")
+    parser.add_argument("--no-db", action="store_true", help="Skip Neo4j storage")
+    parser.add_argument("--workers", type=int, default=0, help="Summarize and extract in this many worker processes")
+    parser.add_argument("--torch-threads", type=int, default=None, help="Torch threads per worker (default: cores / workers)")
+    args = parser.parse_args()
+
+    from src.pipeline import AbstractiveKGPipeline
+
+    # With workers, the models are loaded in the worker processes only.
+    pipeline = AbstractiveKGPipeline(use_cache=False, connect_db=not args.no_db)
+    documents = iter_documents(args.source, args.split, args.id_field, args.text_field)
+    if args.limit is not None:
+        documents = islice(documents, args.limit)
+
+    runner = IngestionRunner(
+        pipeline,
+        batch_size=args.batch_size,
+        queue_size=args.queue_size,
+        checkpoint_path=args.checkpoint,
+        store=not args.no_db,
+    )
+    try:
+        if args.workers > 0:
+            from src.workers import WorkerPool
+            with WorkerPool(args.workers, torch_threads=args.torch_threads, batch_size=args.batch_size) as pool:
+                runner.run_pool(documents, pool)
+        else:
+            runner.run(documents)
+    finally:
+        pipeline.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,691 @@
+import atexit
+import json
+import os
+import re
+import threading
+import time
+
+import numpy as np
+
+from src.graph_db import notify_write_listeners, sanitize_rel_type
+
+_TOKEN = re.compile(r"\w+")
+
+class InMemoryGraph:
+    """
+    In-process graph store with the same write and lookup surface as Neo4jConnector.
+    Entities are integer IDs behind a name->id hash index. Edges are kept as
+    parallel arrays and served from a CSR (compressed sparse row) adjacency
+    that is rebuilt lazily after writes. Snapshots are plain .npy files that
+    are memory-mapped on load.
+
+    Removed nodes and edges are tombstoned (a None name, a zero count) rather
+    than deleted, so a removal does not renumber the graph; snapshot()
+    compacts them away.
+
+    Each edge carries its provenance like in Neo4jConnector: an occurrence
+    count and first/last write times in arrays parallel to the edges, and the
+    facts and entities of each document ID in self.documents.
+
+    The graph is shared between writers (e.g. the ingest thread) and GraphRAG
+    reads: mutations, CSR rebuilds and queries hold one lock, and write
+    listeners are called after it is released.
+    """
+    def __init__(self, path=None, save_interval=60.0):
+        # path: snapshot directory, loaded on start, written after writes (at
+        # most every save_interval seconds) and at exit.
+        self.path = path
+        self.save_interval = save_interval
+        self.names = []
+        self.labels = []
+        self.name_to_id = {}
+        self._lower_to_ids = {}
+        self._token_to_ids = {}
+        self.rel_types = []
+        self._rel_type_ids = {}
+
+        self._src = np.zeros(0, dtype=np.int64)
+        self._dst = np.zeros(0, dtype=np.int64)
+        self._type = np.zeros(0, dtype=np.int32)
+        self._count = np.zeros(0, dtype=np.int64)
+        self._first_seen = np.zeros(0, dtype=np.float64)
+        self._last_seen = np.zeros(0, dtype=np.float64)
+        # Live edges per node, so orphan checks after a removal do not scan every edge.
+        self._degree = []
+        self._dead_nodes = 0
+        self._dead_edges = 0
+        # doc_id -> {"entities": {listed name}, "relations": {(head, rel_type, tail)},
+        #            "refs": {name: number of listings and facts of the document that use it}}
+        self.documents = {}
+        self._entity_docs = {}
+        self._pending = []
+        self._edge_keys = None
+        self._csr = None
+        self._dirty = False
+        # Bumped by every change, so a snapshot knows whether it saved the latest state.
+        self._version = 0
+        self._saved_at = time.monotonic()
+        self._lock = threading.RLock()
+        self._snapshot_lock = threading.Lock()
+        self._saving = None
+        self.write_listeners = []
+
+        if path and os.path.exists(os.path.join(path, "meta.json")):
+            self._load(path)
+        if path:
+            atexit.register(self.close)
+
+    # --- Neo4jConnector-compatible surface ---
+
+    def close(self):
+        if self._saving is not None:
+            self._saving.join()
+        if self.path and self._dirty:
+            self.snapshot(self.path)
+        if self.path:
+            # The exit hook would otherwise keep the graph alive for the life of the process.
+            atexit.unregister(self.close)
+
+    def add_write_listener(self, listener):
+        """
+        Call listener(kg_batch, removed=False) after every populate_kg / populate_kg_batch,
+        and listener(removed_kg_batch, removed=True) after every remove_kg_batch /
+        retract_documents (idempotent).
+        """
+        if listener not in self.write_listeners:
+            self.write_listeners.append(listener)
+
+    def remove_write_listener(self, listener):
+        if listener in self.write_listeners:
+            self.write_listeners.remove(listener)
+
+    def ensure_indexes(self):
+        # Name lookups are always served from in-memory hash indexes.
+        return None
+
+    def add_entity(self, name, label):
+        """
+        Add an entity node to the graph.
+        """
+        with self._lock:
+            self._node_id(name, label)
+
+    def add_relation(self, head, relation, tail, doc_id=None, ts=None):
+        """
+        Add a relationship between two entities, or count one more occurrence of
+        it. A document that already asserted the relationship is not counted twice.
+        """
+        with self._lock:
+            self._add_relation(head, relation, tail, doc_id, ts)
+
+    def _add_relation(self, head, relation, tail, doc_id, ts):
+        rel = sanitize_rel_type(relation)
+        if doc_id is not None:
+            doc = self._document(doc_id)
+            if (head, rel, tail) in doc["relations"]:
+                return
+            doc["relations"].add((head, rel, tail))
+            self._mention(doc, head)
+            self._mention(doc, tail)
+
+        h = self._node_id(head)
+        t = self._node_id(tail)
+        r = self._rel_type_ids.get(rel)
+        if r is None:
+            r = self._rel_type_ids[rel] = len(self.rel_types)
+            self.rel_types.append(rel)
+
+        ts = time.time() if ts is None else ts
+        keys = self._keys()
+        position = keys.get((h, r, t))
+        if position is None:
+            keys[(h, r, t)] = len(self._src) + len(self._pending)
+            self._pending.append([h, t, r, 1, ts, ts])
+            self._degree[h] += 1
+            self._degree[t] += 1
+        else:
+            self._add_support(position, 1, ts)
+        self._csr = None
+        self._touch()
+
+    def populate_kg_batch(self, kg_batch, chunk_size=None, doc_ids=None):
+        """
+        Populate the graph from several extracted KG documents, with doc_ids
+        (parallel to kg_batch) recording which document asserted each fact.
+        chunk_size is accepted for compatibility with Neo4jConnector.
+        """
+        ts = time.time()
+        with self._lock:
+            for kg_data, doc_id in zip(kg_batch, doc_ids or [None] * len(kg_batch)):
+                for ent in kg_data.get("entities", []):
+                    self._node_id(ent["text"], ent["label"])
+                    if doc_id is not None:
+                        doc = self._document(doc_id)
+                        if ent["text"] not in doc["entities"]:
+                            doc["entities"].add(ent["text"])
+                            self._mention(doc, ent["text"])
+                # Each document counts once per fact, even if it lists the fact twice.
+                for head, relation, tail in dict.fromkeys((r["head"], r["type"], r["tail"]) for r in kg_data.get("relations", [])):
+                    self._add_relation(head, relation, tail, doc_id, ts)
+        notify_write_listeners(self.write_listeners, kg_batch)
+        self._autosave()
+
+    def populate_kg(self, kg_data, bulk=True, doc_id=None):
+        """
+        Populate the graph from extracted KG data.
+        kg_data: {'entities': [...], 'relations': [...]}
+        """
+        self.populate_kg_batch([kg_data], doc_ids=None if doc_id is None else [doc_id])
+
+    def remove_kg_batch(self, kg_batch, chunk_size=None, doc_ids=None):
+        """
+        Remove the relations of several KG documents, then their entities that
+        are left without relationships, like Neo4jConnector.remove_kg_batch:
+        with doc_ids only those documents' support is withdrawn.
+        """
+        with self._lock:
+            removed = self._remove(kg_batch, doc_ids)
+        notify_write_listeners(self.write_listeners, [removed], removed=True)
+        self._autosave()
+
+    def _remove(self, kg_batch, doc_ids):
+        # Returns the removal payload for write listeners: deleted entities and touched facts.
+        withdrawn = {}
+        dropped = set()
+        candidates = set()
+        touched = {}
+        dropped_facts = set()
+        keys = self._keys()
+        for kg_data, doc_id in zip(kg_batch, doc_ids or [None] * len(kg_batch)):
+            doc = self.documents.get(doc_id) if doc_id is not None else None
+            if doc_id is not None and doc is None:
+                continue
+            # Relation endpoints are written like entities, so they are removed like them.
+            names = [ent["text"] for ent in kg_data.get("entities", [])]
+            for rel in kg_data.get("relations", []):
+                names += [rel["head"], rel["tail"]]
+            candidates.update(name for name in names if name in self.name_to_id)
+            if doc is not None:
+                for ent in kg_data.get("entities", []):
+                    if ent["text"] in doc["entities"]:
+                        doc["entities"].discard(ent["text"])
+                        self._unmention(doc, ent["text"])
+            for rel in kg_data.get("relations", []):
+                fact = (rel["head"], sanitize_rel_type(rel["type"]), rel["tail"])
+                position = keys.get(self._edge_key(*fact))
+                if position is None:
+                    continue
+                if doc is None:
+                    dropped.add(position)
+                    dropped_facts.add(fact)
+                elif fact in doc["relations"]:
+                    doc["relations"].discard(fact)
+                    self._unmention(doc, fact[0])
+                    self._unmention(doc, fact[2])
+                    withdrawn[position] = withdrawn.get(position, 0) + 1
+                else:
+                    continue
+                touched[fact] = None
+
+        # A fact deleted without a document ID is withdrawn from every document that asserted it.
+        if dropped_facts:
+            for doc in self.documents.values():
+                for fact in doc["relations"] & dropped_facts:
+                    doc["relations"].discard(fact)
+                    self._unmention(doc, fact[0])
+                    self._unmention(doc, fact[2])
+
+        if withdrawn or dropped:
+            self._flush()
+            for position, n in withdrawn.items():
+                self._count[position] -= n
+            dead = dropped | {position for position in withdrawn if self._count[position] <= 0}
+            for position in dead:
+                self._drop_edge(position)
+            self._csr = None
+            self._touch()
+
+        # Entities still mentioned by a document are kept, like a Neo4j node with MENTIONS.
+        orphans = [
+            self.name_to_id[name] for name in candidates
+            if self._degree[self.name_to_id[name]] == 0 and name not in self._entity_docs
+        ]
+        deleted = [self.names[node] for node in orphans]
+        for node in orphans:
+            self._drop_node(node)
+        return {
+            "entities": [{"text": name} for name in deleted],
+            "relations": [{"head": h, "type": r, "tail": t} for h, r, t in touched],
+        }
+
+    def remove_kg(self, kg_data, doc_id=None):
+        self.remove_kg_batch([kg_data], doc_ids=None if doc_id is None else [doc_id])
+
+    def retract_documents(self, doc_ids, chunk_size=None):
+        """
+        Withdraw everything the documents doc_ids contributed, like
+        Neo4jConnector.retract_documents.
+        """
+        kg_batch, retracted = [], []
+        with self._lock:
+            for doc_id in dict.fromkeys(doc_ids):
+                doc = self.documents.get(doc_id)
+                if doc is None:
+                    continue
+                kg_batch.append({
+                    "entities": [{"text": name} for name in doc["entities"]],
+                    "relations": [{"head": h, "type": r, "tail": t} for h, r, t in doc["relations"]],
+                })
+                retracted.append(doc_id)
+            removed = self._remove(kg_batch, retracted)
+            for doc_id in retracted:
+                del self.documents[doc_id]
+        notify_write_listeners(self.write_listeners, [removed], removed=True)
+        self._autosave()
+
+    def retract_document(self, doc_id):
+        self.retract_documents([doc_id])
+
+    def find_neighbors(self, names, limit=10, max_matches=5):
+        """
+        Fetch 1-hop facts around entities whose name matches any of names.
+        Returns (entity, source, relation, target) tuples, best matches first
+        and at most limit per entity, like Neo4jConnector.find_neighbors.
+        """
+        results = []
+        with self._lock:
+            for name in names:
+                if not name.strip():
+                    continue
+                found = 0
+                for node in self.match(name, max_matches):
+                    for neighbor, rel_type in self._adjacent(node):
+                        if found == limit:
+                            break
+                        results.append((name, self.names[node], self.rel_types[rel_type], self.names[neighbor]))
+                        found += 1
+        return results
+
+    def expand(self, names, hops=2, fanout=25, max_matches=5, max_frontier=100):
+        """
+        Bounded k-hop expansion around the entities whose name matches any of names,
+        like Neo4jConnector.expand. Returns (seeds, edges) with
+        (source, relation, target, support) edges.
+        """
+        seeds = {}
+        with self._lock:
+            for name in names:
+                if name.strip():
+                    for node in self.match(name, max_matches):
+                        seeds.setdefault(self.names[node], None)
+            seeds = list(seeds)
+            return seeds, self.k_hop(seeds, hops=hops, fanout=fanout, max_frontier=max_frontier)
+
+    # --- Graph queries ---
+
+    def entities(self):
+        """
+        (name, label) of all entities in the graph.
+        """
+        with self._lock:
+            return [(name, label) for name, label in zip(self.names, self.labels) if name is not None]
+
+    def entity_names(self):
+        """
+        Names of all entities in the graph.
+        """
+        with self._lock:
+            return [name for name in self.names if name is not None]
+
+    def match(self, name, max_matches=5):
+        """
+        Node IDs matching name: the exact name or its case-insensitive variants,
+        otherwise nodes containing every word of name (shortest names first).
+        """
+        with self._lock:
+            return self._match(name, max_matches)
+
+    def _match(self, name, max_matches):
+        matches = []
+        exact = self.name_to_id.get(name)
+        if exact is not None:
+            matches.append(exact)
+        for node in self._lower_to_ids.get(name.lower(), []):
+            if node not in matches:
+                matches.append(node)
+        if matches:
+            return matches[:max_matches]
+
+        # Word match: scan only the rarest word's posting list and check the other words per candidate.
+        tokens = set(_TOKEN.findall(name.lower()))
+        postings = [self._token_to_ids.get(tok, []) for tok in tokens]
+        if not postings:
+            return []
+        rarest = min(postings, key=len)
+        candidates = [
+            n for n in rarest
+            if self.names[n] is not None and tokens.issubset(_TOKEN.findall(self.names[n].lower()))
+        ]
+        candidates.sort(key=lambda n: (len(self.names[n]), n))
+        return candidates[:max_matches]
+
+    def neighbors(self, name):
+        """
+        1-hop (relation, neighbor) pairs of the entity called name, in either direction.
+        """
+        with self._lock:
+            node = self.name_to_id.get(name)
+            if node is None:
+                return []
+            return [(self.rel_types[r], self.names[n]) for n, r in self._adjacent(node)]
+
+    def k_hop(self, names, hops=2, fanout=None, max_frontier=None):
+        """
+        Breadth-first expansion from the entities called names.
+        Visits at most fanout edges per node, best-supported first, and
+        max_frontier nodes per hop (all when None) and returns the traversed
+        edges as (source, relation, target, support) tuples.
+        """
+        with self._lock:
+            return self._k_hop(names, hops, fanout, max_frontier)
+
+    def _k_hop(self, names, hops, fanout, max_frontier):
+        indptr, indices, types, outgoing, edge_ids = self._adjacency()
+        frontier = [self.name_to_id[n] for n in names if n in self.name_to_id]
+        seen = set(frontier)
+        edges = {}
+        for _ in range(hops):
+            next_frontier = []
+            for node in frontier[:max_frontier]:
+                start, end = indptr[node], indptr[node + 1]
+                if fanout is not None:
+                    end = min(end, start + fanout)
+                for i in range(start, end):
+                    neighbor = int(indices[i])
+                    source, target = (node, neighbor) if outgoing[i] else (neighbor, node)
+                    # Each edge is reachable from both endpoints; keep the first traversal.
+                    edges.setdefault((source, int(types[i]), target), int(edge_ids[i]))
+                    if neighbor not in seen:
+                        seen.add(neighbor)
+                        next_frontier.append(neighbor)
+            frontier = next_frontier
+        return [
+            (self.names[s], self.rel_types[r], self.names[t], int(self._count[edge]))
+            for (s, r, t), edge in edges.items()
+        ]
+
+    def num_nodes(self):
+        with self._lock:
+            return len(self.names) - self._dead_nodes
+
+    def num_edges(self):
+        with self._lock:
+            return len(self._src) + len(self._pending) - self._dead_edges
+
+    # --- Persistence ---
+
+    def snapshot(self, path=None):
+        """
+        Write the graph to a directory of .npy arrays plus a JSON name table.
+        The graph is only locked while its state is captured, not while the files are written.
+        """
+        path = path or self.path
+        with self._snapshot_lock:
+            with self._lock:
+                arrays, meta = self._capture()
+                version = self._version
+            try:
+                self._write_snapshot(path, arrays, meta)
+            finally:
+                self._saved_at = time.monotonic()
+            # Still dirty if the write failed (so the next write retries) or the graph changed meanwhile.
+            with self._lock:
+                if self._version == version:
+                    self._dirty = False
+
+    def _capture(self):
+        self._flush()
+        self._compact()
+        indptr, indices, types, outgoing, edge_ids = self._adjacency()
+        # Counts and last-seen times change in place on later writes; the other arrays are replaced.
+        arrays = {
+            "src": self._src, "dst": self._dst, "type": self._type,
+            "count": self._count.copy(), "first_seen": self._first_seen, "last_seen": self._last_seen.copy(),
+            "indptr": indptr, "indices": indices, "csr_type": types, "csr_out": outgoing, "csr_edge": edge_ids,
+        }
+        documents = [
+            [doc_id, sorted(doc["entities"]), sorted(doc["relations"])] for doc_id, doc in self.documents.items()
+        ]
+        meta = {
+            "names": list(self.names), "labels": list(self.labels), "rel_types": list(self.rel_types),
+            "documents": documents,
+        }
+        return arrays, meta
+
+    def _write_snapshot(self, path, arrays, meta):
+        os.makedirs(path, exist_ok=True)
+        for name, array in arrays.items():
+            # Write-then-rename: arrays may be memory-mapped from the files being replaced.
+            target = os.path.join(path, f"{name}.npy")
+            with open(target + ".tmp", "wb") as f:
+                np.save(f, np.asarray(array))
+            os.replace(target + ".tmp", target)
+        # The name table is written last, so a complete meta.json marks a complete snapshot.
+        tmp = os.path.join(path, "meta.json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, os.path.join(path, "meta.json"))
+
+    @classmethod
+    def load(cls, path):
+        return cls(path)
+
+    def _load(self, path):
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        self.rel_types = meta["rel_types"]
+        self._rel_type_ids = {rel: i for i, rel in enumerate(self.rel_types)}
+        for name, label in zip(meta["names"], meta["labels"]):
+            self._node_id(name, label)
+
+        for doc_id, entities, relations in meta.get("documents", []):
+            doc = self._document(doc_id)
+            for name in entities:
+                doc["entities"].add(name)
+                self._mention(doc, name)
+            for head, rel, tail in relations:
+                doc["relations"].add((head, rel, tail))
+                self._mention(doc, head)
+                self._mention(doc, tail)
+
+        arr = lambda name, mode="r": np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mode)
+        self._src, self._dst, self._type = arr("src"), arr("dst"), arr("type")
+        if os.path.exists(os.path.join(path, "count.npy")):
+            # Copy-on-write: counts and times change in place as facts are written again.
+            self._count, self._first_seen, self._last_seen = arr("count", "c"), arr("first_seen", "c"), arr("last_seen", "c")
+            self._csr = (arr("indptr"), arr("indices"), arr("csr_type"), arr("csr_out"), arr("csr_edge"))
+        else:
+            # Snapshot from before provenance: every edge counts as one write.
+            self._count = np.ones(len(self._src), dtype=np.int64)
+            self._first_seen = np.zeros(len(self._src), dtype=np.float64)
+            self._last_seen = np.zeros(len(self._src), dtype=np.float64)
+            self._csr = None
+        self._degree = np.bincount(
+            np.concatenate([self._src, self._dst]), minlength=len(self.names)
+        ).tolist()
+        self._dirty = False
+
+    # --- Internals ---
+
+    def _autosave(self):
+        # Snapshot in the background after writes, at most every save_interval seconds.
+        if not (self.path and self._dirty and time.monotonic() - self._saved_at >= self.save_interval):
+            return
+        if self._saving is not None and self._saving.is_alive():
+            return
+        self._saving = threading.Thread(target=self.snapshot, name="memory-graph-snapshot", daemon=True)
+        self._saving.start()
+
+    def _touch(self):
+        self._dirty = True
+        self._version += 1
+
+    def _node_id(self, name, label=None):
+        node = self.name_to_id.get(name)
+        if node is not None:
+            # A node first created as a relation endpoint gets the label of a later entity write.
+            if label is not None and self.labels[node] is None:
+                self.labels[node] = label
+                self._touch()
+            return node
+        node = self.name_to_id[name] = len(self.names)
+        self.names.append(name)
+        self.labels.append(label)
+        self._degree.append(0)
+        self._lower_to_ids.setdefault(name.lower(), []).append(node)
+        for token in set(_TOKEN.findall(name.lower())):
+            self._token_to_ids.setdefault(token, []).append(node)
+        self._csr = None
+        self._touch()
+        return node
+
+    def _drop_node(self, node):
+        # Tombstone: the ID stays allocated until _compact(); word postings skip it lazily.
+        name = self.names[node]
+        del self.name_to_id[name]
+        variants = self._lower_to_ids[name.lower()]
+        variants.remove(node)
+        if not variants:
+            del self._lower_to_ids[name.lower()]
+        self.names[node] = None
+        self.labels[node] = None
+        self._dead_nodes += 1
+        self._touch()
+
+    def _drop_edge(self, position):
+        # Tombstone: a zero count marks the edge dead until _compact().
+        h, r, t = int(self._src[position]), int(self._type[position]), int(self._dst[position])
+        self._count[position] = 0
+        self._keys().pop((h, r, t), None)
+        self._degree[h] -= 1
+        self._degree[t] -= 1
+        self._dead_edges += 1
+
+    def _compact(self):
+        # Drop tombstoned edges and nodes; node IDs are positions, so survivors are renumbered.
+        if self._dead_edges:
+            live = self._count > 0
+            self._src, self._dst, self._type = self._src[live], self._dst[live], self._type[live]
+            self._count, self._first_seen, self._last_seen = (
+                self._count[live], self._first_seen[live], self._last_seen[live]
+            )
+            self._dead_edges = 0
+            self._edge_keys = None
+            self._csr = None
+        if self._dead_nodes:
+            keep = np.array([name is not None for name in self.names], dtype=bool)
+            new_ids = np.cumsum(keep) - 1
+            self._src, self._dst = new_ids[self._src], new_ids[self._dst]
+            names = [name for name in self.names if name is not None]
+            labels = [label for label, kept in zip(self.labels, keep) if kept]
+            degree = [d for d, kept in zip(self._degree, keep) if kept]
+
+            self.names, self.labels, self._degree = [], [], []
+            self.name_to_id, self._lower_to_ids, self._token_to_ids = {}, {}, {}
+            for name, label in zip(names, labels):
+                self._node_id(name, label)
+            self._degree = degree
+            self._dead_nodes = 0
+            self._edge_keys = None
+            self._csr = None
+
+    def _document(self, doc_id):
+        doc = self.documents.get(doc_id)
+        if doc is None:
+            doc = self.documents[doc_id] = {"entities": set(), "relations": set(), "refs": {}}
+        return doc
+
+    def _mention(self, doc, name):
+        # A document mentions a name while it lists it or asserts a fact about it.
+        self._touch()
+        refs = doc["refs"]
+        refs[name] = refs.get(name, 0) + 1
+        if refs[name] == 1:
+            self._entity_docs[name] = self._entity_docs.get(name, 0) + 1
+
+    def _unmention(self, doc, name):
+        self._touch()
+        refs = doc["refs"]
+        if name not in refs:
+            return
+        refs[name] -= 1
+        if not refs[name]:
+            del refs[name]
+            self._entity_docs[name] -= 1
+            if not self._entity_docs[name]:
+                del self._entity_docs[name]
+
+    def _edge_key(self, head, rel_type, tail):
+        h, t = self.name_to_id.get(head), self.name_to_id.get(tail)
+        r = self._rel_type_ids.get(rel_type)
+        return None if h is None or t is None or r is None else (h, r, t)
+
+    def _add_support(self, position, n, ts):
+        flushed = len(self._src)
+        if position < flushed:
+            self._count[position] += n
+            self._last_seen[position] = ts
+        else:
+            item = self._pending[position - flushed]
+            item[3] += n
+            item[5] = ts
+
+    def _keys(self):
+        # Edge key -> position, built on first write so loading a snapshot stays cheap.
+        if self._edge_keys is None:
+            keys = zip(self._src.tolist(), self._type.tolist(), self._dst.tolist(), self._count.tolist())
+            self._edge_keys = {(h, r, t): i for i, (h, r, t, count) in enumerate(keys) if count > 0}
+            for i, (h, t, r, _, _, _) in enumerate(self._pending, start=len(self._src)):
+                self._edge_keys[(h, r, t)] = i
+        return self._edge_keys
+
+    def _flush(self):
+        if self._pending:
+            src, dst, types, counts, first_seen, last_seen = zip(*self._pending)
+            self._src = np.concatenate([self._src, np.array(src, dtype=np.int64)])
+            self._dst = np.concatenate([self._dst, np.array(dst, dtype=np.int64)])
+            self._type = np.concatenate([self._type, np.array(types, dtype=np.int32)])
+            self._count = np.concatenate([self._count, np.array(counts, dtype=np.int64)])
+            self._first_seen = np.concatenate([self._first_seen, np.array(first_seen, dtype=np.float64)])
+            self._last_seen = np.concatenate([self._last_seen, np.array(last_seen, dtype=np.float64)])
+            self._pending = []
+
+    def _adjacency(self):
+        """
+        CSR adjacency over both edge directions: (indptr, indices, types, outgoing, edge_ids).
+        Each node's edges are ordered by support, most supported first.
+        """
+        if self._csr is None:
+            self._flush()
+            n = len(self.names)
+            # Tombstoned edges (zero count) are left out.
+            live = np.flatnonzero(self._count > 0) if self._dead_edges else np.arange(len(self._src))
+            m = len(live)
+            src, dst, rel_types = self._src[live], self._dst[live], self._type[live]
+            rows = np.concatenate([src, dst])
+            cols = np.concatenate([dst, src])
+            types = np.concatenate([rel_types, rel_types])
+            outgoing = np.concatenate([np.ones(m, dtype=bool), np.zeros(m, dtype=bool)])
+            edge_ids = np.concatenate([live, live])
+
+            # lexsort is stable: equally supported edges keep insertion order.
+            order = np.lexsort((-self._count[edge_ids], rows))
+            indptr = np.zeros(n + 1, dtype=np.int64)
+            np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+            self._csr = (indptr, cols[order], types[order], outgoing[order], edge_ids[order])
+        return self._csr
+
+    def _adjacent(self, node):
+        indptr, indices, types, _, _ = self._adjacency()
+        start, end = indptr[node], indptr[node + 1]
+        return zip(indices[start:end].tolist(), types[start:end].tolist())
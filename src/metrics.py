@@ -0,0 +1,129 @@
+"""
+Per-stage timers and counters for the pipeline.
+
+Components record into the process-wide `metrics` object:
+
+    with metrics.stage("generate"):
+        ...
+    metrics.incr("tokens_in", n)
+
+Export with metrics.to_json() or metrics.to_prometheus(). Set
+ABSTRACTIVEKG_METRICS=0 to turn recording into a no-op. Progress messages go
+through the standard logging module ("abstractivekg.*" loggers), so they
+cost a level check when those loggers are not enabled.
+"""
+import cProfile
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+class _NullStage:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_STAGE = _NullStage()
+
+class _Stage:
+    __slots__ = ("metrics", "name", "start")
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.name, time.perf_counter() - self.start)
+        return False
+
+class PipelineMetrics:
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.stages = {}
+            self.counters = {}
+
+    def stage(self, name):
+        """
+        Context manager that times one execution of stage name.
+        """
+        return _Stage(self, name) if self.enabled else _NULL_STAGE
+
+    def observe(self, name, seconds):
+        if not self.enabled:
+            return
+        with self._lock:
+            stats = self.stages.get(name)
+            if stats is None:
+                stats = self.stages[name] = {"count": 0, "seconds": 0.0, "max_seconds": 0.0}
+            stats["count"] += 1
+            stats["seconds"] += seconds
+            stats["max_seconds"] = max(stats["max_seconds"], seconds)
+
+    def incr(self, name, value=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "stages": {name: dict(stats) for name, stats in self.stages.items()},
+                "counters": dict(self.counters),
+            }
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.snapshot(), **kwargs)
+
+    def to_prometheus(self, prefix="abstractivekg"):
+        """
+        Render the metrics in the Prometheus text exposition format.
+        """
+        snap = self.snapshot()
+        lines = [
+            f"# HELP {prefix}_stage_seconds Time spent per pipeline stage.",
+            f"# TYPE {prefix}_stage_seconds summary",
+        ]
+        for name, stats in sorted(snap["stages"].items()):
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{name}"}} {stats["seconds"]:.6f}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{name}"}} {stats["count"]}')
+        for name, value in sorted(snap["counters"].items()):
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            lines.append(f"{prefix}_{name}_total {value}")
+        return "\n".join(lines) + "\n"
+
+metrics = PipelineMetrics(enabled=os.getenv("ABSTRACTIVEKG_METRICS", "1") != "0")
+
+@contextmanager
+def profile(path=None, enabled=True):
+    """
+    Optional cProfile hook: profile the enclosed block and dump stats to path
+    (defaults to $ABSTRACTIVEKG_PROFILE; does nothing when neither is set).
+    View with `python -m pstats <path>` or snakeviz. Sampling profilers such
+    as py-spy need no hook, but they report functions, not stages: inline
+    metrics.stage() blocks (e.g. "tokenize" and "generate") show up under their
+    enclosing function, such as Summarizer.iter_summaries.
+    """
+    path = path or os.getenv("ABSTRACTIVEKG_PROFILE")
+    if not (enabled and path):
+        yield None
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
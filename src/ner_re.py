@@ -1,21 +1,48 @@
-import spacy
-from spacy.matcher import Matcher
+from src import registry
+from src.metrics import metrics
+from src.relation_rules import RelationRules, DEFAULT_PATTERNS_PATH
+
+RELATION_ENGINES = ("loop", "rules")
 
 class KGExtractor:
-    def __init__(self, model="en_core_web_sm"):
-        try:
-            self.nlp = spacy.load(model)
-        except OSError:
-            print(f"Downloading {model}...")
-            from spacy.cli import download
-            download(model)
-            self.nlp = spacy.load(model)
+    def __init__(self, model="en_core_web_sm", nlp=None, relation_engine="loop", patterns_path=DEFAULT_PATTERNS_PATH):
+        self.model_name = model
+        # The spaCy Language is shared process-wide unless one is passed in.
+        self.nlp = nlp if nlp is not None else registry.get_spacy(model)
+        # "loop": the original subject-verb-object walk; "rules": DependencyMatcher rules from patterns_path.
+        # "loop" stays the default until the rules show a recall gain on benchmarks/bench_relation_rules.py.
+        if relation_engine not in RELATION_ENGINES:
+            raise ValueError(f"Unknown relation engine '{relation_engine}', expected one of {RELATION_ENGINES}")
+        self.relation_engine = relation_engine
+        self.rules = None
+        # Components skipped on every parse; passed per call because the Language is shared.
+        self.disabled = []
+        if relation_engine == "rules":
+            self.rules = RelationRules.from_file(self.nlp.vocab, patterns_path)
+            self.disabled = self.rules.disabled_components(self.nlp)
+        self._lemmatize = None
+        if "lemmatizer" in self.disabled:
+            lemmatizer = self.nlp.get_pipe("lemmatizer")
+            # Public per-mode methods; "pos_lookup" and custom modes fall back to the lookup table.
+            self._lemmatize = lemmatizer.rule_lemmatize if lemmatizer.mode == "rule" else lemmatizer.lookup_lemmatize
+
+    def _parse(self, text):
+        return self.nlp(text, disable=self.disabled)
+
+    def _lemma(self, token):
+        # With the lemmatizer disabled, only the handful of tokens in relation labels are lemmatized.
+        if self._lemmatize is not None:
+            return self._lemmatize(token)[0]
+        return token.lemma_ or token.lower_
 
     def extract_entities(self, text):
         """
         Extract named entities from text.
         """
-        doc = self.nlp(text)
+        return self._entities_from_doc(self._parse(text))
+
+    @staticmethod
+    def _entities_from_doc(doc):
         entities = []
         for ent in doc.ents:
             entities.append({
@@ -29,9 +56,18 @@ class KGExtractor:
     def extract_relations(self, text):
         """
         Extract relations (triples) using dependency parsing.
+        """
+        return self._relations_from_doc(self._parse(text))
+
+    def _relations_from_doc(self, doc):
+        if self.rules is not None:
+            return self.rules.extract(doc, self._lemma)
+        return self._loop_relations_from_doc(doc)
+
+    def _loop_relations_from_doc(self, doc):
+        """
         Heuristic: Subject -> Verb -> Object
         """
-        doc = self.nlp(text)
         triples = []
 
         for sent in doc.sents:
@@ -40,20 +76,20 @@ class KGExtractor:
                 if token.dep_ in ("nsubj", "nsubjpass"):  # Subject
                     subj = token
                     verb = token.head
-                    
+
                     # Find object
                     obj = None
                     for child in verb.children:
                         if child.dep_ in ("dobj", "attr", "prep", "pobj"):
                             obj = child
                             break
-                    
+
                     if obj:
                         # Expand subject and object to full phrases
                         subj_text = self._get_compound(subj)
                         obj_text = self._get_compound(obj)
                         relation = verb.lemma_
-                        
+
                         triples.append({
                             "head": subj_text,
                             "type": relation,
@@ -72,13 +108,36 @@ class KGExtractor:
         phrase.sort(key=lambda x: x.i)
         return " ".join([t.text for t in phrase])
 
+    def _kg_from_doc(self, doc):
+        with metrics.stage("extract"):
+            kg_data = {
+                "entities": self._entities_from_doc(doc),
+                "relations": self._relations_from_doc(doc)
+            }
+        metrics.incr("entities", len(kg_data["entities"]))
+        metrics.incr("relations", len(kg_data["relations"]))
+        return kg_data
+
     def extract_kg(self, text):
         """
         Extract both entities and relations.
+        The text is parsed once and both passes read from the same Doc.
+        """
+        with metrics.stage("spacy_parse"):
+            doc = self._parse(text)
+        return self._kg_from_doc(doc)
+
+    def extract_kg_batch(self, texts, batch_size=64, n_process=1):
+        """
+        Extract entities and relations for many texts.
+        Documents are streamed through nlp.pipe, so each one is parsed exactly once.
+        Yields one result per text, in input order, identical to extract_kg.
         """
-        entities = self.extract_entities(text)
-        relations = self.extract_relations(text)
-        return {
-            "entities": entities,
-            "relations": relations
-        }
+        docs = self.nlp.pipe(texts, batch_size=batch_size, n_process=n_process, disable=self.disabled)
+        while True:
+            # Time the parse separately from extraction; nlp.pipe parses lazily on next().
+            with metrics.stage("spacy_parse"):
+                doc = next(docs, None)
+            if doc is None:
+                return
+            yield self._kg_from_doc(doc)
@@ -1,40 +1,224 @@
-from src.summarizer import Summarizer
+import logging
+import os
+import threading
+from src import registry
+from src.metrics import metrics
 from src.ner_re import KGExtractor
-from src.graph_db import Neo4jConnector
+from src.relation_rules import DEFAULT_PATTERNS_PATH, patterns_digest
+from src.entity_resolution import EntityResolver
+from src.cache import ResultCache, make_cache_key, DEFAULT_CACHE_PATH
+
+# Progress messages; enable with logging.basicConfig(level=logging.INFO).
+logger = logging.getLogger("abstractivekg.pipeline")
 
 class AbstractiveKGPipeline:
-    def __init__(self):
-        print("Initializing Pipeline...")
-        self.summarizer = Summarizer()
-        self.kg_extractor = KGExtractor()
+    def __init__(self, use_cache=True, cache_path=DEFAULT_CACHE_PATH, cache_max_entries=100_000, connect_db=True,
+                 summarizer_backend="torch", summarizer_checkpoint="facebook/bart-large-cnn",
+                 spacy_model="en_core_web_sm", graph_backend=None, resolve_entities=True,
+                 entity_index=True, relation_engine="loop", patterns_path=DEFAULT_PATTERNS_PATH):
+        logger.info("Initializing Pipeline...")
+        # Models are loaded lazily through the shared registry on first use.
+        self.summarizer_checkpoint = summarizer_checkpoint
+        self.summarizer_backend = summarizer_backend
+        self.spacy_model = spacy_model
+        self.relation_engine = relation_engine
+        self.patterns_path = patterns_path
+        # Editing the pattern file changes the extracted relations, so its hash is part of the cache key.
+        self._patterns_digest = patterns_digest(patterns_path) if relation_engine == "rules" else None
+        self._kg_extractor = None
+        self.summary_max_length = 128
+        self.summary_num_beams = 4
+        # Map-reduce settings for documents longer than the summarizer input (see Summarizer.summarize_long).
+        self.summary_chunk_tokens = 1000
+        self.summary_overlap = 100
+        self.summary_fan_in = 6
+        # Maps mentions ("Musk", "elon musk") to canonical entities before storage.
+        self.entity_resolver = EntityResolver() if resolve_entities else None
+        self.cache = ResultCache(cache_path, max_entries=cache_max_entries) if use_cache else None
+        # "neo4j" or "memory" (in-process InMemoryGraph, works without a database).
+        self.graph_backend = graph_backend or os.getenv("GRAPH_BACKEND", "neo4j")
+        self.db_connected = False
+        if connect_db:
+            try:
+                self.db_connector = registry.get_graph_store(self.graph_backend)
+                self.db_connected = True
+            except Exception as e:
+                logger.warning("Could not connect to Neo4j: %s", e)
+        self._seeding = None
+        if self.db_connected and self.entity_resolver is not None:
+            # Mentions resolve to the entities already stored, not only to those seen in this session.
+            # The graph is streamed in the background so startup stays fast; resolve() waits for it.
+            self._seeding = threading.Thread(target=self._seed_resolver, name="entity-resolver-seed", daemon=True)
+            self._seeding.start()
+        # Semantic entity index used by GraphRAG, kept in sync with every graph write.
+        self.entity_index = None
+        if self.db_connected and entity_index:
+            self.entity_index = registry.get_entity_index()
+        if self.entity_index is not None:
+            self.db_connector.add_write_listener(self.entity_index.on_graph_write)
+            if not len(self.entity_index):
+                # An index created after the graph is filled from the stored entities, without blocking startup.
+                self.entity_index.backfill(self.db_connector.entity_names(), background=True)
+
+    def _seed_resolver(self):
         try:
-            self.db_connector = Neo4jConnector()
-            self.db_connected = True
+            seeded = self.entity_resolver.seed(self.db_connector.entities())
+            logger.info("Seeded entity resolution with %d stored entities.", seeded)
         except Exception as e:
-            print(f"Warning: Could not connect to Neo4j: {e}")
-            self.db_connected = False
+            logger.warning("Could not seed entity resolution from the graph: %s", e)
+
+    @property
+    def summarizer(self):
+        return registry.get_summarizer(self.summarizer_checkpoint, self.summarizer_backend)
+
+    @property
+    def kg_extractor(self):
+        if self._kg_extractor is None:
+            self._kg_extractor = KGExtractor(
+                self.spacy_model, relation_engine=self.relation_engine, patterns_path=self.patterns_path
+            )
+        return self._kg_extractor
+
+    def summary_params(self):
+        """
+        Settings that determine the summary, as cache key parameters.
+        """
+        return {
+            "summarizer": self.summarizer_checkpoint,
+            "backend": self.summarizer_backend,
+            "max_length": self.summary_max_length,
+            "num_beams": self.summary_num_beams,
+            "chunk_tokens": self.summary_chunk_tokens,
+            "overlap": self.summary_overlap,
+            "fan_in": self.summary_fan_in,
+        }
+
+    def summarize_long(self, text):
+        """
+        Map-reduce summary of text under the pipeline's settings, with chunk summaries cached.
+        """
+        return self.summarizer.summarize_long(
+            text,
+            chunk_tokens=self.summary_chunk_tokens,
+            overlap=self.summary_overlap,
+            fan_in=self.summary_fan_in,
+            max_length=self.summary_max_length,
+            num_beams=self.summary_num_beams,
+            cache=self.cache,
+        )
+
+    def summarize_batch(self, texts, batch_size=8):
+        """
+        Summaries of texts, like summarize_and_extract: texts that fit in one
+        chunk are summarized in batches, longer ones through summarize_long.
+        """
+        summarizer = self.summarizer
+        summaries = [None] * len(texts)
+        short = [i for i, text in enumerate(texts) if summarizer.fits_in_chunk(text, self.summary_chunk_tokens)]
+        if short:
+            generated = summarizer.generate_summaries(
+                [texts[i] for i in short],
+                batch_size=batch_size,
+                max_length=self.summary_max_length,
+                num_beams=self.summary_num_beams,
+            )
+            for i, summary in zip(short, generated):
+                summaries[i] = summary
+        for i, text in enumerate(texts):
+            if summaries[i] is None:
+                summaries[i] = self.summarize_long(text)
+        return summaries
+
+    def extraction_params(self):
+        """
+        Settings that determine the extracted KG, as cache key parameters.
+        """
+        return {
+            "kg_model": self.spacy_model,
+            "relation_engine": self.relation_engine,
+            "patterns": self._patterns_digest,
+        }
+
+    def cache_key(self, text):
+        """
+        Cache key for text under the current model checkpoints and generation settings.
+        """
+        return make_cache_key(text, **self.summary_params(), **self.extraction_params())
 
-    def process(self, text):
-        print("\n--- Step 1: Abstractive Summarization ---")
-        summary = self.summarizer.generate_summary(text)
-        print(f"Summary: {summary}")
+    def summarize_and_extract(self, text):
+        """
+        Steps 1 and 2: summarize text and extract its KG, reusing cached results when available.
+        """
+        cached = None
+        if self.cache is not None:
+            key = self.cache_key(text)
+            cached = self.cache.get(key)
 
-        print("\n--- Step 2: Knowledge Graph Extraction ---")
-        # Extract from the original text OR the summary. 
-        # Using summary might be cleaner for the graph, using original text gives more detail.
-        # Let's use the Summary for the KG to keep it 'Abstractive' and concise.
-        kg_data = self.kg_extractor.extract_kg(summary)
-        print(f"Extracted {len(kg_data['entities'])} entities and {len(kg_data['relations'])} relations.")
+        if cached is not None:
+            summary, kg_data = cached["summary"], cached["kg_data"]
+            logger.info("\n--- Cache hit: reusing summary and knowledge graph ---")
+            logger.info("Summary: %s", summary)
+        else:
+            logger.info("\n--- Step 1: Abstractive Summarization ---")
+            # Long documents are summarized chunk by chunk and then reduced; short ones in one pass.
+            summary = self.summarize_long(text)
+            logger.info("Summary: %s", summary)
+
+            logger.info("\n--- Step 2: Knowledge Graph Extraction ---")
+            # Extract from the original text OR the summary. 
+            # Using summary might be cleaner for the graph, using original text gives more detail.
+            # Let's use the Summary for the KG to keep it 'Abstractive' and concise.
+            kg_data = self.kg_extractor.extract_kg(summary)
+
+            if self.cache is not None:
+                self.cache.put(key, {"summary": summary, "kg_data": kg_data})
+
+        return summary, kg_data
+
+    def resolve(self, kg_data):
+        """
+        Canonicalize entity names in kg_data (no-op when entity resolution is disabled).
+        """
+        if self.entity_resolver is None:
+            return kg_data
+        if self._seeding is not None:
+            self._seeding.join()
+        return self.entity_resolver.resolve_kg(kg_data)
+
+    def process(self, text, doc_id=None):
+        summary, kg_data = self.summarize_and_extract(text)
+        kg_data = self.resolve(kg_data)
+        logger.info("Extracted %d entities and %d relations.", len(kg_data["entities"]), len(kg_data["relations"]))
 
         if self.db_connected:
-            print("\n--- Step 3: Graph Database Storage ---")
-            self.db_connector.populate_kg(kg_data)
-            print("Data stored in Neo4j.")
+            logger.info("\n--- Step 3: Graph Database Storage ---")
+            with metrics.stage("store"):
+                self.db_connector.populate_kg(kg_data, doc_id=doc_id)
+            logger.info("Data stored in Neo4j." if self.graph_backend == "neo4j" else "Data stored in the in-memory graph.")
         else:
-            print("\n--- Step 3: Skipped (No DB Connection) ---")
+            logger.info("\n--- Step 3: Skipped (No DB Connection) ---")
 
         return summary, kg_data
 
+    @property
+    def metrics(self):
+        """
+        Process-wide stage timers and counters (see src/metrics.py).
+        """
+        return metrics
+
+    def cache_stats(self):
+        return self.cache.stats() if self.cache is not None else None
+
     def close(self):
+        if self._seeding is not None:
+            self._seeding.join()
+        if self.entity_index is not None:
+            self.db_connector.remove_write_listener(self.entity_index.on_graph_write)
+            registry.release_entity_index()
+            self.entity_index = None
         if self.db_connected:
-            self.db_connector.close()
+            registry.release_graph_store(self.graph_backend)
+            self.db_connected = False
+        if self.cache is not None:
+            self.cache.close()
@@ -0,0 +1,137 @@
+"""
+Process-wide registry of heavy shared resources.
+
+Models, metrics and the Neo4j driver are created on first use and then
+shared by every component in the process (pipeline, GraphRAG, ingestion),
+so a Streamlit app holds one spaCy Language and one driver instead of one
+per component. Heavy libraries are imported inside the loaders, which keeps
+importing this module (and the modules that use it) cheap.
+"""
+import os
+import threading
+
+_lock = threading.Lock()
+_key_locks = {}
+_instances = {}
+_refs = {}
+
+def _get_or_create(key, factory):
+    # Per-key locks let different resources load in parallel while each loads only once.
+    instance = _instances.get(key)
+    if instance is not None:
+        return instance
+    with _lock:
+        key_lock = _key_locks.setdefault(key, threading.Lock())
+    with key_lock:
+        if key not in _instances:
+            _instances[key] = factory()
+        return _instances[key]
+
+def _load_spacy(model):
+    import spacy
+    try:
+        return spacy.load(model)
+    except OSError:
+        print(f"Downloading {model}...")
+        from spacy.cli import download
+        download(model)
+        return spacy.load(model)
+
+def get_spacy(model="en_core_web_sm"):
+    """
+    Shared spaCy Language for model.
+    """
+    return _get_or_create(("spacy", model), lambda: _load_spacy(model))
+
+def get_summarizer(model_checkpoint="facebook/bart-large-cnn", backend="torch"):
+    """
+    Shared Summarizer for a checkpoint/backend pair.
+    """
+    def load():
+        from src.summarizer import Summarizer
+        return Summarizer(model_checkpoint, backend=backend)
+    return _get_or_create(("summarizer", model_checkpoint, backend), load)
+
+def get_rouge():
+    """
+    Shared ROUGE metric; only needed for training and evaluation.
+    """
+    def load():
+        import evaluate
+        return evaluate.load("rouge")
+    return _get_or_create(("metric", "rouge"), load)
+
+def _acquire(key, factory):
+    instance = _get_or_create(key, factory)
+    with _lock:
+        _refs[key] = _refs.get(key, 0) + 1
+    return instance
+
+def _release(key):
+    with _lock:
+        _refs[key] = _refs.get(key, 0) - 1
+        if _refs[key] > 0:
+            return
+        _refs.pop(key, None)
+        instance = _instances.pop(key, None)
+    if instance is not None:
+        instance.close()
+
+def get_neo4j_connector():
+    """
+    Shared Neo4jConnector (one driver and connection pool per process).
+    Every call must be paired with release_neo4j_connector(). The driver is
+    closed when the last user releases it. Connection failures are raised
+    and not cached, so a later call retries.
+    """
+    def load():
+        from src.graph_db import Neo4jConnector
+        return Neo4jConnector()
+    return _acquire(("neo4j",), load)
+
+def release_neo4j_connector():
+    _release(("neo4j",))
+
+def get_graph_store(backend="neo4j"):
+    """
+    Shared graph store for backend: "neo4j" (Neo4jConnector) or "memory"
+    (InMemoryGraph, snapshotted to $MEMORY_GRAPH_PATH when that is set).
+    Pair with release_graph_store(backend).
+    """
+    if backend == "neo4j":
+        return get_neo4j_connector()
+    if backend == "memory":
+        def load():
+            from src.memory_graph import InMemoryGraph
+            return InMemoryGraph(os.getenv("MEMORY_GRAPH_PATH"))
+        return _acquire(("memory_graph",), load)
+    raise ValueError(f"Unknown graph backend '{backend}', expected 'neo4j' or 'memory'")
+
+def release_graph_store(backend="neo4j"):
+    _release(("neo4j",) if backend == "neo4j" else ("memory_graph",))
+
+def get_entity_index():
+    """
+    Shared EntityIndex for semantic entity linking, persisted to $ENTITY_INDEX_PATH
+    (default .cache/entity_index) with the $ENTITY_ENCODER encoder, or None
+    when $ENTITY_ENCODER is not set: semantic linking is opt-in.
+    Pair a non-None result with release_entity_index(); the index is saved
+    when the last user releases it.
+    """
+    encoder = os.getenv("ENTITY_ENCODER")
+    if not encoder:
+        return None
+    def load():
+        from src.entity_index import EntityIndex, DEFAULT_INDEX_PATH
+        return EntityIndex(os.getenv("ENTITY_INDEX_PATH", DEFAULT_INDEX_PATH), encoder=encoder)
+    return _acquire(("entity_index",), load)
+
+def release_entity_index():
+    _release(("entity_index",))
+
+def preload(model_checkpoint="facebook/bart-large-cnn", backend="torch", spacy_model="en_core_web_sm"):
+    """
+    Eagerly load the inference models, e.g. to warm up a server before taking traffic.
+    """
+    get_summarizer(model_checkpoint, backend)
+    get_spacy(spacy_model)
@@ -0,0 +1,89 @@
+"""
+Rule-based relation extraction compiled into a spaCy DependencyMatcher.
+
+Rules are declared in a JSON pattern file (src/patterns/relations.json by
+default). Each rule is a DependencyMatcher pattern plus the names of the
+pattern nodes that form the head phrase, the tail phrase and the relation
+label. All rules are matched in one pass over the parse.
+"""
+import hashlib
+import json
+import os
+
+from spacy.matcher import DependencyMatcher
+
+DEFAULT_PATTERNS_PATH = os.path.join(os.path.dirname(__file__), "patterns", "relations.json")
+
+# Components that relation rules never read. The lemmatizer is only needed when
+# a pattern matches on LEMMA; relation labels lemmatize their few tokens on demand.
+OPTIONAL_COMPONENTS = ("lemmatizer", "textcat", "textcat_multilabel", "entity_linker", "spancat", "span_finder")
+
+def patterns_digest(path=DEFAULT_PATTERNS_PATH):
+    """
+    Content hash of a pattern file, for cache keys of extracted relations.
+    """
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def _uses_attr(pattern, attr):
+    return any(attr in node.get("RIGHT_ATTRS", {}) for node in pattern)
+
+class RelationRules:
+    def __init__(self, vocab, rules):
+        self.rules = rules
+        self.matcher = DependencyMatcher(vocab)
+        self._compiled = {}
+        for rule in rules:
+            self.matcher.add(rule["name"], [rule["pattern"]])
+            nodes = [node["RIGHT_ID"] for node in rule["pattern"]]
+            # Matches list token indices in pattern order, so resolve node names to positions once.
+            self._compiled[vocab.strings[rule["name"]]] = (
+                nodes.index(rule["head"]),
+                nodes.index(rule["tail"]),
+                [nodes.index(name) for name in rule["relation"]],
+            )
+        self.needs_lemmas = any(_uses_attr(rule["pattern"], "LEMMA") for rule in rules)
+
+    @classmethod
+    def from_file(cls, vocab, path=DEFAULT_PATTERNS_PATH):
+        with open(path, encoding="utf-8") as f:
+            return cls(vocab, json.load(f)["rules"])
+
+    def disabled_components(self, nlp):
+        """
+        Pipeline components that can be skipped when extracting with these rules.
+        """
+        return [
+            name for name in nlp.pipe_names
+            if name in OPTIONAL_COMPONENTS and not (name == "lemmatizer" and self.needs_lemmas)
+        ]
+
+    def extract(self, doc, lemma):
+        """
+        Triples matched in doc, in document order without duplicates.
+        lemma maps a token to the string used in relation labels.
+        """
+        entity_of = {token.i: ent for ent in doc.ents for token in ent}
+        triples = {}
+        for match_id, token_ids in sorted(self.matcher(doc), key=lambda m: m[1]):
+            head_pos, tail_pos, relation_pos = self._compiled[match_id]
+            head = self._phrase(doc[token_ids[head_pos]], entity_of)
+            tail = self._phrase(doc[token_ids[tail_pos]], entity_of)
+            if head == tail:
+                continue
+            relation = " ".join(lemma(doc[token_ids[i]]) for i in relation_pos)
+            triples.setdefault((head, relation, tail), None)
+        return [{"head": head, "type": relation, "tail": tail} for head, relation, tail in triples]
+
+    @staticmethod
+    def _phrase(token, entity_of):
+        # A token inside a named entity stands for the whole entity; otherwise
+        # take the token with its compound modifiers ("Starship rocket").
+        ent = entity_of.get(token.i)
+        if ent is not None:
+            return ent.text
+        start = token.i
+        for child in token.lefts:
+            if child.dep_ == "compound":
+                start = min(start, child.left_edge.i)
+        return token.doc[start:token.i + 1].text
@@ -0,0 +1,134 @@
+"""
+Document sources for the app and batch ingestion: web pages and PDFs.
+
+URLs are fetched concurrently through one pooled requests.Session with
+connect/read timeouts, retries with backoff on transient errors, and a cap on
+the response size. PDF pages are extracted in a process pool and yielded in
+page order as they complete, so a long PDF is streamed page by page instead
+of being built into one string.
+"""
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_TIMEOUT = (5, 30)
+DEFAULT_MAX_BYTES = 10 * 2**20
+USER_AGENT = "AbstractiveKG-NLP/0.1"
+
+class ResponseTooLarge(Exception):
+    pass
+
+def make_session(pool_size=16, retries=3, backoff_factor=0.5):
+    """
+    requests.Session whose connection pool is sized for pool_size concurrent fetches
+    and which retries connection errors and 429/5xx responses with exponential backoff.
+    """
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({"GET", "HEAD"}),
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["User-Agent"] = USER_AGENT
+    return session
+
+def html_to_text(html):
+    """
+    Paragraph text of an HTML page.
+    """
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, "html.parser")
+    return " ".join(p.get_text() for p in soup.find_all("p"))
+
+def fetch_url(url, session=None, timeout=DEFAULT_TIMEOUT, max_bytes=DEFAULT_MAX_BYTES):
+    """
+    Fetch url and return its paragraph text.
+    Raises requests exceptions on failure and ResponseTooLarge past max_bytes.
+    """
+    if session is None:
+        with make_session(pool_size=1) as session:
+            return fetch_url(url, session, timeout, max_bytes)
+    with session.get(url, timeout=timeout, stream=True) as response:
+        response.raise_for_status()
+        declared = response.headers.get("Content-Length")
+        if declared and declared.isdigit() and int(declared) > max_bytes:
+            raise ResponseTooLarge(f"{url} is {declared} bytes, limit is {max_bytes}")
+        body = bytearray()
+        for chunk in response.iter_content(chunk_size=64 * 1024):
+            body.extend(chunk)
+            # Content-Length may be missing or wrong, so enforce the limit while reading.
+            if len(body) > max_bytes:
+                raise ResponseTooLarge(f"{url} exceeds {max_bytes} bytes")
+    return html_to_text(bytes(body))
+
+def fetch_urls(urls, max_workers=8, session=None, timeout=DEFAULT_TIMEOUT, max_bytes=DEFAULT_MAX_BYTES):
+    """
+    Fetch urls concurrently and yield (url, text, error) in input order.
+    A failed fetch yields text None and the exception as error; it does not
+    stop the other fetches.
+    """
+    session = session or make_session(pool_size=max_workers)
+
+    def fetch(url):
+        try:
+            return url, fetch_url(url, session, timeout, max_bytes), None
+        except Exception as e:
+            return url, None, e
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        yield from executor.map(fetch, urls)
+
+# --- PDF ---
+
+_worker_reader = None
+
+def _init_pdf_worker(data):
+    # Each worker parses the document once and then extracts the page ranges it is given.
+    global _worker_reader
+    import PyPDF2
+    _worker_reader = PyPDF2.PdfReader(io.BytesIO(data))
+
+def _extract_pages(pages):
+    return [_worker_reader.pages[i].extract_text() or "" for i in pages]
+
+def iter_pdf_pages(file, max_workers=None, pages_per_task=8, min_parallel_pages=16):
+    """
+    Yield the text of each page of a PDF (path, bytes or binary file object) in order.
+    PDFs with at least min_parallel_pages pages are extracted in a process pool.
+    """
+    import PyPDF2
+
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, "rb") as f:
+            data = f.read()
+    elif isinstance(file, (bytes, bytearray)):
+        data = bytes(file)
+    else:
+        data = file.read()
+
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    n_pages = len(reader.pages)
+    if n_pages < min_parallel_pages or max_workers == 1:
+        # Small documents: process start-up would cost more than the extraction.
+        for page in reader.pages:
+            yield page.extract_text() or ""
+        return
+
+    tasks = [range(i, min(i + pages_per_task, n_pages)) for i in range(0, n_pages, pages_per_task)]
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_pdf_worker, initargs=(data,)) as executor:
+        for texts in executor.map(_extract_pages, tasks):
+            yield from texts
+
+def pdf_to_text(file, **kwargs):
+    """
+    Whole text of a PDF, pages joined with newlines.
+    """
+    return "\n".join(iter_pdf_pages(file, **kwargs))
@@ -1,14 +1,54 @@
 import torch
 from transformers import AutoTokenizer, AutoModelForSeq2SeqLM, Seq2SeqTrainingArguments, Seq2SeqTrainer, DataCollatorForSeq2Seq
-import evaluate
 import numpy as np
+import os
+from src import registry
+from src.cache import make_cache_key
+from src.metrics import metrics
+
+# Inference backends: "torch" (fp32), "int8" (dynamic quantization, CPU) and "onnx" (ONNX Runtime).
+BACKENDS = ("torch", "int8", "onnx")
+DEFAULT_ONNX_DIR = os.path.join(".cache", "onnx")
 
 class Summarizer:
-    def __init__(self, model_checkpoint="facebook/bart-large-cnn"):
+    def __init__(self, model_checkpoint="facebook/bart-large-cnn", backend="torch", onnx_dir=DEFAULT_ONNX_DIR):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown summarizer backend '{backend}', expected one of {BACKENDS}")
         self.model_checkpoint = model_checkpoint
+        self.backend = backend
         self.tokenizer = AutoTokenizer.from_pretrained(model_checkpoint)
-        self.model = AutoModelForSeq2SeqLM.from_pretrained(model_checkpoint)
-        self.metric = evaluate.load("rouge")
+        # Quantized and ONNX Runtime models only run on CPU.
+        self.device = "cuda" if torch.cuda.is_available() and backend == "torch" else "cpu"
+        self.model = self._load_model(backend, onnx_dir)
+        # Place the model once; generation reuses it without moving weights again.
+        self.model.to(self.device)
+        if hasattr(self.model, "eval"):
+            self.model.eval()
+
+    @property
+    def metric(self):
+        # ROUGE is only needed for training/evaluation, so it is loaded on first use.
+        return registry.get_rouge()
+
+    def _load_model(self, backend, onnx_dir):
+        if backend == "onnx":
+            try:
+                from optimum.onnxruntime import ORTModelForSeq2SeqLM
+            except ImportError:
+                raise ImportError("The 'onnx' backend requires optimum: pip install 'optimum[onnxruntime]'")
+
+            # Export once (encoder + decoder with KV-cache) and reuse the exported files afterwards.
+            export_dir = os.path.join(onnx_dir, self.model_checkpoint.replace("/", "--"))
+            if os.path.isdir(export_dir):
+                return ORTModelForSeq2SeqLM.from_pretrained(export_dir, use_cache=True)
+            model = ORTModelForSeq2SeqLM.from_pretrained(self.model_checkpoint, export=True, use_cache=True)
+            model.save_pretrained(export_dir)
+            return model
+
+        model = AutoModelForSeq2SeqLM.from_pretrained(self.model_checkpoint)
+        if backend == "int8":
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        return model
 
     def compute_metrics(self, eval_pred):
         predictions, labels = eval_pred
@@ -22,11 +62,19 @@ class Summarizer:
         
         return {k: round(v, 4) for k, v in result.items()}
 
-    def train(self, tokenized_datasets, output_dir="bart-summarization", num_epochs=1, batch_size=2):
+    def train(self, tokenized_datasets, output_dir="bart-summarization", num_epochs=1, batch_size=2,
+              group_by_length=True, max_steps=-1):
         """
         Fine-tune the model.
+        group_by_length batches examples of similar length together (using the
+        'length' column from prepare_tokenized_dataset when present) to cut padding.
         """
-        data_collator = DataCollatorForSeq2Seq(self.tokenizer, model=self.model)
+        if self.backend != "torch":
+            raise ValueError(f"Training requires the 'torch' backend, not '{self.backend}'")
+        # Padding to a multiple of 8 lets fp16 kernels use tensor cores.
+        data_collator = DataCollatorForSeq2Seq(
+            self.tokenizer, model=self.model, pad_to_multiple_of=8 if torch.cuda.is_available() else None
+        )
 
         args = Seq2SeqTrainingArguments(
             output_dir=output_dir,
@@ -37,6 +85,9 @@ class Summarizer:
             weight_decay=0.01,
             save_total_limit=2,
             num_train_epochs=num_epochs,
+            max_steps=max_steps,
+            group_by_length=group_by_length,
+            length_column_name="length",
             predict_with_generate=True,
             fp16=torch.cuda.is_available(),
             logging_steps=10,
@@ -61,10 +112,159 @@ class Summarizer:
         """
         Generate a summary for the given text.
         """
-        inputs = self.tokenizer(text, return_tensors="pt", max_length=1024, truncation=True)
-        device = "cuda" if torch.cuda.is_available() else "cpu"
-        self.model.to(device)
-        inputs = {k: v.to(device) for k, v in inputs.items()}
-        
-        summary_ids = self.model.generate(inputs["input_ids"], max_length=max_length, num_beams=4, early_stopping=True)
-        return self.tokenizer.decode(summary_ids[0], skip_special_tokens=True)
+        return self.generate_summaries([text], batch_size=1, max_length=max_length)[0]
+
+    def iter_summaries(self, texts, batch_size=8, max_length=128, num_beams=4, max_input_length=1024):
+        """
+        Summarize texts in length-sorted, padded batches.
+        Yields (index, summary) pairs as each batch finishes, where index is the
+        position of the text in the input.
+        """
+        texts = list(texts)
+        with metrics.stage("tokenize"):
+            encoded = self.tokenizer(texts, max_length=max_input_length, truncation=True)["input_ids"]
+        metrics.incr("tokens_in", sum(len(ids) for ids in encoded))
+        # Sorting by token length keeps similarly sized inputs together, so little compute goes to padding.
+        order = sorted(range(len(texts)), key=lambda i: len(encoded[i]), reverse=True)
+
+        for start in range(0, len(order), batch_size):
+            batch_idx = order[start:start + batch_size]
+            batch = self.tokenizer.pad({"input_ids": [encoded[i] for i in batch_idx]}, return_tensors="pt")
+            batch = {k: v.to(self.device) for k, v in batch.items()}
+
+            with metrics.stage("generate"), torch.inference_mode():
+                summary_ids = self.model.generate(
+                    batch["input_ids"],
+                    attention_mask=batch["attention_mask"],
+                    max_length=max_length,
+                    num_beams=num_beams,
+                    early_stopping=True,
+                )
+            metrics.incr("padded_tokens_in", batch["input_ids"].numel())
+            metrics.incr("tokens_out", int((summary_ids != self.tokenizer.pad_token_id).sum()))
+            metrics.incr("beams", num_beams * len(batch_idx))
+            metrics.incr("summaries", len(batch_idx))
+            summaries = self.tokenizer.batch_decode(summary_ids, skip_special_tokens=True)
+            for i, summary in zip(batch_idx, summaries):
+                yield i, summary
+
+    def generate_summaries(self, texts, batch_size=8, max_length=128, num_beams=4, max_input_length=1024):
+        """
+        Summarize many texts with batched generation.
+        Returns the summaries in input order.
+        """
+        texts = list(texts)
+        summaries = [None] * len(texts)
+        for i, summary in self.iter_summaries(texts, batch_size, max_length, num_beams, max_input_length):
+            summaries[i] = summary
+        return summaries
+
+    def fits_in_chunk(self, text, chunk_tokens=1000):
+        """
+        Whether text is at most chunk_tokens tokens long. Only a bounded prefix is tokenized.
+        """
+        # A token covers at least one character.
+        if len(text) <= chunk_tokens:
+            return True
+        window = text[:chunk_tokens * 8]
+        return len(window) == len(text) and len(self.tokenizer(window, add_special_tokens=False)["input_ids"]) <= chunk_tokens
+
+    def iter_chunks(self, text, chunk_tokens=1000, overlap=100):
+        """
+        Split text into token-bounded chunks that overlap by `overlap` tokens.
+        Only a window of roughly chunk_tokens is tokenized at a time, so very long
+        documents are never tokenized in full.
+        """
+        window_chars = chunk_tokens * 8
+        pos = 0
+        while pos < len(text):
+            window = text[pos:pos + window_chars]
+            offsets = self.tokenizer(window, add_special_tokens=False, return_offsets_mapping=True)["offset_mapping"]
+            if not offsets:
+                break
+
+            end_tok = min(chunk_tokens, len(offsets))
+            chunk_end = offsets[end_tok - 1][1]
+            yield window[:chunk_end]
+
+            if pos + chunk_end >= len(text) or (end_tok == len(offsets) and pos + window_chars >= len(text)):
+                break
+            step_tok = max(1, end_tok - overlap)
+            pos += max(1, offsets[step_tok][0] if step_tok < len(offsets) else chunk_end)
+
+    def _cached_summaries(self, texts, cache, batch_size, max_length, num_beams):
+        # Summaries for texts, served from cache where possible.
+        keys = [
+            make_cache_key(t, kind="chunk", model=self.model_checkpoint, backend=self.backend, max_length=max_length, num_beams=num_beams)
+            for t in texts
+        ] if cache is not None else [None] * len(texts)
+
+        summaries = [cache.get(k) if k else None for k in keys]
+        missing = [i for i, summary in enumerate(summaries) if summary is None]
+        if missing:
+            generated = self.generate_summaries(
+                [texts[i] for i in missing], batch_size=batch_size, max_length=max_length, num_beams=num_beams
+            )
+            for i, summary in zip(missing, generated):
+                summaries[i] = summary
+                if cache is not None:
+                    cache.put(keys[i], summary)
+        return summaries
+
+    def summarize_long(self, text, chunk_tokens=1000, overlap=100, fan_in=6, batch_size=8,
+                       max_length=128, num_beams=4, cache=None):
+        """
+        Hierarchical (map-reduce) summary for documents longer than the model input.
+        Chunks are summarized in batches; every fan_in summaries are then joined and
+        summarized again, level by level, until one summary remains. A lone
+        leftover summary is carried up as is rather than summarized again. Only
+        one batch of chunks and at most fan_in summaries per level are held at a time.
+        cache: optional ResultCache for chunk-level summaries.
+        """
+        levels = []
+
+        def push(summary, level=0):
+            # Add a summary to a level; a full level is reduced into the one above.
+            while True:
+                if len(levels) == level:
+                    levels.append([])
+                levels[level].append(summary)
+                if len(levels[level]) < fan_in:
+                    return
+                group, levels[level] = levels[level], []
+                summary = self._cached_summaries([" ".join(group)], cache, 1, max_length, num_beams)[0]
+                level += 1
+
+        chunks = self.iter_chunks(text, chunk_tokens, overlap)
+        first = next(chunks, None)
+        if first is None:
+            return ""
+        second = next(chunks, None)
+        if second is None:
+            # Fits in one chunk: a plain summary.
+            return self._cached_summaries([first], cache, 1, max_length, num_beams)[0]
+
+        batch = [first, second]
+        for chunk in chunks:
+            batch.append(chunk)
+            if len(batch) >= batch_size:
+                for summary in self._cached_summaries(batch, cache, batch_size, max_length, num_beams):
+                    push(summary)
+                batch = []
+        if batch:
+            for summary in self._cached_summaries(batch, cache, batch_size, max_length, num_beams):
+                push(summary)
+
+        # Reduce partially filled levels from the bottom up until one summary remains.
+        level = 0
+        while level < len(levels):
+            pending = levels[level]
+            if len(pending) == 1 and not any(levels[level + 1:]):
+                return pending[0]
+            levels[level] = []
+            if len(pending) == 1:
+                push(pending[0], level + 1)
+            elif pending:
+                push(self._cached_summaries([" ".join(pending)], cache, 1, max_length, num_beams)[0], level + 1)
+            level += 1
+        return ""
@@ -0,0 +1,245 @@
+"""
+Multi-process worker pool for summarization and KG extraction.
+
+Each worker is a spawned process with its own AbstractiveKGPipeline: models
+are loaded once per process and torch is pinned to torch_threads threads, so
+N workers use N * torch_threads cores without oversubscription. Documents are
+routed to workers by a hash of their ID, and results are gathered back into
+one stream in input order.
+
+Failures are isolated per document: an exception in a batch is retried
+document by document, and a document that still fails is reported with its
+error instead of stopping the run. A worker process that dies is restarted.
+Its unstarted documents are re-queued, and the documents it was working on
+are retried once each on their own.
+"""
+import multiprocessing as mp
+import os
+import queue
+import signal
+import time
+import zlib
+from multiprocessing.connection import wait
+
+DEFAULT_PIPELINE_KWARGS = {"use_cache": False, "resolve_entities": False, "entity_index": False}
+
+def _process_batch(pipeline, batch):
+    texts = [text for _, _, text, _ in batch]
+    try:
+        summaries = pipeline.summarize_batch(texts, batch_size=len(texts))
+        kgs = list(pipeline.kg_extractor.extract_kg_batch(summaries))
+        return [(seq, doc_id, summary, kg, None) for (seq, doc_id, _, _), summary, kg in zip(batch, summaries, kgs)]
+    except Exception:
+        if len(batch) == 1:
+            raise
+
+    # One bad document should not fail its batch: redo the batch document by document.
+    results = []
+    for item in batch:
+        try:
+            results.extend(_process_batch(pipeline, [item]))
+        except Exception as e:
+            seq, doc_id, _, _ = item
+            results.append((seq, doc_id, None, None, f"{type(e).__name__}: {e}"))
+    return results
+
+def _make_pipeline(**pipeline_kwargs):
+    from src.pipeline import AbstractiveKGPipeline
+    return AbstractiveKGPipeline(connect_db=False, **pipeline_kwargs)
+
+def _worker_main(worker_id, in_q, conn, torch_threads, batch_size, pipeline_kwargs, pipeline_factory=_make_pipeline):
+    # The parent coordinates shutdown on Ctrl-C; workers finish or get terminated.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # Thread pools read these on import, so set them before torch is loaded.
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[var] = str(torch_threads)
+    try:
+        import torch
+        torch.set_num_threads(torch_threads)
+    except ImportError:
+        # Non-torch summarizer backends only need the environment variables above.
+        pass
+
+    pipeline = pipeline_factory(**pipeline_kwargs)
+
+    stopping = False
+    while not stopping:
+        item = in_q.get()
+        if item is None:
+            break
+        batch = [item]
+        # Items flagged solo (retries after a crash) are always processed alone.
+        while not item[3] and len(batch) < batch_size:
+            try:
+                nxt = in_q.get_nowait()
+            except queue.Empty:
+                break
+            if nxt is None:
+                stopping = True
+                break
+            if nxt[3]:
+                in_q.put(nxt)
+                break
+            batch.append(nxt)
+
+        # Pipe sends are synchronous, so the parent learns what was in progress even after a hard crash.
+        conn.send(("started", [seq for seq, _, _, _ in batch]))
+        try:
+            results = _process_batch(pipeline, batch)
+        except Exception as e:
+            results = [(seq, doc_id, None, None, f"{type(e).__name__}: {e}") for seq, doc_id, _, _ in batch]
+        for result in results:
+            conn.send(("done",) + result)
+    pipeline.close()
+    conn.close()
+
+class WorkerPool:
+    """
+    Spawned worker processes that summarize and extract documents in parallel.
+    Use as a context manager, or call close() to shut the workers down.
+    pipeline_factory(**pipeline_kwargs) builds each worker's pipeline (an
+    AbstractiveKGPipeline without a database by default); it must be a
+    picklable module-level callable.
+    """
+    def __init__(self, n_workers=2, torch_threads=None, batch_size=8, max_in_flight=None, pipeline_kwargs=None,
+                 max_restarts=3, pipeline_factory=_make_pipeline):
+        self.n_workers = n_workers
+        self.torch_threads = torch_threads or max(1, (os.cpu_count() or 1) // n_workers)
+        self.batch_size = batch_size
+        # Documents sent but not yet yielded; bounds memory and keeps every worker busy.
+        self.max_in_flight = max_in_flight or n_workers * batch_size * 2
+        self.pipeline_kwargs = dict(DEFAULT_PIPELINE_KWARGS, **(pipeline_kwargs or {}))
+        self.pipeline_factory = pipeline_factory
+        # Restarts in a row without the worker picking up any work, e.g. a model that fails to load.
+        self.max_restarts = max_restarts
+        self._restarts = [0] * n_workers
+        self._ctx = mp.get_context("spawn")
+        self._in_qs = [None] * n_workers
+        self._conns = [None] * n_workers
+        self._procs = [None] * n_workers
+        for worker_id in range(n_workers):
+            self._start_worker(worker_id)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def _start_worker(self, worker_id):
+        in_q = self._ctx.Queue()
+        reader, writer = self._ctx.Pipe(duplex=False)
+        proc = self._ctx.Process(
+            target=_worker_main,
+            args=(worker_id, in_q, writer, self.torch_threads, self.batch_size, self.pipeline_kwargs,
+                  self.pipeline_factory),
+            daemon=True,
+        )
+        proc.start()
+        # Close the parent's copy of the write end so a dead worker reads as EOF.
+        writer.close()
+        self._in_qs[worker_id] = in_q
+        self._conns[worker_id] = reader
+        self._procs[worker_id] = proc
+
+    def route(self, doc_id):
+        """
+        Worker that handles doc_id (stable across runs).
+        """
+        return zlib.crc32(str(doc_id).encode("utf-8")) % self.n_workers
+
+    def map(self, documents):
+        """
+        Process (doc_id, text) pairs and yield (doc_id, summary, kg_data, error)
+        in input order. error is None on success, otherwise a message and
+        summary and kg_data are None.
+        """
+        documents = iter(documents)
+        texts = {}          # seq -> (doc_id, text, worker_id) for documents in flight
+        started = {}        # seq -> times a worker picked the document up
+        results = {}
+        next_seq = 0        # next sequence number to yield
+        sent = 0
+        exhausted = False
+
+        while not exhausted or next_seq < sent:
+            while not exhausted and sent - next_seq < self.max_in_flight:
+                doc = next(documents, None)
+                if doc is None:
+                    exhausted = True
+                    break
+                doc_id, text = doc
+                worker_id = self.route(doc_id)
+                texts[sent] = (doc_id, text, worker_id)
+                self._in_qs[worker_id].put((sent, doc_id, text, False))
+                sent += 1
+
+            while next_seq in results:
+                yield results.pop(next_seq)
+                texts.pop(next_seq, None)
+                started.pop(next_seq, None)
+                next_seq += 1
+            if next_seq == sent:
+                continue
+
+            # Wake on results or on a worker exiting.
+            wait(self._conns + [proc.sentinel for proc in self._procs], timeout=1.0)
+            for worker_id in range(self.n_workers):
+                self._drain(worker_id, started, results)
+            self._recover(texts, started, results)
+
+    def _drain(self, worker_id, started, results):
+        conn = self._conns[worker_id]
+        try:
+            while conn.poll():
+                message = conn.recv()
+                if message[0] == "started":
+                    self._restarts[worker_id] = 0
+                    for seq in message[1]:
+                        started[seq] = started.get(seq, 0) + 1
+                else:
+                    _, seq, doc_id, summary, kg_data, error = message
+                    results[seq] = (doc_id, summary, kg_data, error)
+        except EOFError:
+            pass
+
+    def _recover(self, texts, started, results):
+        # Restart dead workers; retry what they were processing once, alone, then give up on it.
+        for worker_id, proc in enumerate(self._procs):
+            if proc.is_alive():
+                continue
+            exitcode = proc.exitcode
+            self._drain(worker_id, started, results)
+            self._restarts[worker_id] += 1
+            if self._restarts[worker_id] > self.max_restarts:
+                raise RuntimeError(f"Worker {worker_id} keeps exiting (last exit code {exitcode})")
+            self._start_worker(worker_id)
+            for seq, (doc_id, text, routed) in sorted(texts.items()):
+                if routed != worker_id or seq in results:
+                    continue
+                attempts = started.get(seq, 0)
+                if attempts >= 2:
+                    results[seq] = (doc_id, None, None, f"worker exited with code {exitcode}")
+                else:
+                    self._in_qs[worker_id].put((seq, doc_id, text, attempts > 0))
+
+    def close(self, timeout=30.0):
+        """
+        Ask workers to finish their current batch and exit; terminate stragglers.
+        """
+        for in_q, proc in zip(self._in_qs, self._procs):
+            if proc.is_alive():
+                in_q.put(None)
+        deadline = time.monotonic() + timeout
+        discard = {}
+        while any(proc.is_alive() for proc in self._procs) and time.monotonic() < deadline:
+            # A worker blocks on a full pipe, so keep reading until it exits.
+            wait(self._conns + [proc.sentinel for proc in self._procs], timeout=0.1)
+            for worker_id in range(self.n_workers):
+                self._drain(worker_id, {}, discard)
+        for proc, conn in zip(self._procs, self._conns):
+            if proc.is_alive():
+                proc.terminate()
+            proc.join()
+            conn.close()
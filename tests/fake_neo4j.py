@@ -0,0 +1,67 @@
+"""
+Minimal in-process stand-in for the neo4j driver that counts round-trips.
+It records queries instead of executing them, which is enough to measure
+how many transactions and statements a writer issues.
+"""
+
+class FakeResult:
+    def __init__(self, value=None):
+        self._value = value
+
+    def single(self):
+        return [self._value]
+
+    def consume(self):
+        return None
+
+    def __iter__(self):
+        return iter([])
+
+class FakeTx:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def run(self, query, **params):
+        self.driver.statements += 1
+        self.driver.queries.append((query, params))
+        return FakeResult()
+
+class FakeSession:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def __enter__(self):
+        self.driver.sessions += 1
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute_write(self, fn, *args, **kwargs):
+        self.driver.transactions += 1
+        return fn(FakeTx(self.driver), *args, **kwargs)
+
+    execute_read = execute_write
+
+    def run(self, query, **params):
+        self.driver.transactions += 1
+        return FakeTx(self.driver).run(query, **params)
+
+class FakeDriver:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.sessions = 0
+        self.transactions = 0
+        self.statements = 0
+        self.queries = []
+
+    def session(self, **kwargs):
+        return FakeSession(self)
+
+    def verify_connectivity(self):
+        return None
+
+    def close(self):
+        return None
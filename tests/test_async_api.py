@@ -0,0 +1,122 @@
+import asyncio
+
+from src.async_api import AsyncGraphRAG, AsyncKGPipeline, AsyncNeo4jConnector, BoundedExecutor
+
+class FakeAsyncResult:
+    def __init__(self, records=()):
+        self._records = list(records)
+
+    async def consume(self):
+        return None
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for record in self._records:
+            yield record
+
+class FakeAsyncTx:
+    def __init__(self, driver):
+        self.driver = driver
+
+    async def run(self, query, **params):
+        self.driver.queries.append(query)
+        return FakeAsyncResult(self.driver.results.pop(0) if self.driver.results else ())
+
+class FakeAsyncSession(FakeAsyncTx):
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute_write(self, fn, *args):
+        return await fn(FakeAsyncTx(self.driver), *args)
+
+class FakeAsyncDriver:
+    """
+    Records queries and answers session.run calls with queued record lists.
+    """
+    def __init__(self, results=()):
+        self.queries = []
+        self.results = list(results)
+
+    def session(self, **kwargs):
+        return FakeAsyncSession(self)
+
+def test_populate_notifies_write_listeners():
+    db = AsyncNeo4jConnector(driver=FakeAsyncDriver())
+    events = []
+    db.add_write_listener(lambda kg_batch, removed: events.append((kg_batch, removed)))
+    kg_data = {"entities": [{"text": "SpaceX", "label": "ORG"}], "relations": []}
+    asyncio.run(db.populate_kg(kg_data))
+    assert events == [([kg_data], False)]
+
+def test_expand_follows_hops():
+    driver = FakeAsyncDriver([
+        [{"name": "SpaceX"}],
+        [{"source": "SpaceX", "relation": "DEVELOP", "target": "Starship", "support": 2, "neighbor": "Starship"}],
+        [{"source": "NASA", "relation": "TEST", "target": "Starship", "support": 1, "neighbor": "NASA"}],
+    ])
+    seeds, edges = asyncio.run(AsyncNeo4jConnector(driver=driver).expand(["SpaceX"], hops=2))
+    assert seeds == ["SpaceX"]
+    assert edges == [("SpaceX", "DEVELOP", "Starship", 2), ("NASA", "TEST", "Starship", 1)]
+
+class FakeStore:
+    def __init__(self):
+        self.write_listeners = []
+        self.calls = []
+
+    add_write_listener = AsyncNeo4jConnector.add_write_listener
+    remove_write_listener = AsyncNeo4jConnector.remove_write_listener
+
+    async def expand(self, names, hops=2, fanout=25):
+        self.calls.append(names)
+        return ["SpaceX"], [("SpaceX", "DEVELOP", "Starship", 3), ("SpaceX", "LAUNCH", "Falcon", 1)]
+
+def test_query_ranks_cached_neighbourhoods():
+    async def run():
+        db = FakeStore()
+        rag = AsyncGraphRAG(db, nlp=None, executor=BoundedExecutor(1), top_n=1, owns_db=False)
+        assert await rag.expand(["SpaceX", "SpaceX "]) == await rag.expand(["SpaceX"])
+        assert db.calls == [["SpaceX"]]
+
+        rag.cache.invalidate([{"entities": [], "relations": [{"head": "SpaceX", "type": "own", "tail": "X"}]}])
+        await rag.expand(["SpaceX"])
+        assert len(db.calls) == 2
+
+        rag.question_entities = lambda question: asyncio.sleep(0, result=["SpaceX"])
+        answer = await rag.query("What is SpaceX developing?")
+        await rag.close()
+        return answer
+
+    assert "SpaceX --[DEVELOP]--> Starship" in asyncio.run(run())
+
+def test_executor_created_outside_a_loop_runs_in_any_loop():
+    executor = BoundedExecutor(1)
+    assert asyncio.run(executor.run(sum, [1, 2])) == 3
+    assert asyncio.run(executor.run(sum, [3, 4])) == 7
+    executor.shutdown()
+
+def test_pipeline_resolves_against_the_stored_graph(monkeypatch):
+    from src.pipeline import AbstractiveKGPipeline
+
+    monkeypatch.setattr(
+        AbstractiveKGPipeline, "summarize_and_extract",
+        lambda self, text: (text, {"entities": [{"text": "Musk", "label": "PERSON"}], "relations": []}),
+    )
+
+    async def run():
+        driver = FakeAsyncDriver([[{"name": "Elon Musk", "label": "PERSON"}]])
+        db = AsyncNeo4jConnector(driver=driver)
+        kg_pipeline = await AsyncKGPipeline.create(db=db, entity_index=False, use_cache=False)
+        _, kg_data = await kg_pipeline.process("Musk spoke.")
+        executor = kg_pipeline.executor
+        await kg_pipeline.close()
+        return kg_data, executor
+
+    kg_data, executor = asyncio.run(run())
+    assert kg_data["entities"][0]["text"] == "Elon Musk"
+    # The executor create() made is shut down by close().
+    assert executor.executor._shutdown
@@ -0,0 +1,34 @@
+import json
+
+from src.incremental import IncrementalProcessor
+from src.pipeline import AbstractiveKGPipeline
+
+TEXT = "SpaceX develops Starship."
+
+def pipeline(**kwargs):
+    return AbstractiveKGPipeline(use_cache=False, connect_db=False, **kwargs)
+
+def test_relation_engine_changes_keys():
+    loop, rules = pipeline(), pipeline(relation_engine="rules")
+    assert rules.cache_key(TEXT) != loop.cache_key(TEXT)
+    assert (IncrementalProcessor(rules).segment_key(TEXT, False)
+            != IncrementalProcessor(loop).segment_key(TEXT, False))
+
+def test_pattern_file_contents_change_keys(tmp_path):
+    path = tmp_path / "relations.json"
+    path.write_text(json.dumps({"rules": []}))
+    before = pipeline(relation_engine="rules", patterns_path=str(path))
+    path.write_text(json.dumps({"rules": [], "version": 2}))
+    after = pipeline(relation_engine="rules", patterns_path=str(path))
+    assert before.cache_key(TEXT) != after.cache_key(TEXT)
+    assert (IncrementalProcessor(before).segment_key(TEXT, False)
+            != IncrementalProcessor(after).segment_key(TEXT, False))
+
+def test_map_reduce_settings_change_keys():
+    base = pipeline()
+    for name, value in (("summary_chunk_tokens", 500), ("summary_overlap", 0), ("summary_fan_in", 4)):
+        changed = pipeline()
+        setattr(changed, name, value)
+        assert changed.cache_key(TEXT) != base.cache_key(TEXT)
+        assert (IncrementalProcessor(changed).segment_key(TEXT, True)
+                != IncrementalProcessor(base).segment_key(TEXT, True))
@@ -0,0 +1,25 @@
+import os
+
+import pytest
+
+datasets = pytest.importorskip("datasets")
+
+from src.data_loader import prepare_tokenized_dataset
+
+class FakeTokenizer:
+    name_or_path = "fake"
+
+    def __len__(self):
+        return 100
+
+    def __call__(self, texts=None, text_target=None, max_length=None, truncation=True):
+        texts = texts if texts is not None else text_target
+        return {"input_ids": [[len(word) for word in t.split()][:max_length] for t in texts]}
+
+def test_cache_is_renamed_into_place(tmp_path):
+    dataset = datasets.Dataset.from_dict({"article": ["a bb ccc", "dddd"], "highlights": ["a", "b"]})
+    first = prepare_tokenized_dataset(dataset, FakeTokenizer(), cache_dir=str(tmp_path), num_proc=1)
+    assert first["length"] == [3, 1]
+    # Only the finished cache is left: no temporary directories.
+    assert len(os.listdir(tmp_path)) == 1 and ".tmp-" not in os.listdir(tmp_path)[0]
+    assert prepare_tokenized_dataset(dataset, FakeTokenizer(), cache_dir=str(tmp_path))["length"] == [3, 1]
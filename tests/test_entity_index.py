@@ -0,0 +1,89 @@
+import zlib
+
+import numpy as np
+
+from src.entity_index import EntityIndex
+from src.memory_graph import InMemoryGraph
+
+def fake_encode(texts):
+    # Deterministic pseudo-embeddings keyed by the text before any ": context" suffix.
+    return np.array([
+        np.random.default_rng(zlib.crc32(t.split(":")[0].encode())).standard_normal(16) for t in texts
+    ], dtype=np.float32)
+
+def make_index(path=None, **kwargs):
+    index = EntityIndex(path, encoder="fake", **kwargs)
+    index._encode = fake_encode
+    return index
+
+def test_search_finds_exact_names_and_skips_removed():
+    index = make_index()
+    index.add(["SpaceX", "Tesla", "NASA"])
+    assert index.search(["Tesla"], k=1)[0][0][0] == "Tesla"
+    assert index.remove(["Tesla"]) == 1
+    assert "Tesla" not in [name for name, _ in index.search(["Tesla"], k=3)[0]]
+    assert len(index) == 2
+
+def test_background_training_keeps_new_vectors_searchable():
+    index = make_index(ivf_threshold=64, n_probe=64)
+    index.add([f"entity {i}" for i in range(64)])
+    index._training.join()
+    assert index._centroids is not None and len(index._assign) == 64
+    index.add(["SpaceX"])
+    assert index.search(["SpaceX"], k=1)[0][0][0] == "SpaceX"
+
+def test_save_and_load_keep_tombstones(tmp_path):
+    index = make_index(str(tmp_path))
+    index.add(["SpaceX", "Tesla"])
+    index.remove(["SpaceX"])
+    index.close()
+    loaded = make_index(str(tmp_path))
+    assert len(loaded) == 1 and "SpaceX" not in loaded and "Tesla" in loaded
+
+def test_follows_graph_writes_and_backfills():
+    graph = InMemoryGraph()
+    graph.populate_kg({"entities": [], "relations": [{"head": "SpaceX", "type": "develop", "tail": "Starship"}]})
+    index = make_index()
+    assert index.backfill(graph.entity_names()) == 2
+
+    graph.add_write_listener(index.on_graph_write)
+    graph.populate_kg({"entities": [{"text": "NASA", "label": "ORG"}], "relations": []})
+    assert "NASA" in index
+    graph.remove_kg({"entities": [], "relations": [{"head": "SpaceX", "type": "develop", "tail": "Starship"}]})
+    assert "SpaceX" not in index and "Starship" not in index and "NASA" in index
+
+def test_compaction_drops_removed_vectors():
+    index = make_index()
+    index.add([f"entity {i}" for i in range(8)])
+    index.remove(["entity 1"])
+    assert len(index.names) == 8
+    index.remove(["entity 2", "entity 3"])
+    assert index.names == ["entity 0"] + [f"entity {i}" for i in range(4, 8)]
+    assert index.search(["entity 5"], k=1)[0][0][0] == "entity 5"
+
+def test_spacy_model_without_vectors_is_rejected(monkeypatch):
+    import pytest
+    spacy = pytest.importorskip("spacy")
+    from src import registry
+    from src.entity_index import load_encoder
+
+    monkeypatch.setattr(registry, "get_spacy", lambda model: spacy.blank("en"))
+    with pytest.raises(ValueError, match="no word vectors"):
+        load_encoder("spacy:en_core_web_sm")
+
+def test_failed_save_stays_dirty(tmp_path, monkeypatch):
+    index = make_index(str(tmp_path), save_interval=3600)
+    index.add(["SpaceX"])
+
+    def fail(*args):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(index, "_write", fail)
+    try:
+        index.save()
+    except OSError:
+        pass
+    assert index._dirty
+    monkeypatch.undo()
+    index.close()
+    assert not index._dirty and "SpaceX" in make_index(str(tmp_path))
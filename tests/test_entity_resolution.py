@@ -0,0 +1,60 @@
+import threading
+
+from src.entity_resolution import EntityResolver, normalize_name
+from src.graph_rag import _words
+from src.memory_graph import InMemoryGraph
+
+def test_normalizers_agree():
+    assert normalize_name("The  Boring Company’s") == "boring company"
+    assert normalize_name("Café") == normalize_name("Café")
+    assert _words("The Boring Company's") == {"boring", "company"}
+
+def test_seed_from_graph_entities():
+    graph = InMemoryGraph()
+    graph.populate_kg({"entities": [{"text": "Elon Musk", "label": "PERSON"}], "relations": []})
+    resolver = EntityResolver()
+    assert resolver.seed(graph.entities()) == 1
+    assert resolver.canonical("Musk", "PERSON") == "Elon Musk"
+    assert resolver.seed(graph.entities()) == 0
+
+def test_concurrent_aliases_and_resolution():
+    resolver = EntityResolver()
+    names = [f"Org{j:03d}" for j in range(200)]
+
+    def work(i):
+        for j in range(len(names)):
+            resolver.add_alias(f"alias {i} {j}", names[j])
+            resolver.resolve(names[j])
+
+    threads = [threading.Thread(target=work, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(resolver.canonical_names) == names
+    assert resolver.canonical("alias 3 7") == "Org007"
+
+def test_unlabeled_endpoints_do_not_match_surnames():
+    resolver = EntityResolver()
+    resolver.seed([("Tim Cook", "PERSON")])
+    assert resolver.canonical("Cook", "PERSON") == "Tim Cook"
+    kg_data = resolver.resolve_kg({
+        "entities": [{"text": "Tim Cook", "label": "PERSON"}],
+        "relations": [{"head": "Tim Cook", "type": "hire", "tail": "cook"}],
+    })
+    assert kg_data["relations"][0]["tail"] == "cook"
+
+def test_pipeline_seeds_the_resolver_in_the_background(monkeypatch):
+    from src import registry
+    from src.pipeline import AbstractiveKGPipeline
+
+    monkeypatch.delenv("MEMORY_GRAPH_PATH", raising=False)
+    graph = registry.get_graph_store("memory")
+    try:
+        graph.populate_kg({"entities": [{"text": "Elon Musk", "label": "PERSON"}], "relations": []})
+        pipeline = AbstractiveKGPipeline(use_cache=False, graph_backend="memory", entity_index=False)
+        kg_data = pipeline.resolve({"entities": [{"text": "Musk", "label": "PERSON"}], "relations": []})
+        assert kg_data["entities"][0]["text"] == "Elon Musk"
+        pipeline.close()
+    finally:
+        registry.release_graph_store("memory")
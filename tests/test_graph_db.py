@@ -0,0 +1,64 @@
+from tests.fake_neo4j import FakeDriver
+from src.graph_db import (
+    DELETE_MENTIONS_QUERY,
+    DELETE_ORPHAN_ENTITIES_QUERY,
+    MERGE_ENTITIES_QUERY,
+    MERGE_MENTIONS_QUERY,
+    Neo4jConnector,
+)
+
+def kg(entities=(), relations=()):
+    return {
+        "entities": [{"text": name, "label": label} for name, label in entities],
+        "relations": [{"head": h, "type": r, "tail": t} for h, r, t in relations],
+    }
+
+BATCH = [
+    kg([("SpaceX", "ORG"), ("Elon Musk", "PERSON")], [("Elon Musk", "found", "SpaceX"), ("SpaceX", "launch", "Falcon 9")]),
+    kg([("SpaceX", "PRODUCT"), ("Tesla", "ORG")], [("Elon Musk", "found", "Tesla"), ("Elon Musk", "found", "SpaceX")]),
+]
+
+def test_writes_are_chunked_per_relationship_type():
+    plan = list(Neo4jConnector._bulk_writes(BATCH, chunk_size=2, ts=0.0))
+    queries = [query for query, _ in plan]
+    entity_rows = [rows for query, rows in plan if query == MERGE_ENTITIES_QUERY]
+    # Entities first and deduplicated, keeping the first label.
+    assert queries[:2] == [MERGE_ENTITIES_QUERY] * 2
+    assert [row for rows in entity_rows for row in rows] == [
+        {"name": "SpaceX", "label": "ORG"}, {"name": "Elon Musk", "label": "PERSON"}, {"name": "Tesla", "label": "ORG"},
+    ]
+    assert all(len(rows) <= 2 for _, rows in plan)
+    # One query per sanitized type; each document counts its facts once.
+    found, launch = Neo4jConnector._merge_relations_query("FOUND"), Neo4jConnector._merge_relations_query("LAUNCH")
+    assert [(query, [(row["head"], row["tail"]) for row in rows]) for query, rows in plan[2:]] == [
+        (found, [("Elon Musk", "SpaceX"), ("Elon Musk", "Tesla")]),
+        (found, [("Elon Musk", "SpaceX")]),
+        (launch, [("SpaceX", "Falcon 9")]),
+    ]
+
+def test_documented_writes_add_mentions():
+    plan = list(Neo4jConnector._bulk_writes(BATCH, chunk_size=100, doc_ids=["a", "b"], ts=0.0))
+    mentions = [rows for query, rows in plan if query == MERGE_MENTIONS_QUERY]
+    assert mentions == [[
+        {"doc_id": "a", "name": "SpaceX"}, {"doc_id": "a", "name": "Elon Musk"},
+        {"doc_id": "b", "name": "SpaceX"}, {"doc_id": "b", "name": "Tesla"},
+    ]]
+    assert all("ASSERTS" in query for query, _ in plan if query not in (MERGE_ENTITIES_QUERY, MERGE_MENTIONS_QUERY))
+
+def test_deletes_remove_relations_before_orphans():
+    plan = list(Neo4jConnector._bulk_deletes(BATCH, chunk_size=100))
+    queries = [query for query, _ in plan]
+    assert queries[-1] == DELETE_ORPHAN_ENTITIES_QUERY and DELETE_MENTIONS_QUERY not in queries
+    assert [row["name"] for row in plan[-1][1]] == ["SpaceX", "Elon Musk", "Falcon 9", "Tesla"]
+    facts = [(row["head"], row["tail"]) for _, rows in plan[:-1] for row in rows]
+    # The fact listed by both documents is deleted once.
+    assert sorted(facts) == [("Elon Musk", "SpaceX"), ("Elon Musk", "Tesla"), ("SpaceX", "Falcon 9")]
+
+def test_one_transaction_per_planned_chunk():
+    driver = FakeDriver()
+    connector = Neo4jConnector(driver=driver)
+    connector.populate_kg_batch(BATCH, chunk_size=2)
+    assert driver.transactions == driver.statements == len(list(Neo4jConnector._bulk_writes(BATCH, 2)))
+    driver.reset()
+    connector.remove_kg_batch(BATCH, chunk_size=2)
+    assert driver.transactions == len(list(Neo4jConnector._bulk_deletes(BATCH, 2)))
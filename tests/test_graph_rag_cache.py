@@ -0,0 +1,85 @@
+import pytest
+
+from tests.fake_neo4j import FakeDriver
+from src.graph_db import Neo4jConnector
+from src.graph_rag import GraphRAG
+
+def kg(*relations):
+    return {
+        "entities": [],
+        "relations": [{"head": h, "type": r, "tail": t} for h, r, t in relations],
+    }
+
+@pytest.fixture
+def rag(monkeypatch):
+    monkeypatch.delenv("MEMORY_GRAPH_PATH", raising=False)
+    monkeypatch.delenv("ENTITY_ENCODER", raising=False)
+    rag = GraphRAG(graph_backend="memory", entity_index=False)
+    yield rag
+    rag.close()
+
+def test_neighbourhoods_are_cached_per_entity(rag, monkeypatch):
+    rag.db.populate_kg(kg(("SpaceX", "develop", "Starship"), ("NASA", "fund", "SpaceX"), ("Tesla", "build", "Model S")))
+    calls = []
+    expand = rag.db.expand
+    monkeypatch.setattr(rag.db, "expand", lambda names, **kw: calls.append(names) or expand(names, **kw))
+
+    seeds, edges = rag.expand(["SpaceX", "NASA"])
+    assert calls == [["NASA"], ["SpaceX"]] and seeds == ["NASA", "SpaceX"]
+    # Each fact once, although both neighbourhoods contain it.
+    assert sorted(edge[:3] for edge in edges) == [("NASA", "FUND", "SpaceX"), ("SpaceX", "DEVELOP", "Starship")]
+    assert rag.expand(["NASA", "SpaceX "]) == (seeds, edges)
+    assert len(calls) == 2
+
+    # A question about SpaceX and Tesla reuses the SpaceX entry.
+    seeds, _ = rag.expand(["SpaceX", "Tesla"])
+    assert calls[2:] == [["Tesla"]] and seeds == ["SpaceX", "Tesla"]
+
+def test_removal_and_retraction_drop_cached_neighbourhoods(rag):
+    rag.db.populate_kg(kg(("SpaceX", "develop", "Starship")))
+    rag.db.populate_kg(kg(("SpaceX", "launch", "Falcon")), doc_id="doc-1")
+    assert len(rag.expand(["SpaceX"])[1]) == 2
+
+    rag.db.remove_kg(kg(("SpaceX", "develop", "Starship")))
+    assert [edge[:3] for edge in rag.expand(["SpaceX"])[1]] == [("SpaceX", "LAUNCH", "Falcon")]
+
+    rag.db.retract_document("doc-1")
+    assert rag.expand(["SpaceX"]) == ([], [])
+
+def test_writes_invalidate_names_by_word(rag):
+    assert rag.expand(["SpaceX"]) == ([], [])
+    rag.db.populate_kg(kg(("SpaceX Inc", "develop", "Starship")))
+    assert rag.expand(["SpaceX"])[0] == ["SpaceX Inc"]
+
+def test_neo4j_removals_notify_listeners():
+    connector = Neo4jConnector(driver=FakeDriver())
+    events = []
+    connector.add_write_listener(lambda kg_batch, removed: events.append((removed, kg_batch)))
+
+    connector.populate_kg(kg(("SpaceX", "develop", "Starship")), doc_id="doc-1")
+    connector.remove_kg(kg(("SpaceX", "develop", "Starship")), doc_id="doc-1")
+    connector.retract_document("doc-1")
+
+    assert [removed for removed, _ in events] == [False, True, True]
+    assert events[1][1][0]["relations"] == [{"head": "SpaceX", "type": "develop", "tail": "Starship"}]
+
+def test_unknown_entity_gets_the_no_information_answer(rag, monkeypatch):
+    from src.graph_rag import link_entities
+
+    rag.db.populate_kg(kg(("SpaceX", "develop", "Starship")))
+    monkeypatch.setattr(rag, "question_entities", lambda question: ["Acme"])
+    # Semantic linking is off unless $ENTITY_ENCODER is set.
+    assert rag.entity_index is None
+    assert "no information about 'Acme'" in rag.query("What does Acme build?")
+
+    class Index:
+        # Like averaged tok2vec tensors: everything looks similar.
+        min_similarity = 0.7
+
+        def search(self, phrases, k=3):
+            return [[("SpaceX", 0.6)] for _ in phrases]
+
+    rag.entity_index = Index()
+    assert link_entities(rag.entity_index, ["Acme"]) == []
+    assert "no information about 'Acme'" in rag.query("What does Acme build?")
+    rag.entity_index = None
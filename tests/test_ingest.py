@@ -0,0 +1,52 @@
+import pytest
+
+from src.ingest import IngestionRunner
+from src.memory_graph import InMemoryGraph
+
+class FakePipeline:
+    def __init__(self, db_connected=True):
+        self.db_connected = db_connected
+        self.db_connector = InMemoryGraph() if db_connected else None
+
+    def resolve(self, kg_data):
+        return kg_data
+
+class FakePool:
+    def map(self, documents):
+        for doc_id, text in documents:
+            yield doc_id, text, {"entities": [{"text": text, "label": "ORG"}], "relations": []}, None
+
+DOCS = [("a", "SpaceX"), ("b", "Tesla")]
+
+def test_stored_documents_are_checkpointed(tmp_path):
+    path = str(tmp_path / "ingest.ckpt")
+    pipeline = FakePipeline()
+    IngestionRunner(pipeline, checkpoint_path=path).run_pool(iter(DOCS), FakePool())
+    assert sorted(pipeline.db_connector.entity_names()) == ["SpaceX", "Tesla"]
+
+    rerun = IngestionRunner(FakePipeline(), checkpoint_path=path)
+    rerun.run_pool(iter(DOCS), FakePool())
+    assert rerun.skipped == 2
+
+def test_dry_run_leaves_the_checkpoint_alone(tmp_path):
+    path = tmp_path / "ingest.ckpt"
+    IngestionRunner(FakePipeline(db_connected=False), checkpoint_path=str(path), store=False).run_pool(iter(DOCS), FakePool())
+    assert not path.exists()
+
+def test_storage_without_a_connection_fails_fast(tmp_path):
+    with pytest.raises(RuntimeError, match="not connected"):
+        IngestionRunner(FakePipeline(db_connected=False), checkpoint_path=str(tmp_path / "ingest.ckpt"))
+    assert not (tmp_path / "ingest.ckpt").exists()
+
+def test_failed_write_is_not_checkpointed(tmp_path):
+    path = tmp_path / "ingest.ckpt"
+    pipeline = FakePipeline()
+
+    def fail(*args, **kwargs):
+        raise ConnectionError("database down")
+
+    pipeline.db_connector.populate_kg_batch = fail
+    runner = IngestionRunner(pipeline, checkpoint_path=str(path))
+    with pytest.raises(ConnectionError):
+        runner.run_pool(iter(DOCS), FakePool())
+    assert path.read_text() == ""
@@ -0,0 +1,79 @@
+import threading
+
+from src.memory_graph import InMemoryGraph
+
+def fact(i):
+    return {"entities": [], "relations": [{"head": "Hub", "type": "link", "tail": f"Node {i}"}]}
+
+def test_reads_during_concurrent_writes():
+    graph = InMemoryGraph()
+    errors = []
+
+    def write():
+        for i in range(300):
+            graph.populate_kg(fact(i), doc_id=f"doc-{i}")
+            if i % 3 == 0:
+                graph.retract_document(f"doc-{i}")
+
+    def read():
+        try:
+            for _ in range(300):
+                for source, _, target, support in graph.expand(["Hub"], hops=1)[1]:
+                    assert source == "Hub" and target.startswith("Node") and support == 1
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=write)] + [threading.Thread(target=read) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert graph.num_edges() == 200 and graph.num_nodes() == 201
+
+def test_writes_are_snapshotted_without_close(tmp_path):
+    graph = InMemoryGraph(str(tmp_path), save_interval=0)
+    graph.populate_kg(fact(1), doc_id="a")
+    graph._saving.join()
+    graph.populate_kg(fact(2))
+    graph._saving.join()
+
+    loaded = InMemoryGraph(str(tmp_path))
+    assert sorted(loaded.entity_names()) == ["Hub", "Node 1", "Node 2"]
+    loaded.retract_document("a")
+    assert loaded.k_hop(["Hub"], hops=1) == [("Hub", "LINK", "Node 2", 1)]
+
+def test_failed_snapshot_stays_dirty(tmp_path, monkeypatch):
+    graph = InMemoryGraph(str(tmp_path), save_interval=3600)
+    graph.populate_kg(fact(1))
+
+    def fail(*args):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(graph, "_write_snapshot", fail)
+    try:
+        graph.snapshot()
+    except OSError:
+        pass
+    assert graph._dirty
+    monkeypatch.undo()
+    graph.close()
+    assert not graph._dirty and InMemoryGraph(str(tmp_path)).num_edges() == 1
+
+def test_endpoint_label_is_set_by_a_later_entity_write():
+    graph = InMemoryGraph()
+    graph.populate_kg(fact(1))
+    graph.populate_kg({"entities": [{"text": "Hub", "label": "ORG"}], "relations": []})
+    graph.populate_kg({"entities": [{"text": "Hub", "label": "GPE"}], "relations": []})
+    assert ("Hub", "ORG") in graph.entities()
+
+def test_close_releases_the_exit_hook(tmp_path):
+    import gc
+    import weakref
+
+    graph = InMemoryGraph(str(tmp_path))
+    ref = weakref.ref(graph)
+    graph.close()
+    del graph
+    gc.collect()
+    assert ref() is None
@@ -0,0 +1,30 @@
+from src.pipeline import AbstractiveKGPipeline
+
+class FakeSummarizer:
+    """
+    A text fits in one chunk when it has at most chunk_tokens words.
+    """
+    def __init__(self):
+        self.batched = []
+        self.long = []
+
+    def fits_in_chunk(self, text, chunk_tokens=1000):
+        return len(text.split()) <= chunk_tokens
+
+    def generate_summaries(self, texts, batch_size=8, max_length=128, num_beams=4):
+        self.batched.append(list(texts))
+        return [f"S({text})" for text in texts]
+
+    def summarize_long(self, text, **kwargs):
+        self.long.append(text)
+        return f"L({text})"
+
+def test_long_documents_use_map_reduce(monkeypatch):
+    fake = FakeSummarizer()
+    monkeypatch.setattr(AbstractiveKGPipeline, "summarizer", property(lambda self: fake))
+    pipeline = AbstractiveKGPipeline(use_cache=False, connect_db=False)
+    pipeline.summary_chunk_tokens = 3
+
+    texts = ["a b", "a b c d e", "c"]
+    assert pipeline.summarize_batch(texts) == ["S(a b)", "L(a b c d e)", "S(c)"]
+    assert fake.batched == [["a b", "c"]] and fake.long == ["a b c d e"]
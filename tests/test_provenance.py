@@ -0,0 +1,51 @@
+from tests.fake_neo4j import FakeDriver
+from src.graph_db import Neo4jConnector
+from src.memory_graph import InMemoryGraph
+
+def kg(entities=(), relations=()):
+    return {
+        "entities": [{"text": name, "label": "ORG"} for name in entities],
+        "relations": [{"head": h, "type": r, "tail": t} for h, r, t in relations],
+    }
+
+def test_document_support_is_counted_once_and_retracted_exactly():
+    graph = InMemoryGraph()
+    graph.populate_kg_batch(
+        [kg(["SpaceX"], [("SpaceX", "develop", "Starship")]), kg([], [("SpaceX", "develop", "Starship")])],
+        doc_ids=["a", "b"],
+    )
+    graph.populate_kg(kg([], [("SpaceX", "develop", "Starship")]), doc_id="a")
+    assert graph.k_hop(["SpaceX"], hops=1) == [("SpaceX", "DEVELOP", "Starship", 2)]
+
+    graph.retract_document("a")
+    assert graph.k_hop(["SpaceX"], hops=1) == [("SpaceX", "DEVELOP", "Starship", 1)]
+    graph.retract_document("b")
+    assert graph.num_nodes() == 0 and graph.num_edges() == 0
+
+def test_removing_a_fact_keeps_entities_the_document_still_lists():
+    graph = InMemoryGraph()
+    graph.populate_kg(kg(["SpaceX"], [("SpaceX", "develop", "Starship")]), doc_id="a")
+    graph.remove_kg(kg([], [("SpaceX", "develop", "Starship")]), doc_id="a")
+    assert graph.entity_names() == ["SpaceX"]
+
+    graph.retract_document("a")
+    assert graph.entity_names() == []
+
+def test_anonymous_removal_withdraws_every_assertion():
+    graph = InMemoryGraph()
+    graph.populate_kg(kg([], [("SpaceX", "develop", "Starship")]), doc_id="a")
+    graph.remove_kg(kg([], [("SpaceX", "develop", "Starship")]))
+    graph.populate_kg(kg([], [("SpaceX", "develop", "Starship")]))
+    graph.retract_document("a")
+    assert graph.k_hop(["SpaceX"], hops=1) == [("SpaceX", "DEVELOP", "Starship", 1)]
+
+def test_neo4j_provenance_lives_on_assert_edges():
+    driver = FakeDriver()
+    connector = Neo4jConnector(driver=driver)
+    connector.populate_kg_batch([kg(["SpaceX"], [("SpaceX", "develop", "Starship")])], doc_ids=["a"])
+    connector.populate_kg(kg([], [("NASA", "fund", "SpaceX")]))
+    queries = [query for query, _ in driver.queries]
+    assert not any("doc_ids" in query for query in queries)
+    assert sum("ASSERTS" in query for query in queries) == 1
+    documented = next(params["rows"] for query, params in driver.queries if "ASSERTS" in query)
+    assert [row["doc_id"] for row in documented] == ["a"]
@@ -0,0 +1,64 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.sources import ResponseTooLarge, fetch_url, fetch_urls
+
+PAGE = b"<html><body><p>SpaceX develops Starship.</p></body></html>"
+BIG = b"<p>" + b"x" * 5000 + b"</p>"
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = PAGE if self.path == "/small" else BIG
+        self.send_response(200)
+        if self.path != "/undeclared":
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture(scope="module")
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+def test_fetch_returns_paragraph_text(server):
+    assert fetch_url(f"{server}/small", max_bytes=1000) == "SpaceX develops Starship."
+
+def test_declared_size_over_the_cap_is_rejected(server):
+    with pytest.raises(ResponseTooLarge, match="5007 bytes"):
+        fetch_url(f"{server}/big", max_bytes=1000)
+
+def test_cap_is_enforced_while_reading(server):
+    # HTTP/1.0 without Content-Length: the body ends when the connection closes.
+    with pytest.raises(ResponseTooLarge, match="exceeds 1000 bytes"):
+        fetch_url(f"{server}/undeclared", max_bytes=1000)
+
+def test_one_oversized_url_does_not_stop_the_others(server):
+    results = list(fetch_urls([f"{server}/big", f"{server}/small"], max_workers=2, max_bytes=1000))
+    assert [type(error) for _, _, error in results] == [ResponseTooLarge, type(None)]
+    assert results[1][1] == "SpaceX develops Starship."
+
+
+def test_own_session_is_closed(server, monkeypatch):
+    import src.sources as sources
+
+    sessions = []
+    make_session = sources.make_session
+
+    def tracking(**kwargs):
+        session = make_session(**kwargs)
+        close = session.close
+        session.close = lambda: sessions.append("closed") or close()
+        return session
+
+    monkeypatch.setattr(sources, "make_session", tracking)
+    assert fetch_url(f"{server}/small") == "SpaceX develops Starship."
+    assert sessions == ["closed"]
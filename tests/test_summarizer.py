@@ -0,0 +1,33 @@
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("transformers")
+
+from src.summarizer import Summarizer
+
+class FakeSummarizer(Summarizer):
+    """
+    Summarizer without a model: chunks are "|"-separated and a summary of t is "S(t)".
+    """
+    def __init__(self):
+        self.model_checkpoint = "fake"
+        self.backend = "torch"
+        self.calls = []
+
+    def iter_chunks(self, text, chunk_tokens=1000, overlap=100):
+        return iter(text.split("|"))
+
+    def generate_summaries(self, texts, batch_size=8, max_length=128, num_beams=4, max_input_length=1024):
+        self.calls.append(list(texts))
+        return [f"S({t})" for t in texts]
+
+def test_single_chunk_is_summarized_once():
+    summarizer = FakeSummarizer()
+    assert summarizer.summarize_long("a") == "S(a)"
+    assert summarizer.calls == [["a"]]
+
+def test_lone_leftover_summary_is_not_summarized_again():
+    summarizer = FakeSummarizer()
+    summary = summarizer.summarize_long("a|b|c", fan_in=2)
+    assert summary == "S(S(S(a) S(b)) S(c))"
+    assert summarizer.calls == [["a", "b", "c"], ["S(a) S(b)"], ["S(S(a) S(b)) S(c)"]]
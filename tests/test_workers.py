@@ -0,0 +1,47 @@
+import os
+
+from src.workers import WorkerPool
+
+class FakeSummarizer:
+    def generate_summaries(self, texts, batch_size=8, max_length=128, num_beams=4):
+        for text in texts:
+            if text == "crash":
+                os._exit(3)
+            if text == "bad":
+                raise ValueError("bad document")
+        return [text.upper() for text in texts]
+
+class FakeExtractor:
+    def extract_kg_batch(self, summaries):
+        return [{"entities": [{"text": s, "label": "ORG"}], "relations": []} for s in summaries]
+
+class FakePipeline:
+    summary_max_length = 128
+    summary_num_beams = 4
+
+    def __init__(self, **kwargs):
+        self.summarizer = FakeSummarizer()
+        self.kg_extractor = FakeExtractor()
+
+    def summarize_batch(self, texts, batch_size=8):
+        return self.summarizer.generate_summaries(texts, batch_size=batch_size)
+
+    def close(self):
+        pass
+
+def run(texts, **kwargs):
+    documents = [(f"doc-{i}", text) for i, text in enumerate(texts)]
+    with WorkerPool(pipeline_factory=FakePipeline, **kwargs) as pool:
+        return list(pool.map(documents))
+
+def test_failing_document_is_retried_alone():
+    results = run(["a", "bad", "b", "c"], n_workers=1, batch_size=4)
+    assert [doc_id for doc_id, _, _, _ in results] == ["doc-0", "doc-1", "doc-2", "doc-3"]
+    assert [summary for _, summary, _, _ in results] == ["A", None, "B", "C"]
+    assert results[1][3] == "ValueError: bad document"
+
+def test_worker_crash_is_recovered():
+    results = run(["a", "crash", "b", "c", "d", "e"], n_workers=2, batch_size=3)
+    assert [summary for _, summary, _, _ in results] == ["A", None, "B", "C", "D", "E"]
+    assert results[1][3] == "worker exited with code 3"
+    assert results[2][2] == {"entities": [{"text": "B", "label": "ORG"}], "relations": []}